@@ -1,4 +1,4 @@
-def run_BuiScout():
+def run_BuiScout(test=False):
     from multiprocessing import Process
     from pydriller import Repository
     from pydriller.git import Git
@@ -13,27 +13,31 @@ def run_BuiScout():
         clear_existing_data,
         clear_repo_location,
     )
-    from utils.configurations import (
-        RESOURCE_CONTROL,
-        COMMIT_SERIES,
-        AST_DIFFS_REUSE,
-        PROGRESS_RESET,
-        ROOT_PATH,
-        SAVE_PATH,
-        CLEAN_TRACES,
-        REPOSITORY,
-        PROJECT,
-        BRANCH,
-        COMMITS,
-        EXCLUDED_COMMITS,
-        LANGUAGES,
-        ENTRY_FILES,
-        PATTERN_SETS,
-        PATTERNS_FLATTENED,
-        FILTERING,
-        PROJECT_MODEL,
-        DATA_FLOW_ANALYSIS_MODE,
-    )
+    from utils.configurations import ROOT_PATH, Configurations, get_config_path
+
+    configurations = Configurations(get_config_path(test))
+    configurations.clone_repository()
+
+    RESOURCE_CONTROL = configurations.RESOURCE_CONTROL
+    COMMIT_SERIES = configurations.COMMIT_SERIES
+    AST_DIFFS_REUSE = configurations.AST_DIFFS_REUSE
+    PROGRESS_RESET = configurations.PROGRESS_RESET
+    SAVE_PATH = configurations.SAVE_PATH
+    CLEAN_TRACES = configurations.CLEAN_TRACES
+    REPOSITORY = configurations.REPOSITORY
+    PROJECT = configurations.PROJECT
+    BRANCH = configurations.BRANCH
+    COMMITS = configurations.COMMITS
+    EXCLUDED_COMMITS = configurations.EXCLUDED_COMMITS
+    LANGUAGES = configurations.LANGUAGES
+    ENTRY_FILES = configurations.ENTRY_FILES
+    PATTERN_SETS = configurations.PATTERN_SETS
+    PATTERNS_FLATTENED = configurations.PATTERNS_FLATTENED
+    FILTERING = configurations.FILTERING
+    PROJECT_MODEL = configurations.PROJECT_MODEL
+    DATA_FLOW_ANALYSIS_MODE = configurations.DATA_FLOW_ANALYSIS_MODE
+    # Passed to the SystemDiff objects as keyword arguments
+    ANALYSIS_OPTIONS = configurations.get_analysis_options()
 
     SAVE_PATH = (
         SAVE_PATH
@@ -93,15 +97,21 @@ def run_BuiScout():
             PATTERNS,
             ROOT_PATH,
             SAVE_PATH,
+            **ANALYSIS_OPTIONS,
         )
 
-        diff.export_csv(propagation_slice_mode=True)
+        try:
+            diff.export_csv(propagation_slice_mode=True)
+        finally:
+            diff.close_spill_store()
 
         commit_build_files_df = pd.DataFrame(list(diff.file_data.values()))
+        # Code of files whose ASTDiffs are never built is not written out
         commit_build_files_df.drop(
-            labels=["diff", "language_specific_info"],
+            labels=["diff", "language_specific_info", "code_before", "code_after"],
             axis=1,
             inplace=True,
+            errors="ignore",
         )
         commit_build_files_df.to_csv(
             SAVE_PATH / "all_build_files.csv", mode="a", header=False, index=False
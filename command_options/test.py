@@ -2,4 +2,4 @@ from .run import run_BuiScout
 
 
 def test_BuiScout():
-    run_BuiScout()
+    run_BuiScout(test=True)
@@ -1,3 +1,5 @@
+from .analysis_context import AnalysisContext
+from .point_model import Point
 from .def_model import Def
 from .use_model import Use
 from .actor_model import Actor
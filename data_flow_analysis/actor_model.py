@@ -1,81 +1,99 @@
-import itertools
 from utils.exceptions import DebugException
+from .point_model import Point
 
 
-class Actor(object):
+class Actor(Point):
     """
     Model an Actor point.
     Objects are called actor_point
     """
 
-    # Please make sure to reset this for each commit
-    # (see system_diff_model.py > SystemDiff.__init__())
-    id_generator = itertools.count(start=1)
+    __slots__ = (
+        "reachability",
+        "reachability_actors",
+        "reachability_mask",
+        "negated_reachability_mask",
+        "def_points",
+        "use_points",
+    )
+    kind = "actor"
 
     def __init__(
         self,
         node_data,
         reachability,
-        reachability_actor_ids,
+        reachability_actors,
         ast,
+        context,
         actor_type="built_in",
         scope=None,
         file=None,
     ):
-        self.id = f"{ast.commit_hash}_{ast.name}_actor_{next(Actor.id_generator)}"
-        self.ast = ast
-        self.type = actor_type
-        self.scope = scope
-        self.file = file
+        super().__init__(node_data, ast, actor_type, context, scope, file)
 
-        # Storing the node_data
-        self.node_data = node_data
-
-        self.name = self.ast.get_name(self.node_data)
+        self.name = ast.get_name(self.node_data)
         if self.name is None:
             raise DebugException(
                 f"{self.node_data['type']} requires NameGetter revisit"
             )
-        self.is_modified = node_data["operation"] != "no-op"
-        self.is_value_affected = False
-        self.is_reach_affected = False
-        self.is_import_reach_affected = False
-        self.is_upstream = False
-        self.is_in_propagation_slice = self.is_modified
-        self.is_processed_for_propagation = False
-
-        # Storing reachability condition
-        self.reachability = reachability.copy()
-        self.reachability_actor_ids = reachability_actor_ids.copy()
+
+        # Storing reachability condition and the actors it depends on
+        # The stacks are immutable and shared (see ReachabilityStack)
+        self.reachability = reachability
+        self.reachability_actors = reachability_actors
+        # Bitsets of the reachability conditions and of the conditions they negate
+        if self.reachability.masks is None:
+            self.set_reachability_masks()
+        else:
+            (
+                self.reachability_mask,
+                self.negated_reachability_mask,
+            ) = self.reachability.masks
 
         # Storing the list of [Defs]
         self.def_points = []
         # Storing the list of [Uses]
         self.use_points = []
 
+    def set_reachability_masks(self):
+        """
+        Computes the bitsets of the reachability conditions with the interned
+        conditions of the context, e.g., for actors created in another process.
+        """
+        self.reachability.masks = self.context.get_condition_masks(self.reachability)
+        (
+            self.reachability_mask,
+            self.negated_reachability_mask,
+        ) = self.reachability.masks
+
     def set_is_modified(self):
-        self.is_modified = True
-        self.is_in_propagation_slice = True
+        self.set_flags(Point.MODIFIED)
+        self.set_is_in_propagation_slice()
 
     def set_is_value_affected(self):
-        self.is_value_affected = True
-        self.is_in_propagation_slice = True
+        self.set_flags(Point.VALUE_AFFECTED)
+        self.set_is_in_propagation_slice()
 
     def set_is_reach_affected(self):
-        self.is_reach_affected = True
-        self.is_in_propagation_slice = True
+        self.set_flags(Point.REACH_AFFECTED)
+        self.set_is_in_propagation_slice()
 
     def set_is_import_reach_affected(self):
-        self.is_reach_affected = True
-        self.is_import_reach_affected = True
-        self.is_in_propagation_slice = True
+        self.set_flags(Point.REACH_AFFECTED | Point.IMPORT_REACH_AFFECTED)
+        self.set_is_in_propagation_slice()
 
     def set_is_upstream(self):
-        self.is_upstream = True
-        self.is_in_propagation_slice = True
+        self.set_flags(Point.UPSTREAM)
+        self.set_is_in_propagation_slice()
+
+    def set_is_in_propagation_slice(self):
+        if not self.flags & Point.IN_PROPAGATION_SLICE:
+            self.set_flags(Point.IN_PROPAGATION_SLICE)
+            if not self.context.propagation_worklist is None:
+                self.context.propagation_worklist.append(self)
 
     def set_is_processed_for_propagation(self):
-        self.is_processed_for_propagation = True
+        self.set_flags(Point.PROCESSED_FOR_PROPAGATION)
 
     def add_def_point(self, def_point):
         """
@@ -119,8 +137,13 @@ class Actor(object):
                 "node_s_pos": self.node_data["s_pos"],
                 "node_e_pos": self.node_data["e_pos"],
                 "node_level": self.node_data["level"],
-                "reachability": self.reachability,
-                "reachability_actor_ids": self.reachability_actor_ids,
+                "reachability": self.reachability.to_list(),
+                "reachability_actor_ids": list(
+                    map(
+                        lambda actor_point: actor_point.id,
+                        self.reachability_actors.to_list(),
+                    )
+                ),
                 "code": self.ast.unparse(self.node_data, masked_types=["body"]),
                 "def_ids": list(map(lambda point: point.id, self.def_points)),
                 "use_ids": list(map(lambda point: point.id, self.use_points)),
@@ -134,8 +157,13 @@ class Actor(object):
             "is_value_affected": self.is_value_affected,
             "is_reach_affected": self.is_reach_affected,
             "is_upstream": self.is_upstream,
-            "reachability": self.reachability,
-            "reachability_actor_ids": self.reachability_actor_ids,
+            "reachability": self.reachability.to_list(),
+            "reachability_actor_ids": list(
+                map(
+                    lambda actor_point: actor_point.id,
+                    self.reachability_actors.to_list(),
+                )
+            ),
             "def_ids": list(map(lambda point: point.id, self.def_points)),
             "use_ids": list(map(lambda point: point.id, self.use_points)),
         }
@@ -0,0 +1,177 @@
+from utils.helpers import index_path_resolutions
+
+
+class AnalysisContext(object):
+    """
+    Model the state of the data-flow analysis of a commit.
+    The context carries the configuration of the analysis, the id counters,
+    the registry of the ASTs, and the caches shared by the ConditionalDefUseChains
+    and the points of the commit, instead of class-level attributes,
+    so the analyses of multiple commits do not share any state.
+    Objects are called context (see SystemDiff.__init__())
+    """
+
+    def __init__(
+        self,
+        analysis_mode="global",
+        verbose=False,
+        execute_callables=True,
+        path_resolutions=(),
+        *args,
+        **kwargs,
+    ):
+        # Configuration of the analysis
+        self.analysis_mode = analysis_mode
+        self.verbose = verbose
+        self.execute_callables = execute_callables
+        # The PROJECT_SPECIFIC_PATH_RESOLUTION items and their index
+        # {('caller_file_path', 'callee_file_path'): [callee_resolved_path]}
+        self.path_resolutions = path_resolutions
+        self.path_resolution_index = index_path_resolutions(path_resolutions)
+
+        # Next ids of the points in the form of {'kind': int}
+        self.set_next_ids()
+        # Points are appended to this list in their order of creation when set,
+        # to be renumbered once merged into another context (see self.renumber_points())
+        self.created_points = None
+
+        # Registry of the ASTs the points belong to, keyed by (file_path, cluster)
+        # in the form of [AST], [(file_path, cluster)] and {(file_path, cluster): int}
+        # Entries of spilled ASTs are None until accessed (see self.get_ast())
+        self.asts = []
+        self.ast_keys = []
+        self.ast_indices = dict()
+        # Number of ASTs stored at each index of the registry, used to refresh the
+        # node_data cached by the points once reloaded (see Point.node_data)
+        self.ast_versions = []
+        # (commit_hash, cluster) of each AST of the registry, kept once the AST
+        # is spilled so the ids of the points do not reload it (see Point.id)
+        self.ast_labels = []
+        # Returns the ASTDiff of a file, set by the SystemDiff (see SystemDiff.load_file_diff())
+        self.diff_loader = None
+
+        # Interned reachability conditions in the form of {'condition': bit}
+        self.condition_bits = dict()
+
+        # Number of Defs registered under each name in the form of {'name': int}
+        # used to invalidate cached name lookups (see ConditionalDefUseChains.add_defined_name())
+        self.name_versions = dict()
+
+        # Structures of the callables (see CallableConditionalDefUseChains in language supports)
+        self.callable_structures = dict()
+        # Recorded effects of the bodies of the callables, replayed at later call sites
+        # (see CallableConditionalDefUseChains.analyze_callable_body() in language supports)
+        self.callable_effects = dict()
+
+        # Points entering the propagation slice are appended to this list when set
+        # (see ConditionalDefUseChains.slice_downwards() in language supports)
+        self.propagation_worklist = None
+
+    def set_next_ids(self, next_ids=None):
+        """
+        Restarts the ids of the points of each kind at 1,
+        or at the ones of next_ids (see self.get_next_ids()).
+        """
+        if next_ids is None:
+            next_ids = dict(map(lambda kind: (kind, 1), ["actor", "def", "use"]))
+        self.next_ids = dict(next_ids)
+
+    def get_next_ids(self):
+        return dict(self.next_ids)
+
+    def get_next_id(self, kind):
+        id_number = self.next_ids[kind]
+        self.next_ids[kind] = id_number + 1
+        return id_number
+
+    def renumber_points(self, points):
+        """
+        Gives the points the next ids of their kinds in the order of the list,
+        so the points of an analysis done in another process (see self.created_points)
+        are numbered as if they were created in this one.
+        """
+        for point in points:
+            point.id_number = self.get_next_id(point.kind)
+
+    def get_key_index(self, file_path, cluster):
+        """
+        Returns the index of the (file_path, cluster) key in the registry,
+        registering it without an AST if new.
+        """
+        key = (file_path, cluster)
+        file_index = self.ast_indices.get(key)
+        if file_index is None:
+            file_index = len(self.asts)
+            self.asts.append(None)
+            self.ast_keys.append(key)
+            self.ast_versions.append(0)
+            self.ast_labels.append(None)
+            self.ast_indices[key] = file_index
+        return file_index
+
+    def get_file_index(self, ast):
+        """
+        Returns the index of the ast in the registry, registering it
+        (or replacing the reloaded AST of the same file and cluster).
+        """
+        file_index = self.get_key_index(ast.file_path, ast.name)
+        self.set_ast(file_index, ast)
+        return file_index
+
+    def set_ast(self, file_index, ast):
+        """
+        Stores the ast at the index of the registry. The points of the index
+        resolve their node_data again once another AST is stored (see Point.node_data).
+        """
+        if not self.asts[file_index] is ast:
+            self.asts[file_index] = ast
+            self.ast_versions[file_index] += 1
+            self.ast_labels[file_index] = (ast.commit_hash, ast.name)
+
+    def get_ast(self, file_index):
+        """
+        Returns the AST at the index of the registry,
+        reloading its ASTDiff if it was spilled.
+        """
+        ast = self.asts[file_index]
+        if ast is None:
+            file_path, cluster = self.ast_keys[file_index]
+            ast = getattr(self.diff_loader(file_path), cluster)
+            self.set_ast(file_index, ast)
+        return ast
+
+    def release_asts(self, file_path):
+        """
+        Drops the ASTs of the file from the registry once its ASTDiff is spilled.
+        """
+        for cluster in ["source", "destination"]:
+            file_index = self.ast_indices.get((file_path, cluster))
+            if file_index is not None:
+                self.asts[file_index] = None
+
+    def get_condition_bit(self, condition):
+        """
+        Returns the bit of the interned condition, interning it if new.
+        """
+        bit = self.condition_bits.get(condition)
+        if bit is None:
+            bit = 1 << len(self.condition_bits)
+            self.condition_bits[condition] = bit
+        return bit
+
+    def get_condition_masks(self, conditions):
+        """
+        Returns the pair of bitsets of the conditions and of the conditions
+        they negate (condition of f"NOT ({condition})"), so that a condition and
+        its negation are compared on the same bit without interning the negations
+        of all conditions. Empty conditions are ignored.
+        """
+        mask = 0
+        negated_mask = 0
+        for condition in conditions:
+            if condition == "":
+                continue
+            mask |= self.get_condition_bit(condition)
+            if condition.startswith("NOT (") and condition.endswith(")"):
+                negated_mask |= self.get_condition_bit(condition[5:-1])
+        return mask, negated_mask
@@ -1,11 +1,14 @@
 import json
 import pandas as pd
-from functools import reduce
+import itertools
 from collections import defaultdict
 from utils.visitors import NodeVisitor
 from .def_model import Def
 from .use_model import Use
 from .actor_model import Actor
+from .point_model import Point
+from .reachability_stack import ReachabilityStack
+from .point_registry import PointRegistry
 
 
 class ConditionalDefUseChains(NodeVisitor):
@@ -21,6 +24,10 @@ class ConditionalDefUseChains(NodeVisitor):
         """
         ast: ast_model.AST
         """
+        self.sysdiff = sysdiff
+        # The AnalysisContext of the commit shared with the points
+        self.context = sysdiff.context
+
         self.ast = ast
 
         if scope:
@@ -39,19 +46,17 @@ class ConditionalDefUseChains(NodeVisitor):
         # A list of ConditionalDefUseChains objects of the children scopes
         self.children = []
 
+        # Registry indices of the ASTs of the files including the current one
         self.ast_stack = []
 
-        self.sysdiff = sysdiff
-
         # Store current reachability conditions based on conditional statements
+        # The stacks are immutable (see ReachabilityStack) and shared with the actors
         if parent_scope is None:
-            self.reachability_stack = []
-            self.reachability_actor_id_stack = []
+            self.reachability_stack = ReachabilityStack()
+            self.reachability_actor_stack = ReachabilityStack()
         else:
-            self.reachability_stack = parent_scope.reachability_stack.copy()
-            self.reachability_actor_id_stack = (
-                parent_scope.reachability_actor_id_stack.copy()
-            )
+            self.reachability_stack = parent_scope.reachability_stack
+            self.reachability_actor_stack = parent_scope.reachability_actor_stack
 
         # Stores a mapping between def nodes and their object (Def)
         # in the form of {'node_id': [Def]}
@@ -60,7 +65,8 @@ class ConditionalDefUseChains(NodeVisitor):
         # times at call location and in case the callable
         # does not create a new scope, points will get overwritten.
         # Examples of such cases are macros or the include command in CMake.
-        self.def_points = defaultdict(list)
+        # Points are only to be added through PointRegistry.add_point()
+        self.def_points = PointRegistry()
         # Stores a mapping between use nodes and their object (Use)
         # in the form of {'node_id': [Use]}
         # We store a list of Use objects for each node
@@ -68,7 +74,8 @@ class ConditionalDefUseChains(NodeVisitor):
         # times at call location and in case the callable
         # does not create a new scope, points will get overwritten.
         # Examples of such cases are macros or the include command in CMake.
-        self.use_points = defaultdict(list)
+        # Points are only to be added through PointRegistry.add_point()
+        self.use_points = PointRegistry()
         # Stores a mapping between actor nodes and their object (Actor)
         # in the form of {'node_id': [Actor]}
         # We store a list of Actor objects for each node
@@ -76,10 +83,26 @@ class ConditionalDefUseChains(NodeVisitor):
         # times at call location and in case the callable
         # does not create a new scope, points will get overwritten.
         # Examples of such cases are macros or the include command in CMake.
-        self.actor_points = defaultdict(list)
+        # Points are only to be added through PointRegistry.add_point()
+        self.actor_points = PointRegistry()
+        # Stores the order of the node ids in self.actor_points {'node_id': rank}
+        self.actor_point_key_ranks = dict()
+        # Stores a mapping between actors and the actor points (in self.actor_points)
+        # whose reachability depends on them, with their positions in self.actor_points,
+        # in the form of {Actor: [((rank, index), Actor)]}
+        # Actors are the keys rather than their ids, which are renumbered
+        # when merging analyses done in other processes (see SystemDiff)
+        self.reachability_dependents = defaultdict(list)
+        # Stores a mapping between actors and the children scopes
+        # whose reachability depends on them {Actor: [ConditionalDefUseChains]}
+        self.child_reachability_dependents = defaultdict(list)
 
         # Stores a mapping of the name to its definition points {'name': [Def]}
-        self.defined_names = defaultdict(list)
+        # Only to be extended through self.add_defined_name()
+        self.defined_names = dict()
+        # Stores the definitions of names looked up in the current and all ancestor scopes
+        # with the version of the name they were looked up at {'name': (int, [Def])}
+        self.definition_lookup_cache = dict()
         # Stores a mapping of the name to its use points {'name': [Use]}
         self.used_names = defaultdict(list)
         # Stores a mapping of the name to undefined users {'name': [Use]}
@@ -103,6 +126,10 @@ class ConditionalDefUseChains(NodeVisitor):
         """
         # Storing propagation rules
         self.propagation_slice = pd.DataFrame()
+        # Storing propagation rules (dicts) in order of addition, and their keys
+        # for deduplication, until self.propagation_slice is built from them
+        self.propagation_rules = []
+        self.propagation_rule_keys = set()
 
     def get_definitions_by_name(self, node_data_or_name, get_from_parent_scopes=True):
         """
@@ -113,14 +140,39 @@ class ConditionalDefUseChains(NodeVisitor):
             name = self.ast.get_name(node_data_or_name)
         else:
             name = node_data_or_name
-        defined_names = self.defined_names[name]
-        if self.parent_names_available and get_from_parent_scopes:
-            parent = self.parent_scope
-            while not parent is None:
-                defined_names = parent.defined_names[name] + defined_names
-                parent = parent.parent_scope
+        if not (self.parent_names_available and get_from_parent_scopes):
+            return self.defined_names.get(name, [])
+
+        version = self.context.name_versions.get(name, 0)
+        cached = self.definition_lookup_cache.get(name)
+        if (cached is not None) and (cached[0] == version):
+            return cached[1]
+
+        scoped_defined_names = []
+        scope = self
+        while not scope is None:
+            if name in scope.defined_names:
+                scoped_defined_names.append(scope.defined_names[name])
+            scope = scope.parent_scope
+        defined_names = []
+        for def_points in reversed(scoped_defined_names):
+            defined_names.extend(def_points)
+        self.definition_lookup_cache[name] = (version, defined_names)
         return defined_names
 
+    def add_defined_name(self, def_point, name=None):
+        """
+        Registers the def_point under the name (def_point.name by default)
+        and invalidates the cached lookups of the name.
+        """
+        if name is None:
+            name = def_point.name
+        if name in self.defined_names:
+            self.defined_names[name].append(def_point)
+        else:
+            self.defined_names[name] = [def_point]
+        self.context.name_versions[name] = self.context.name_versions.get(name, 0) + 1
+
     def register_new_use_point(
         self, use_node_data, actor_point, use_type="VAR", preferred_name=None
     ):
@@ -158,12 +210,13 @@ class ConditionalDefUseChains(NodeVisitor):
             use_type,
             actor_point,
             self.ast,
+            self.context,
             preferred_name,
             scope=self.scope,
             file=self.ast.file_saved_as,
         )
         actor_point.add_use_point(use_point)
-        self.use_points[use_point.node_data["id"]].append(use_point)
+        self.use_points.add_point(use_point)
         self.used_names[use_point.name].append(use_point)
         defined_names = self.get_definitions_by_name(use_point.node_data)
         registered_to = []
@@ -210,6 +263,7 @@ class ConditionalDefUseChains(NodeVisitor):
             def_type,
             actor_point,
             self.ast,
+            self.context,
             prefix=prefix,
             suffix=suffix,
             preferred_name=preferred_name,
@@ -217,8 +271,8 @@ class ConditionalDefUseChains(NodeVisitor):
             file=self.ast.file_saved_as,
         )
         actor_point.add_def_point(def_point)
-        self.def_points[def_point.node_data["id"]].append(def_point)
-        self.defined_names[def_point.name].append(def_point)
+        self.def_points.add_point(def_point)
+        self.add_defined_name(def_point)
         return def_point
 
     def register_new_actor_point(self, node_data, preferred_type=None):
@@ -228,26 +282,65 @@ class ConditionalDefUseChains(NodeVisitor):
         actor_point = self.Actor(
             actor_node_data,
             self.reachability_stack,
-            self.reachability_actor_id_stack,
+            self.reachability_actor_stack,
             self.ast,
+            self.context,
             actor_type=actor_type,
             scope=self.scope,
             file=self.ast.file_saved_as,
         )
-        self.actor_points[actor_node_data["id"]].append(actor_point)
+        self.add_actor_point(actor_point)
         return actor_point
 
+    def add_actor_point(self, actor_point):
+        """
+        Adds the actor_point to self.actor_points and indexes it in
+        self.reachability_dependents by the actors its reachability depends on.
+        """
+        node_id = actor_point.node_data["id"]
+        if not node_id in self.actor_point_key_ranks:
+            self.actor_point_key_ranks[node_id] = len(self.actor_point_key_ranks)
+        position = (
+            self.actor_point_key_ranks[node_id],
+            len(self.actor_points.get(node_id, ())),
+        )
+        self.actor_points.add_point(actor_point)
+        for actor in set(actor_point.reachability_actors):
+            self.reachability_dependents[actor].append((position, actor_point))
+
+    def get_reachability_dependents(self, actor):
+        """
+        Returns the actor points whose reachability depends on the actor
+        in the order of self.get_all_actor_points().
+        """
+        return list(
+            map(
+                lambda entry: entry[1],
+                sorted(
+                    self.reachability_dependents.get(actor, []),
+                    key=lambda entry: entry[0],
+                ),
+            )
+        )
+
+    def add_child_scope(self, child_scope):
+        """
+        Adds the child_scope to self.children and indexes it in
+        self.child_reachability_dependents by the actors its reachability depends on.
+        """
+        self.children.append(child_scope)
+        for actor in set(child_scope.reachability_actor_stack):
+            self.child_reachability_dependents[actor].append(child_scope)
+
     def register_def_point_to_parent_scope(self, def_point, recursive=False):
         """
         Consumes a Def object and registers it to the parent scope.
         """
         if self.parent_scope is None:
             return
-        self.parent_scope.defined_names[def_point.name].append(def_point)
-        self.parent_scope.def_points[def_point.node_data["id"]].append(def_point)
-        self.parent_scope.actor_points[def_point.actor_point.node_data["id"]].append(
-            def_point.actor_point
-        )
+        self.parent_scope.add_defined_name(def_point)
+        self.parent_scope.def_points.add_point(def_point)
+        self.parent_scope.add_actor_point(def_point.actor_point)
         if recursive:
             self.register_def_point_to_parent_scope(def_point)
 
@@ -255,20 +348,20 @@ class ConditionalDefUseChains(NodeVisitor):
         self, condition_node_data, actor_point, is_comparative=False
     ):
         if is_comparative:
-            self.reachability_stack.append(
+            self.reachability_stack = self.reachability_stack.push(
                 self.ast.unparse(condition_node_data).strip("()").strip()
             )
-        self.reachability_actor_id_stack.append(actor_point.id)
+        self.reachability_actor_stack = self.reachability_actor_stack.push(actor_point)
 
     def remove_condition_from_reachability_stack(self, last_n=1, was_comparative=False):
         if was_comparative:
-            del self.reachability_stack[-last_n:]
-        del self.reachability_actor_id_stack[-last_n:]
+            self.reachability_stack = self.reachability_stack.pop(last_n)
+        self.reachability_actor_stack = self.reachability_actor_stack.pop(last_n)
 
     def negate_last_condition_in_reachability_stack(self, negation_symbol="NOT"):
         # Usefull for else_if structure
-        self.reachability_stack[-1] = (
-            f"{negation_symbol} ({self.reachability_stack[-1]})"
+        self.reachability_stack = self.reachability_stack.replace_top(
+            f"{negation_symbol} ({self.reachability_stack.top})"
         )
 
     def add_callable_to_current_call_stack(self, callable_name, *args, **kwargs):
@@ -283,37 +376,49 @@ class ConditionalDefUseChains(NodeVisitor):
         name = self.ast.get_name(node_data)
         return name in self.global_scope.current_call_stack
 
+    @property
+    def ast(self):
+        """
+        The AST of the file being analyzed, kept by its index in the registry
+        of self.context so the AST is not held once its ASTDiff is spilled.
+        """
+        return self.context.get_ast(self.ast_index)
+
+    @ast.setter
+    def ast(self, ast):
+        self.ast_index = self.context.get_file_index(ast)
+
     def analyze(self):
+        file_path = self.ast.file_path
+        self.sysdiff.pin_file_diff(file_path)
         self.generic_visit(self.ast.get_data(self.ast.root))
-        self.sysdiff.set_data_flow_file_analysis(self.ast.file_path, self.ast.name)
+        self.sysdiff.set_data_flow_file_analysis(file_path, self.ast.name)
+        self.sysdiff.unpin_file_diff(file_path)
 
     def get_all_def_points(self):
-        return reduce(lambda a, b: [*a, *b], self.def_points.values(), [])
+        return self.def_points.get_all_points()
 
     def get_all_use_points(self):
-        return reduce(lambda a, b: [*a, *b], self.use_points.values(), [])
+        return self.use_points.get_all_points()
 
     def get_all_actor_points(self):
-        return reduce(lambda a, b: [*a, *b], self.actor_points.values(), [])
+        return self.actor_points.get_all_points()
 
     def to_json(self, propagation_slice_mode=False):
         if propagation_slice_mode:
-            def_points = filter(
-                lambda point: point.is_in_propagation_slice, self.get_all_def_points()
-            )
-            use_points = filter(
-                lambda point: point.is_in_propagation_slice, self.get_all_use_points()
-            )
-            actor_points = filter(
-                lambda point: point.is_in_propagation_slice, self.get_all_actor_points()
+            def_points = self.def_points.get_flagged_points(Point.IN_PROPAGATION_SLICE)
+            use_points = self.use_points.get_flagged_points(Point.IN_PROPAGATION_SLICE)
+            actor_points = self.actor_points.get_flagged_points(
+                Point.IN_PROPAGATION_SLICE
             )
         else:
             def_points = self.get_all_def_points()
             use_points = self.get_all_use_points()
             actor_points = self.get_all_actor_points()
+        commit_hash, cluster = self.context.ast_labels[self.ast_index]
         cdu_chains_output = {
-            "commit_hash": self.ast.commit_hash,
-            "cluster": self.ast.name,
+            "commit_hash": commit_hash,
+            "cluster": cluster,
             "scope": self.scope,
             "parent_scopes": (
                 None if self.parent_scope is None else self.parent_scope.scope
@@ -336,24 +441,11 @@ class ConditionalDefUseChains(NodeVisitor):
                     actor_points,
                 )
             ),
-            "undefined_names": reduce(
-                lambda a, b: [*a, *b],
-                reduce(
-                    lambda a, b: [*a, *b],
-                    map(
-                        lambda use_point_list: (
-                            list(
-                                map(
-                                    lambda use_point: use_point.to_json(),
-                                    use_point_list,
-                                )
-                            ),
-                        ),
-                        self.undefined_names.values(),
-                    ),
-                    [],
-                ),
-                [],
+            "undefined_names": list(
+                map(
+                    lambda use_point: use_point.to_json(),
+                    itertools.chain.from_iterable(self.undefined_names.values()),
+                )
             ),
         }
 
@@ -361,7 +453,7 @@ class ConditionalDefUseChains(NodeVisitor):
 
     def export_cdu_json(self, save_path):
         save_path.mkdir(parents=True, exist_ok=True)
-        if self.sysdiff.analysis_mode == "change_location":
+        if self.context.analysis_mode == "change_location":
             self.ast.export_json(save_path / "diffs")
         with open(
             save_path / f"{self.ast.name}_cdu_output_{self.scope}.json", "w"
@@ -409,7 +501,7 @@ class ConditionalDefUseChains(NodeVisitor):
 
     def export_cdu_csv(self, save_path):
         save_path.mkdir(parents=True, exist_ok=True)
-        if self.sysdiff.analysis_mode == "change_location":
+        if self.context.analysis_mode == "change_location":
             self.ast.export_csv(save_path / "diffs")
         (
             def_points_df,
@@ -443,19 +535,7 @@ class ConditionalDefUseChains(NodeVisitor):
         pass
 
     def get_propagation_slice_points(self):
-        def_points = list(
-            filter(
-                lambda point: point.is_in_propagation_slice, self.get_all_def_points()
-            )
-        )
-        use_points = list(
-            filter(
-                lambda point: point.is_in_propagation_slice, self.get_all_use_points()
-            )
-        )
-        actor_points = list(
-            filter(
-                lambda point: point.is_in_propagation_slice, self.get_all_actor_points()
-            )
-        )
+        def_points = self.def_points.get_flagged_points(Point.IN_PROPAGATION_SLICE)
+        use_points = self.use_points.get_flagged_points(Point.IN_PROPAGATION_SLICE)
+        actor_points = self.actor_points.get_flagged_points(Point.IN_PROPAGATION_SLICE)
         return def_points + use_points + actor_points
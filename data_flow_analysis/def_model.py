@@ -1,16 +1,15 @@
-import itertools
 from utils.exceptions import DebugException
+from .point_model import Point
 
 
-class Def(object):
+class Def(Point):
     """
     Model a Def point.
     Objects are called def_point
     """
 
-    # Please make sure to reset this for each commit
-    # (see system_diff_model.py > SystemDiff.__init__())
-    id_generator = itertools.count(start=1)
+    __slots__ = ("real_name", "callable_arguments", "actor_point", "use_points")
+    kind = "def"
 
     def __init__(
         self,
@@ -18,22 +17,16 @@ class Def(object):
         def_type,
         actor_point,
         ast,
+        context,
         prefix=None,
         suffix=None,
         preferred_name=None,
         scope=None,
         file=None,
     ):
-        self.id = f"{ast.commit_hash}_{ast.name}_def_{next(Def.id_generator)}"
-        self.ast = ast
-        self.type = def_type
-        self.scope = scope
-        self.file = file
+        super().__init__(node_data, ast, def_type, context, scope, file)
 
-        # Storing the node_data
-        self.node_data = node_data
-
-        self.real_name = self.ast.get_name(self.node_data)
+        self.real_name = ast.get_name(self.node_data)
         if self.real_name is None:
             raise DebugException(
                 f"{self.node_data['type']} requires NameGetter revisit"
@@ -48,53 +41,49 @@ class Def(object):
 
         self.callable_arguments = []
 
-        self.is_modified = node_data["operation"] != "no-op"
-        self.is_value_affected = False
-        self.is_reach_affected = False
-        self.is_upstream = False
-        self.is_in_propagation_slice = self.is_modified
-        self.is_processed_for_propagation = False
-
         # Storing actor_point
         self.actor_point = actor_point
 
-        # Locking further addition of use_points
-        # used when no further users are allowed
-        self.lock = False
-
         # Storing use_points
         self.use_points = []
 
     def set_is_modified(self):
-        self.is_modified = True
-        self.is_in_propagation_slice = True
-        self.actor_point.is_in_propagation_slice = True
+        self.set_flags(Point.MODIFIED)
+        self.set_is_in_propagation_slice()
+        self.actor_point.set_is_in_propagation_slice()
 
     def set_is_value_affected(self):
-        self.is_value_affected = True
-        self.is_in_propagation_slice = True
-        self.actor_point.is_in_propagation_slice = True
+        self.set_flags(Point.VALUE_AFFECTED)
+        self.set_is_in_propagation_slice()
+        self.actor_point.set_is_in_propagation_slice()
 
     def set_is_reach_affected(self):
-        self.is_reach_affected = True
-        self.is_in_propagation_slice = True
-        self.actor_point.is_in_propagation_slice = True
+        self.set_flags(Point.REACH_AFFECTED)
+        self.set_is_in_propagation_slice()
+        self.actor_point.set_is_in_propagation_slice()
 
     def set_is_upstream(self):
-        self.is_upstream = True
-        self.is_in_propagation_slice = True
-        self.actor_point.is_in_propagation_slice = True
+        self.set_flags(Point.UPSTREAM)
+        self.set_is_in_propagation_slice()
+        self.actor_point.set_is_in_propagation_slice()
+
+    def set_is_in_propagation_slice(self):
+        if not self.flags & Point.IN_PROPAGATION_SLICE:
+            self.set_flags(Point.IN_PROPAGATION_SLICE)
+            if not self.context.propagation_worklist is None:
+                self.context.propagation_worklist.append(self)
 
     def set_is_processed_for_propagation(self):
-        self.is_processed_for_propagation = True
+        self.set_flags(Point.PROCESSED_FOR_PROPAGATION)
 
     def add_use_point(self, use_point):
         """
         Add use_point to the list of use_points if it is a user of the self.node_data
         """
-        if not self.lock:
+        if not self.flags & Point.LOCK:
             if self.is_user(use_point):
                 self.use_points.append(use_point)
+                use_point.reaching_def_points.append(self)
 
     def is_user(self, use_point):
         """
@@ -104,7 +93,7 @@ class Def(object):
         return self.name == use_point.name
 
     def add_callable_argument(self, use_point):
-        if not self.lock:
+        if not self.flags & Point.LOCK:
             self.callable_arguments.append(use_point)
 
     def is_listed_use_point(self, use_point, *args, **kwargs):
@@ -129,8 +118,13 @@ class Def(object):
                 "node_e_pos": self.node_data["e_pos"],
                 "node_level": self.node_data["level"],
                 "actor_id": self.actor_point.id,
-                "reachability": self.actor_point.reachability,
-                "reachability_actor_ids": self.actor_point.reachability_actor_ids,
+                "reachability": self.actor_point.reachability.to_list(),
+                "reachability_actor_ids": list(
+                    map(
+                        lambda actor_point: actor_point.id,
+                        self.actor_point.reachability_actors.to_list(),
+                    )
+                ),
                 "code": self.actor_point.ast.unparse(
                     self.actor_point.node_data, masked_types=["body"]
                 ),
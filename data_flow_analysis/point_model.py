@@ -0,0 +1,126 @@
+def flag_property(flag):
+    """
+    Returns a property reading and writing the flag bit of Point.flags.
+    """
+
+    def get_flag(point):
+        return bool(point.flags & flag)
+
+    def set_flag(point, value):
+        if value:
+            point.set_flags(flag)
+        else:
+            point.clear_flags(flag)
+
+    return property(get_flag, set_flag)
+
+
+class Point(object):
+    """
+    Base model of the Actor, Def, and Use points.
+    Points are slotted, keep an integer id (id_number) rendered
+    as the string id on access, their boolean flags packed in
+    an integer (flags), and an index to the registry of ASTs
+    of their analysis context instead of the AST itself (file_index).
+    The node_data is resolved again in the registry once the AST
+    is reloaded after a spill (see AnalysisContext.set_ast()).
+    """
+
+    __slots__ = (
+        "context",
+        "id_number",
+        "file_index",
+        "flags",
+        "type",
+        "scope",
+        "file",
+        "name",
+        "cached_node_data",
+        "node_data_version",
+        "registries",
+    )
+
+    # The kind of the point used in its string id
+    kind = None
+
+    # Flag bits
+    MODIFIED = 1
+    VALUE_AFFECTED = 1 << 1
+    REACH_AFFECTED = 1 << 2
+    IMPORT_REACH_AFFECTED = 1 << 3
+    UPSTREAM = 1 << 4
+    IN_PROPAGATION_SLICE = 1 << 5
+    PROCESSED_FOR_PROPAGATION = 1 << 6
+    LOCK = 1 << 7
+
+    # Flag bits the registries of the points are indexed by (see PointRegistry)
+    INDEXED_FLAGS = (MODIFIED, IN_PROPAGATION_SLICE, PROCESSED_FOR_PROPAGATION)
+
+    is_modified = flag_property(MODIFIED)
+    is_value_affected = flag_property(VALUE_AFFECTED)
+    is_reach_affected = flag_property(REACH_AFFECTED)
+    is_import_reach_affected = flag_property(IMPORT_REACH_AFFECTED)
+    is_upstream = flag_property(UPSTREAM)
+    is_in_propagation_slice = flag_property(IN_PROPAGATION_SLICE)
+    is_processed_for_propagation = flag_property(PROCESSED_FOR_PROPAGATION)
+    lock = flag_property(LOCK)
+
+    def __init__(self, node_data, ast, point_type, context, scope=None, file=None):
+        # The AnalysisContext of the commit
+        self.context = context
+        self.id_number = context.get_next_id(self.kind)
+        if context.created_points is not None:
+            context.created_points.append(self)
+        self.file_index = context.get_file_index(ast)
+        self.type = point_type
+        self.scope = scope
+        self.file = file
+
+        # Storing the node_data
+        self.node_data = node_data
+        # The PointRegistry objects the point is registered in
+        self.registries = ()
+
+        if node_data["operation"] != "no-op":
+            self.flags = Point.MODIFIED | Point.IN_PROPAGATION_SLICE
+        else:
+            self.flags = 0
+
+    def set_flags(self, flags):
+        """
+        Sets the flag bits and indexes the point by the newly set ones
+        in its registries (see PointRegistry.get_flagged_points()).
+        """
+        new_flags = flags & ~self.flags
+        self.flags |= flags
+        if new_flags:
+            for registry in self.registries:
+                registry.index_point(self, new_flags)
+
+    def clear_flags(self, flags):
+        cleared_flags = flags & self.flags
+        self.flags &= ~flags
+        if cleared_flags:
+            for registry in self.registries:
+                registry.unindex_point(self, cleared_flags)
+
+    @property
+    def node_data(self):
+        if self.node_data_version != self.context.ast_versions[self.file_index]:
+            node_id = self.cached_node_data["id"]
+            self.node_data = self.context.get_ast(self.file_index).nodes[node_id]
+        return self.cached_node_data
+
+    @node_data.setter
+    def node_data(self, node_data):
+        self.cached_node_data = node_data
+        self.node_data_version = self.context.ast_versions[self.file_index]
+
+    @property
+    def ast(self):
+        return self.context.get_ast(self.file_index)
+
+    @property
+    def id(self):
+        commit_hash, cluster = self.context.ast_labels[self.file_index]
+        return f"{commit_hash}_{cluster}_{self.kind}_{self.id_number}"
@@ -0,0 +1,83 @@
+import itertools
+from .point_model import Point
+
+
+class PointRegistry(dict):
+    """
+    Model the registry of the points of a scope in the form of {'node_id': [Point]}.
+    Missing node ids are mapped to new empty lists (as in a defaultdict(list)).
+    Points must be registered through add_point() to keep the flat list of
+    all the points (see get_all_points()) and the indices of the points by
+    their flags (see get_flagged_points()) instead of rebuilding them on each query.
+    Registries are compared and hashed by identity.
+    """
+
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The flat list of all the points, None if it must be rebuilt
+        self.all_points = None
+        # The order of the node ids in the registry {'node_id': rank}
+        self.key_ranks = dict(map(lambda pair: pair[::-1], enumerate(self.keys())))
+        # The registered points with each of Point.INDEXED_FLAGS set
+        # in the form of {flag: set(Point)}, kept in sync by Point.set_flags()
+        self.flagged_points = dict(map(lambda flag: (flag, set()), Point.INDEXED_FLAGS))
+
+    def __missing__(self, node_id):
+        self.key_ranks[node_id] = len(self.key_ranks)
+        points = self[node_id] = []
+        return points
+
+    def add_point(self, point):
+        node_id = point.node_data["id"]
+        if (self.all_points is not None) and (not node_id in self):
+            # Points of new node ids are last in the flat list
+            self.all_points.append(point)
+        else:
+            self.all_points = None
+        self[node_id].append(point)
+        if not self in point.registries:
+            point.registries += (self,)
+            self.index_point(point, point.flags)
+
+    def index_point(self, point, flags):
+        for flag in Point.INDEXED_FLAGS:
+            if flags & flag:
+                self.flagged_points[flag].add(point)
+
+    def unindex_point(self, point, flags):
+        for flag in Point.INDEXED_FLAGS:
+            if flags & flag:
+                self.flagged_points[flag].discard(point)
+
+    def get_all_points(self):
+        """
+        Returns the list of all the points ordered by the first registration of
+        their node ids and then by their registration. The list must not be modified.
+        """
+        if self.all_points is None:
+            self.all_points = list(itertools.chain.from_iterable(self.values()))
+        return self.all_points
+
+    def get_point_rank(self, point):
+        """
+        Returns the rank of the first registration of the point in self.get_all_points().
+        """
+        node_id = point.node_data["id"]
+        return (self.key_ranks[node_id], self[node_id].index(point))
+
+    def get_flagged_points(self, flag):
+        """
+        Returns the points with the flag (one of Point.INDEXED_FLAGS) set
+        in the order of self.get_all_points(), without scanning all the points.
+        """
+        entries = []
+        for point in self.flagged_points[flag]:
+            node_id = point.node_data["id"]
+            for index, registered_point in enumerate(self[node_id]):
+                if registered_point is point:
+                    entries.append(((self.key_ranks[node_id], index), point))
+        entries.sort(key=lambda entry: entry[0])
+        return list(map(lambda entry: entry[1], entries))
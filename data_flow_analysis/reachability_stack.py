@@ -0,0 +1,45 @@
+class ReachabilityStack(object):
+    """
+    Model an immutable reachability stack.
+    Stacks are persistent cons-lists: pushing and popping return new
+    stacks that share their tails, so actors under the same conditions
+    hold the same stack object instead of their own copies.
+    Iterating a stack yields its items from the top to the bottom.
+    """
+
+    __slots__ = ("top", "rest", "length", "masks")
+
+    def __init__(self, top=None, rest=None, *args, **kwargs):
+        self.top = top
+        self.rest = rest
+        self.length = 0 if rest is None else rest.length + 1
+        # Cache of the bitsets of the stacked conditions
+        # (see AnalysisContext.get_condition_masks())
+        self.masks = None
+
+    def push(self, item):
+        return ReachabilityStack(item, self)
+
+    def pop(self, last_n=1):
+        stack = self
+        for _ in range(min(last_n, self.length)):
+            stack = stack.rest
+        return stack
+
+    def replace_top(self, item):
+        return self.rest.push(item)
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        stack = self
+        while stack.rest is not None:
+            yield stack.top
+            stack = stack.rest
+
+    def to_list(self):
+        """
+        Returns the items from the bottom to the top of the stack.
+        """
+        return list(self)[::-1]
@@ -1,16 +1,15 @@
-import itertools
 from utils.exceptions import DebugException
+from .point_model import Point
 
 
-class Use(object):
+class Use(Point):
     """
     Model a Use point.
     Objects are called use_point
     """
 
-    # Please make sure to reset this for each commit
-    # (see system_diff_model.py > SystemDiff.__init__())
-    id_generator = itertools.count(start=1)
+    __slots__ = ("real_name", "reaching_def_points", "actor_point")
+    kind = "use"
 
     def __init__(
         self,
@@ -18,20 +17,14 @@ class Use(object):
         use_type,
         actor_point,
         ast,
+        context,
         preferred_name=None,
         scope=None,
         file=None,
     ):
-        self.id = f"{ast.commit_hash}_{ast.name}_use_{next(Use.id_generator)}"
-        self.ast = ast
-        self.type = use_type
-        self.scope = scope
-        self.file = file
+        super().__init__(node_data, ast, use_type, context, scope, file)
 
-        # Storing the node_data
-        self.node_data = node_data
-
-        self.real_name = self.ast.get_name(self.node_data)
+        self.real_name = ast.get_name(self.node_data)
         if self.real_name is None:
             raise DebugException(
                 f"{self.node_data['type']} requires NameGetter revisit"
@@ -40,38 +33,41 @@ class Use(object):
             self.name = preferred_name
         else:
             self.name = self.real_name
-        self.is_modified = node_data["operation"] != "no-op"
-        self.is_value_affected = False
-        self.is_reach_affected = False
-        self.is_upstream = False
-        self.is_in_propagation_slice = self.is_modified
-        self.is_processed_for_propagation = False
+        # Storing the def_points this use_point is registered to
+        # (see Def.add_use_point())
+        self.reaching_def_points = []
 
         # Storing actor_point
         self.actor_point = actor_point
 
     def set_is_modified(self):
-        self.is_modified = True
-        self.is_in_propagation_slice = True
-        self.actor_point.is_in_propagation_slice = True
+        self.set_flags(Point.MODIFIED)
+        self.set_is_in_propagation_slice()
+        self.actor_point.set_is_in_propagation_slice()
 
     def set_is_value_affected(self):
-        self.is_value_affected = True
-        self.is_in_propagation_slice = True
-        self.actor_point.is_in_propagation_slice = True
+        self.set_flags(Point.VALUE_AFFECTED)
+        self.set_is_in_propagation_slice()
+        self.actor_point.set_is_in_propagation_slice()
 
     def set_is_reach_affected(self):
-        self.is_reach_affected = True
-        self.is_in_propagation_slice = True
-        self.actor_point.is_in_propagation_slice = True
+        self.set_flags(Point.REACH_AFFECTED)
+        self.set_is_in_propagation_slice()
+        self.actor_point.set_is_in_propagation_slice()
 
     def set_is_upstream(self):
-        self.is_upstream = True
-        self.is_in_propagation_slice = True
-        self.actor_point.is_in_propagation_slice = True
+        self.set_flags(Point.UPSTREAM)
+        self.set_is_in_propagation_slice()
+        self.actor_point.set_is_in_propagation_slice()
+
+    def set_is_in_propagation_slice(self):
+        if not self.flags & Point.IN_PROPAGATION_SLICE:
+            self.set_flags(Point.IN_PROPAGATION_SLICE)
+            if not self.context.propagation_worklist is None:
+                self.context.propagation_worklist.append(self)
 
     def set_is_processed_for_propagation(self):
-        self.is_processed_for_propagation = True
+        self.set_flags(Point.PROCESSED_FOR_PROPAGATION)
 
     def is_user_of(self, def_point):
         """
@@ -97,8 +93,13 @@ class Use(object):
                 "node_e_pos": self.node_data["e_pos"],
                 "node_level": self.node_data["level"],
                 "actor_id": self.actor_point.id,
-                "reachability": self.actor_point.reachability,
-                "reachability_actor_ids": self.actor_point.reachability_actor_ids,
+                "reachability": self.actor_point.reachability.to_list(),
+                "reachability_actor_ids": list(
+                    map(
+                        lambda actor_point: actor_point.id,
+                        self.actor_point.reachability_actors.to_list(),
+                    )
+                ),
                 "code": self.actor_point.ast.unparse(
                     self.actor_point.node_data, masked_types=["body"]
                 ),
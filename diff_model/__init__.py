@@ -1,2 +1,3 @@
 from .ast_model import AST, ASTSlice
 from .diff_model import ASTDiff
+from .spill_store import ASTDiffSpillStore, PendingASTDiff, SpilledASTDiff
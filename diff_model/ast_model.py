@@ -7,10 +7,12 @@ from networkx.readwrite import json_graph
 from functools import reduce
 import importlib
 from copy import deepcopy
-from utils.helpers import parse_label
+import numpy as np
+from utils.helpers import parse_label, encode_column, decode_column
 from utils.exceptions import (
     MissingRootException,
     ConfigurationException,
+    MissingArgumentsException,
 )
 
 
@@ -19,6 +21,19 @@ class AST(nx.DiGraph):
     Represents a build specification file state (version).
     """
 
+    # Node attributes stored as columns by AST.to_state()
+    state_attributes = [
+        "id",
+        "operation",
+        "type",
+        "content",
+        "s_pos",
+        "e_pos",
+        "label",
+        "color",
+        "level",
+    ]
+
     def __init__(
         self,
         *args,
@@ -37,6 +52,7 @@ class AST(nx.DiGraph):
         self.LANGUAGE = LANGUAGE
         self.ROOT_TYPE = language_support_tools.ROOT_TYPE
         self.IGNORED_TYPES = language_support_tools.IGNORED_TYPES
+        self.COMMAND_TYPES = language_support_tools.COMMAND_TYPES
 
         self.diff = diff
 
@@ -54,6 +70,9 @@ class AST(nx.DiGraph):
         for node in none_nodes:
             self.remove_node(node[0])
 
+        # Compact node indices (used by the match tables of ASTDiff)
+        self.set_node_indices()
+
         # Set node attributes
         # The head of the AST (self.ROOT_TYPE) has level=0.
         self.set_node_attributes()
@@ -72,6 +91,12 @@ class AST(nx.DiGraph):
         self.set_slice()
 
         # Set up language support tools
+        self.set_language_support_tools(language_support_tools)
+
+        # Per-node slots (see self.precompute_node_properties())
+        self.clear_node_slots()
+
+    def set_language_support_tools(self, language_support_tools):
         self.extended_processor = language_support_tools.ExtendedProcessor(self)
         self.unparser = language_support_tools.Unparser(self)
         self.node_names = language_support_tools.NameGetter(self)
@@ -96,6 +121,16 @@ class AST(nx.DiGraph):
         )
         nx.relabel_nodes(self, self.node_id_map, copy=False)
 
+    def set_node_indices(self, *args, **kwargs):
+        """
+        Sets self.node_ids as the list of node ids in the order of the nodes
+        and self.node_index as the {'node_id': index} map into self.node_ids.
+        """
+        self.node_ids = list(self.nodes)
+        self.node_index = dict(
+            map(lambda pair: (pair[1], pair[0]), enumerate(self.node_ids))
+        )
+
     def set_node_attributes(self, *args, **kwargs):
         """
         Parses node label and cleans it into a dict of {'node_id': dict(nod_data)}
@@ -195,19 +230,142 @@ class AST(nx.DiGraph):
         except IndexError:
             return {}
 
+    def clear_node_slots(self, *args, **kwargs):
+        """
+        Resets the per-node slots, indexed by the compact node indices.
+        Empty slots are computed by the language support tools on access.
+        """
+        self.unparsed_slots = [None] * len(self.node_ids)
+        self.name_slots = [None] * len(self.node_ids)
+        self.actor_slots = [None] * len(self.node_ids)
+        self.summary_slots = [None] * len(self.node_ids)
+        self.sorted_children_slots = [None] * len(self.node_ids)
+        self.command_identifier_slots = [None] * len(self.node_ids)
+        # Only set during self.apply_extended_processing()
+        self.subtree_affected_slots = None
+
+    def precompute_node_properties(self, *args, **kwargs):
+        """
+        Fills the per-node slots in a single post-order traversal of the AST,
+        so that each node is visited once and the slots of the children are
+        available when their parent is processed:
+            - whether the subtree of the node includes an affected node
+              (all nodes, and nodes not of self.IGNORED_TYPES),
+            - the unparsed code,
+            - the command identifier of the nodes of self.COMMAND_TYPES,
+            - the name,
+            - the actor (node_data, actor_type) of the node types the
+              language-specific ActorGetter supports (see NodeVisitor.is_precomputed()),
+            - the stringified summary of the affected nodes to summarize.
+        Commands missing their expected arguments keep an empty name slot.
+        """
+        self.subtree_affected_slots = [None] * len(self.node_ids)
+        post_ordered_node_ids = reduce(
+            lambda a, b: [*a, *b],
+            map(
+                lambda root_id: list(nx.dfs_postorder_nodes(self, root_id)),
+                self.root.keys(),
+            ),
+            [],
+        )
+        for node_id in post_ordered_node_ids:
+            index = self.node_index[node_id]
+            node_data = self.nodes[node_id]
+
+            is_affected = node_data["operation"] != "no-op"
+            any_affected = is_affected
+            counted_affected = is_affected and (
+                node_data["type"] not in self.IGNORED_TYPES
+            )
+            for child_id in self.successors(node_id):
+                child_any, child_counted = self.subtree_affected_slots[
+                    self.node_index[child_id]
+                ]
+                any_affected = any_affected or child_any
+                counted_affected = counted_affected or child_counted
+            self.subtree_affected_slots[index] = (any_affected, counted_affected)
+
+            self.unparse(node_data)
+            if node_data["type"] in self.COMMAND_TYPES:
+                self.get_command_identifier(node_data)
+            try:
+                self.name_slots[index] = self.node_names.visit(node_data)
+            except MissingArgumentsException:
+                # Commands missing their expected arguments are not named ahead of time
+                pass
+            if self.node_actors.is_precomputed(node_data):
+                self.actor_slots[index] = self.node_actors.visit(node_data)
+            if (node_id in self.affected_nodes) and (
+                node_data["type"] not in self.IGNORED_TYPES
+            ):
+                self.summary_slots[index] = self.stringifier.visit(node_data)
+
+    def apply_extended_processing(self, *args, **kwargs):
+        """
+        Precomputes the node properties and runs the extended processor
+        over the AST.
+        The subtree flags reflect the node operations at the start of the
+        processing and are dropped once done.
+        """
+        self.precompute_node_properties()
+        self.extended_processor.visit(self.get_data(self.root))
+        self.subtree_affected_slots = None
+
+    def is_subtree_affected(self, head_data, include_ignored=True, *args, **kwargs):
+        """
+        Returns True if any node in the subtree with head_data as the head
+        is affected (operation other than "no-op").
+        Nodes of self.IGNORED_TYPES are skipped if include_ignored is False.
+        """
+        index = self.node_index.get(head_data["id"])
+        if (self.subtree_affected_slots is not None) and (index is not None):
+            flags = self.subtree_affected_slots[index]
+            if flags is not None:
+                return flags[0] if include_ignored else flags[1]
+
+        affected_nodes = filter(
+            lambda node_data: (node_data["operation"] != "no-op")
+            and (include_ignored or node_data["type"] not in self.IGNORED_TYPES),
+            self.get_subtree_nodes(head_data).values(),
+        )
+        for _ in affected_nodes:
+            return True
+        return False
+
     def get_name(self, node_data, *args, **kwargs):
         """
         Returns the proper name of the node based on language-specific rules
         for data flow analysis
         """
-        return self.node_names.visit(node_data)
+        index = self.node_index.get(node_data["id"])
+        if index is None:
+            return self.node_names.visit(node_data)
+        if self.name_slots[index] is None:
+            self.name_slots[index] = self.node_names.visit(node_data)
+        return self.name_slots[index]
 
     def get_actor(self, node_data, *args, **kwaargs):
         """
         Returns the proper actor that consumes the node based on language-specific rules
         for data flow analysis
         """
-        return self.node_actors.visit(node_data)
+        index = self.node_index.get(node_data["id"])
+        if index is None:
+            return self.node_actors.visit(node_data)
+        if self.actor_slots[index] is None:
+            self.actor_slots[index] = self.node_actors.visit(node_data)
+        return self.actor_slots[index]
+
+    def stringify(self, node_data, *args, **kwargs):
+        """
+        Returns the stringified summary of the node for summarization
+        """
+        index = self.node_index.get(node_data["id"])
+        if index is None:
+            return self.stringifier.visit(node_data)
+        if self.summary_slots[index] is None:
+            self.summary_slots[index] = self.stringifier.visit(node_data)
+        return self.summary_slots[index]
 
     def get_location(self, node_data, *args, **kwargs):
         """
@@ -271,6 +429,24 @@ class AST(nx.DiGraph):
             )
         )
 
+    def get_sorted_children(self, node_data, *args, **kwargs):
+        """
+        Returns the list of the children's node_data sorted by position.
+        The list is cached in the per-node slots and must not be modified.
+        """
+        index = self.node_index.get(node_data["id"])
+        if index is None:
+            return sorted(
+                self.get_children(node_data).values(),
+                key=lambda child_data: child_data["s_pos"],
+            )
+        if self.sorted_children_slots[index] is None:
+            self.sorted_children_slots[index] = sorted(
+                self.get_children(node_data).values(),
+                key=lambda child_data: child_data["s_pos"],
+            )
+        return self.sorted_children_slots[index]
+
     def get_children_by_type(self, node_data, child_type, *args, **kwargs):
         """
         Returns the children of the node with child_type as a dict of {'node_id': dict(nod_data)}
@@ -436,8 +612,32 @@ class AST(nx.DiGraph):
         """
         Unparses the nodes in a subtree with the head_data as the root
         and returns a naive stringification of the parsed subtree.
-        """
-        return self.unparser.visit(head_data, masked_types)
+        Unmasked unparsing is cached in the per-node slots.
+        """
+        if masked_types:
+            return self.unparser.visit(head_data, masked_types)
+        index = self.node_index.get(head_data["id"])
+        if index is None:
+            return self.unparser.visit(head_data, masked_types)
+        if self.unparsed_slots[index] is None:
+            self.unparsed_slots[index] = self.unparser.visit(head_data, masked_types)
+        return self.unparsed_slots[index]
+
+    def get_command_identifier(self, node_data, *args, **kwargs):
+        """
+        Returns the upper-cased identifier of a node of self.COMMAND_TYPES,
+        used to dispatch the command to its visitor function.
+        The identifier is cached in the per-node slots.
+        """
+        index = self.node_index.get(node_data["id"])
+        if (index is None) or (self.command_identifier_slots[index] is None):
+            command_identifier = self.get_data(
+                self.get_children_by_type(node_data, "identifier")
+            )["content"].upper()
+            if index is None:
+                return command_identifier
+            self.command_identifier_slots[index] = command_identifier
+        return self.command_identifier_slots[index]
 
     def update_summarization_status(self, head_data, method, *args, **kwargs):
         """
@@ -479,6 +679,223 @@ class AST(nx.DiGraph):
         self.summarized_nodes = dict()
         self.set_slice()
 
+    def to_state(self, *args, **kwargs):
+        """
+        Returns the compact state of the AST as a dictionary of
+        columns over the compact node indices (see AST.from_state()).
+        Node labels are not stored as they are rebuilt from the other attributes.
+        """
+        nodes = list(map(lambda node_id: self.nodes[node_id], self.node_ids))
+        extra_attributes = dict(
+            filter(
+                lambda pair: pair[1],
+                map(
+                    lambda pair: (
+                        pair[0],
+                        dict(
+                            filter(
+                                lambda attr: attr[0] not in self.state_attributes,
+                                pair[1].items(),
+                            )
+                        ),
+                    ),
+                    enumerate(nodes),
+                ),
+            )
+        )
+        return {
+            "name": self.name,
+            "graph": dict(self.graph),
+            "file_path": self.file_path,
+            "file_saved_as": self.file_saved_as,
+            "commit_hash": self.commit_hash,
+            "LANGUAGE": self.LANGUAGE,
+            "node_ids": self.node_ids,
+            "types": encode_column(map(lambda node_data: node_data["type"], nodes)),
+            "contents": list(map(lambda node_data: node_data["content"], nodes)),
+            "operations": encode_column(
+                map(lambda node_data: node_data["operation"], nodes)
+            ),
+            "colors": encode_column(map(lambda node_data: node_data["color"], nodes)),
+            "s_pos": np.fromiter(
+                map(lambda node_data: node_data["s_pos"], nodes), np.int64, len(nodes)
+            ),
+            "e_pos": np.fromiter(
+                map(lambda node_data: node_data["e_pos"], nodes), np.int64, len(nodes)
+            ),
+            # -1 for nodes not reached from the root
+            "levels": np.fromiter(
+                map(lambda node_data: node_data.get("level", -1), nodes),
+                np.int32,
+                len(nodes),
+            ),
+            "extra_attributes": extra_attributes,
+            # Attribute key orders, kept for identical exports
+            "attribute_orders": encode_column(
+                map(lambda node_data: tuple(node_data.keys()), nodes)
+            ),
+            "edges": np.array(
+                list(
+                    map(
+                        lambda edge: (
+                            self.node_index[edge[0]],
+                            self.node_index[edge[1]],
+                        ),
+                        self.edges,
+                    )
+                ),
+                np.int32,
+            ).reshape(-1, 2),
+            "edge_attributes": list(map(lambda edge: edge[-1], self.edges.data())),
+            "root": list(map(lambda node_id: self.node_index[node_id], self.root)),
+            "depth": self.depth,
+            "affected_nodes": np.fromiter(
+                map(lambda node_id: self.node_index[node_id], self.affected_nodes),
+                np.int32,
+                len(self.affected_nodes),
+            ),
+            "summarized_nodes": dict(
+                map(
+                    lambda pair: (
+                        pair[0],
+                        list(map(lambda node_id: self.node_index[node_id], pair[1])),
+                    ),
+                    self.summarized_nodes.items(),
+                )
+            ),
+            "unparsed_slots": self.unparsed_slots,
+            "name_slots": self.name_slots,
+            "actor_slots": list(
+                map(
+                    lambda actor: (
+                        None
+                        if actor is None
+                        else (self.node_index[actor[0]["id"]], actor[1])
+                    ),
+                    self.actor_slots,
+                )
+            ),
+            "summary_slots": self.summary_slots,
+            "command_identifier_slots": self.command_identifier_slots,
+        }
+
+    @classmethod
+    def from_state(cls, state, diff=None, *args, **kwargs):
+        """
+        Rebuilds an AST from the output of AST.to_state()
+        without parsing its labels or processing its nodes again.
+        """
+        ast = cls.__new__(cls)
+        nx.DiGraph.__init__(ast)
+        ast.graph.update(state["graph"])
+
+        language_support_tools = importlib.import_module(
+            f"language_supports.{state['LANGUAGE']}"
+        )
+        ast.LANGUAGE = state["LANGUAGE"]
+        ast.ROOT_TYPE = language_support_tools.ROOT_TYPE
+        ast.IGNORED_TYPES = language_support_tools.IGNORED_TYPES
+        ast.COMMAND_TYPES = language_support_tools.COMMAND_TYPES
+
+        ast.diff = diff
+        ast.file_path = state["file_path"]
+        ast.file_saved_as = state["file_saved_as"]
+        ast.commit_hash = state["commit_hash"]
+
+        # Raw GumTree ids are only needed to build the match tables
+        ast.node_id_map = dict()
+        ast.node_ids = state["node_ids"]
+        ast.node_index = dict(
+            map(lambda pair: (pair[1], pair[0]), enumerate(ast.node_ids))
+        )
+
+        types = decode_column(*state["types"])
+        operations = decode_column(*state["operations"])
+        colors = decode_column(*state["colors"])
+        attribute_orders = decode_column(*state["attribute_orders"])
+        for index, node_id in enumerate(ast.node_ids):
+            node_data = {
+                **state["extra_attributes"].get(index, {}),
+                "id": node_id,
+                "operation": operations[index],
+                "type": types[index],
+                "content": state["contents"][index],
+                "s_pos": int(state["s_pos"][index]),
+                "e_pos": int(state["e_pos"][index]),
+                "label": f"cluster: {state['name']}\ntype: {types[index]}\n"
+                + f"content: {state['contents'][index]}\n"
+                + f'postion: {state["s_pos"][index]}-{state["e_pos"][index]}',
+                "color": colors[index],
+            }
+            if state["levels"][index] >= 0:
+                node_data["level"] = int(state["levels"][index])
+            ast.add_node(
+                node_id,
+                **dict(map(lambda key: (key, node_data[key]), attribute_orders[index])),
+            )
+        ast.add_edges_from(
+            map(
+                lambda pair: (
+                    ast.node_ids[pair[1][0]],
+                    ast.node_ids[pair[1][1]],
+                    state["edge_attributes"][pair[0]],
+                ),
+                enumerate(state["edges"]),
+            )
+        )
+
+        ast.root = dict(
+            map(
+                lambda index: (ast.node_ids[index], ast.nodes[ast.node_ids[index]]),
+                state["root"],
+            )
+        )
+        ast.depth = state["depth"]
+        ast.affected_nodes = dict(
+            map(
+                lambda index: (ast.node_ids[index], ast.nodes[ast.node_ids[index]]),
+                state["affected_nodes"],
+            )
+        )
+        ast.summarized_nodes = dict(
+            map(
+                lambda pair: (
+                    pair[0],
+                    dict(
+                        map(
+                            lambda index: (
+                                ast.node_ids[index],
+                                ast.nodes[ast.node_ids[index]],
+                            ),
+                            pair[1],
+                        )
+                    ),
+                ),
+                state["summarized_nodes"].items(),
+            )
+        )
+        ast.set_slice()
+
+        ast.set_language_support_tools(language_support_tools)
+
+        ast.unparsed_slots = state["unparsed_slots"]
+        ast.name_slots = state["name_slots"]
+        ast.actor_slots = list(
+            map(
+                lambda actor: (
+                    None
+                    if actor is None
+                    else (ast.nodes[ast.node_ids[actor[0]]], actor[1])
+                ),
+                state["actor_slots"],
+            )
+        )
+        ast.summary_slots = state["summary_slots"]
+        ast.sorted_children_slots = [None] * len(ast.node_ids)
+        ast.command_identifier_slots = state["command_identifier_slots"]
+        ast.subtree_affected_slots = None
+        return ast
+
     def export_json(self, save_path):
         save_path = Path(save_path / self.file_saved_as)
         save_path.mkdir(parents=True, exist_ok=True)
@@ -525,6 +942,7 @@ class ASTSlice(AST):
         self.LANGUAGE = LANGUAGE
         self.ROOT_TYPE = language_support_tools.ROOT_TYPE
         self.IGNORED_TYPES = language_support_tools.IGNORED_TYPES
+        self.COMMAND_TYPES = language_support_tools.COMMAND_TYPES
 
         self.diff = diff
 
@@ -537,6 +955,10 @@ class ASTSlice(AST):
             nx.set_node_attributes(self, nodes)
 
         self.name = name
+        # Slices have no compact node indices, properties are not cached
+        self.node_ids = list()
+        self.node_index = dict()
+        self.clear_node_slots()
         self.set_root()
         self.depth = max(
             [0] + list(map(lambda node: node[1].get("level") + 1, self.nodes.items()))
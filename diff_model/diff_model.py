@@ -1,6 +1,7 @@
 import networkx as nx
+import numpy as np
 import pandas as pd
-import importlib, json
+import importlib, json, pickle
 from pathlib import Path
 from copy import deepcopy
 from .ast_model import AST
@@ -16,6 +17,10 @@ class ASTDiff(object):
     and the dictionary {source_node: destination_node} of matched nodes.
     """
 
+    # Version of the saved ASTDiff states (see ASTDiff.save_state()),
+    # to be increased whenever the state or the AST processing changes.
+    STATE_VERSION = 1
+
     def __init__(
         self,
         source,
@@ -84,18 +89,12 @@ class ASTDiff(object):
             self.destination.clear_node_operarions()
 
             # Set up matches (all nodes in source and destination match)
-            self.source_match = dict(
-                map(
-                    lambda node_id: (
-                        f"{self.file_saved_as}:{node_id}",
-                        f'{self.file_saved_as}:{node_id.replace("_src_", "_dst_")}',
-                    ),
-                    source.nodes,
-                )
-            )
-            self.destination_match = dict(
-                map(lambda pair: (pair[1], pair[0]), self.source_match.items())
-            )
+            # Both ASTs are built from the same graph, so the node at index i
+            # of the source matches the node at index i of the destination
+            # and no match table is stored.
+            self.identity_match = True
+            self.source_match_indices = None
+            self.destination_match_indices = None
 
         # If change affects the file:
         else:
@@ -115,24 +114,208 @@ class ASTDiff(object):
                 LANGUAGE=self.LANGUAGE,
                 diff=self,
             )
-            self.source_match = dict(
-                map(
-                    lambda pair: (
-                        self.source.node_id_map[pair[0]],
-                        self.destination.node_id_map[pair[1]],
-                    ),
-                    matches.items(),
-                )
+            self.identity_match = False
+            self.set_match_indices(matches)
+
+        # Destination first, its updates are propagated to the source matches
+        self.destination.apply_extended_processing()
+        self.source.apply_extended_processing()
+        self.summary = dict()
+
+    def to_state(self, *args, **kwargs):
+        """
+        Returns the compact state of the ASTDiff as a dictionary
+        of its ASTs' states and the match tables (see ASTDiff.from_state()).
+        """
+        return {
+            "LANGUAGE": self.LANGUAGE,
+            "file_action": self.file_action,
+            "file_path": self.file_path,
+            "file_saved_as": self.file_saved_as,
+            "commit_hash": self.commit_hash,
+            "source": self.source.to_state(),
+            "destination": self.destination.to_state(),
+            "identity_match": self.identity_match,
+            "source_match_indices": self.source_match_indices,
+            "destination_match_indices": self.destination_match_indices,
+            "summary": self.summary,
+        }
+
+    @classmethod
+    def from_state(cls, state, *args, **kwargs):
+        """
+        Rebuilds an ASTDiff from the output of ASTDiff.to_state()
+        without reading the GumTree output again.
+        """
+        diff = cls.__new__(cls)
+        language_support_tools = importlib.import_module(
+            f"language_supports.{state['LANGUAGE']}"
+        )
+        diff.LANGUAGE = state["LANGUAGE"]
+        diff.IGNORED_TYPES = language_support_tools.IGNORED_TYPES
+
+        diff.file_action = state["file_action"]
+        diff.file_path = state["file_path"]
+        diff.file_saved_as = state["file_saved_as"]
+        diff.commit_hash = state["commit_hash"]
+
+        diff.source = AST.from_state(state["source"], diff)
+        diff.destination = AST.from_state(state["destination"], diff)
+
+        diff.identity_match = state["identity_match"]
+        diff.source_match_indices = state["source_match_indices"]
+        diff.destination_match_indices = state["destination_match_indices"]
+        diff.summary = state["summary"]
+        return diff
+
+    def save_state(self, path, *args, **kwargs):
+        """
+        Saves the state of the ASTDiff (see ASTDiff.to_state()) to the file in path
+        as a pickle, which is read back in full by ASTDiff.load_state().
+        """
+        with open(path, "wb") as f:
+            pickle.dump(
+                {"version": self.STATE_VERSION, "state": self.to_state()},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+
+    @classmethod
+    def load_state(cls, path, *args, **kwargs):
+        """
+        Rebuilds an ASTDiff from the pickle saved by ASTDiff.save_state().
+        Returns None if the file is missing, unreadable, or of another STATE_VERSION.
+        """
+        try:
+            with open(path, "rb") as f:
+                saved = pickle.load(f)
+        except Exception:
+            return None
+        if saved.get("version") != cls.STATE_VERSION:
+            return None
+        return cls.from_state(saved["state"])
+
+    def get_node_count(self, *args, **kwargs):
+        """
+        Returns the total number of nodes in the ASTs of the diff.
+        """
+        return len(self.source.node_ids) + len(self.destination.node_ids)
+
+    def set_match_indices(self, matches, *args, **kwargs):
+        """
+        Sets the compact match tables from the GumTree matches
+        (the dictionary {source_node: destination_node} of raw node ids).
+        self.source_match_indices[i] is the index of the destination match of
+        the source node at index i (-1 if not matched), and vice versa for
+        self.destination_match_indices.
+        Matches of nodes that are removed from the ASTs are dropped.
+        """
+        self.source_match_indices = np.full(len(self.source.node_ids), -1, np.int32)
+        self.destination_match_indices = np.full(
+            len(self.destination.node_ids), -1, np.int32
+        )
+        for source_node, destination_node in matches.items():
+            source_index = self.source.node_index.get(
+                self.source.node_id_map.get(source_node)
             )
-            self.destination_match = dict(
-                map(lambda pair: (pair[1], pair[0]), self.source_match.items())
+            destination_index = self.destination.node_index.get(
+                self.destination.node_id_map.get(destination_node)
             )
+            if source_index is None or destination_index is None:
+                continue
+            self.source_match_indices[source_index] = destination_index
+            self.destination_match_indices[destination_index] = source_index
+
+    def get_match_index(self, node_data, *args, **kwargs):
+        """
+        Returns the AST of the other cluster and the index of
+        the match of the node in it as a pair of AST, int.
+        Returns None, -1 if no match exists.
+        """
+        if node_data["id"] in self.source.node_index:
+            index = self.source.node_index[node_data["id"]]
+            if self.identity_match:
+                return self.destination, index
+            match_index = int(self.source_match_indices[index])
+            if match_index < 0:
+                return None, -1
+            return self.destination, match_index
+
+        if node_data["id"] in self.destination.node_index:
+            index = self.destination.node_index[node_data["id"]]
+            if self.identity_match:
+                return self.source, index
+            match_index = int(self.destination_match_indices[index])
+            if match_index < 0:
+                return None, -1
+            return self.source, match_index
+
+        return None, -1
+
+    def get_match_index_pairs(self, *args, **kwargs):
+        """
+        Returns the matched nodes as the paired arrays of
+        (source indices, destination indices), ordered by source index.
+        """
+        if self.identity_match:
+            source_indices = np.arange(len(self.source.node_ids))
+            return source_indices, source_indices
+        source_indices = np.flatnonzero(self.source_match_indices >= 0)
+        return source_indices, self.source_match_indices[source_indices]
 
-        self.destination.extended_processor.visit(
-            self.destination.get_data(self.destination.root)
+    def iter_matches(self, cluster="source", *args, **kwargs):
+        """
+        Returns an iterator over the matched nodes of the cluster as
+        pairs of (node_id, match_node_id), ordered by source index.
+        """
+        source_indices, destination_indices = self.get_match_index_pairs()
+        pairs = zip(
+            map(lambda index: self.source.node_ids[index], source_indices),
+            map(lambda index: self.destination.node_ids[index], destination_indices),
         )
-        self.source.extended_processor.visit(self.source.get_data(self.source.root))
-        self.summary = dict()
+        if cluster == "destination":
+            return map(lambda pair: (pair[1], pair[0]), pairs)
+        return pairs
+
+    def get_matches_of(self, node_ids, cluster="source", *args, **kwargs):
+        """
+        Returns the list of pairs of (node_id, match_node_id) of the matched nodes
+        among the node_ids of the cluster, ordered by source index (as self.iter_matches()).
+        Only the node_ids are probed against the match tables.
+        """
+        if cluster == "source":
+            ast, match_ast = self.source, self.destination
+            match_indices = self.source_match_indices
+        else:
+            ast, match_ast = self.destination, self.source
+            match_indices = self.destination_match_indices
+        matches = []
+        for node_id in node_ids:
+            index = ast.node_index.get(node_id)
+            if index is None:
+                continue
+            match_index = index if self.identity_match else int(match_indices[index])
+            if match_index < 0:
+                continue
+            source_index = index if cluster == "source" else match_index
+            matches.append((source_index, node_id, match_ast.node_ids[match_index]))
+        return list(map(lambda match: match[1:], sorted(matches)))
+
+    @property
+    def source_match(self):
+        """
+        The dictionary {source_node_id: destination_node_id} of the matches.
+        Built from the match tables on access, meant for exports.
+        """
+        return dict(self.iter_matches("source"))
+
+    @property
+    def destination_match(self):
+        """
+        The dictionary {destination_node_id: source_node_id} of the matches.
+        Built from the match tables on access, meant for exports.
+        """
+        return dict(self.iter_matches("destination"))
 
     def get_match(self, node_data, *args, **kwargs):
         """
@@ -140,16 +323,12 @@ class ASTDiff(object):
         as a dict of {'node_id': dict(nod_data)}.
         Returns dict() if no match exists.
         """
+        match_AST, match_index = self.get_match_index(node_data)
+        if match_AST is None:
+            return dict()
 
-        if node_data["id"] in self.source_match:
-            match_id = self.source_match[node_data["id"]]
-            return {match_id: self.destination.nodes[match_id]}
-
-        if node_data["id"] in self.destination_match:
-            match_id = self.destination_match[node_data["id"]]
-            return {match_id: self.source.nodes[match_id]}
-
-        return dict()
+        match_id = match_AST.node_ids[match_index]
+        return {match_id: match_AST.nodes[match_id]}
 
     def summarize(self, method="SUBTREE", *args, **kwargs):
         """
@@ -229,7 +408,7 @@ class ASTDiff(object):
             {
                 "operation": "deleted",
                 "source_node": node_data["type"],
-                "source_node_summary": self.source.stringifier.visit(node_data),
+                "source_node_summary": self.source.stringify(node_data),
                 "source_position": f'{node_data["s_pos"]}-{node_data["e_pos"]}',
                 "destination_node": None,
                 "destination_node_summary": None,
@@ -254,9 +433,7 @@ class ASTDiff(object):
                 "source_node_summary": None,
                 "source_position": None,
                 "destination_node": node_data["type"],
-                "destination_node_summary": self.destination.stringifier.visit(
-                    node_data
-                ),
+                "destination_node_summary": self.destination.stringify(node_data),
                 "destination_postion": f'{node_data["s_pos"]}-{node_data["e_pos"]}',
             }
         )
@@ -289,10 +466,10 @@ class ASTDiff(object):
             {
                 "operation": movement_type,
                 "source_node": source_node["type"],
-                "source_node_summary": self.source.stringifier.visit(source_node),
+                "source_node_summary": self.source.stringify(source_node),
                 "source_position": f'{source_node["s_pos"]}-{source_node["e_pos"]}',
                 "destination_node": destination_node["type"],
-                "destination_node_summary": self.destination.stringifier.visit(
+                "destination_node_summary": self.destination.stringify(
                     destination_node
                 ),
                 "destination_postion": f'{destination_node["s_pos"]}-{destination_node["e_pos"]}',
@@ -316,10 +493,10 @@ class ASTDiff(object):
             {
                 "operation": "updated",
                 "source_node": source_node["type"],
-                "source_node_summary": self.source.stringifier.visit(source_node),
+                "source_node_summary": self.source.stringify(source_node),
                 "source_position": f'{source_node["s_pos"]}-{source_node["e_pos"]}',
                 "destination_node": destination_node["type"],
-                "destination_node_summary": self.destination.stringifier.visit(
+                "destination_node_summary": self.destination.stringify(
                     destination_node
                 ),
                 "destination_postion": f'{destination_node["s_pos"]}-{destination_node["e_pos"]}',
@@ -335,16 +512,11 @@ class ASTDiff(object):
         as a pair of AST, dict(nod_data).
         Returns None, dict() if no match exists.
         """
+        match_AST, match_index = self.get_match_index(node_data)
+        if match_AST is None:
+            return None, dict()
 
-        if node_data["id"] in self.source_match:
-            match_id = self.source_match[node_data["id"]]
-            return self.destination, self.destination.nodes[match_id]
-
-        if node_data["id"] in self.destination_match:
-            match_id = self.destination_match[node_data["id"]]
-            return self.source, self.source.nodes[match_id]
-
-        return None, dict()
+        return match_AST, match_AST.nodes[match_AST.node_ids[match_index]]
 
     def export_json(self, save_path):
         save_path = Path(save_path) / "diffs"
@@ -367,7 +539,7 @@ class ASTDiff(object):
             list(
                 map(
                     lambda pair: {"source": pair[0], "destination": pair[1]},
-                    self.source_match.items(),
+                    self.iter_matches("source"),
                 )
             )
         )
@@ -0,0 +1,71 @@
+import mmap, pickle
+from pathlib import Path
+
+
+class PendingASTDiff(object):
+    """
+    Placeholder of an ASTDiff that is not built yet.
+    The ASTDiff is built when the file is first loaded (see SystemDiff.load_file_diff()).
+    """
+
+    pass
+
+
+class SpilledASTDiff(object):
+    """
+    Placeholder of an ASTDiff that is spilled to an ASTDiffSpillStore.
+    Holds the location of the ASTDiff state in the store.
+    """
+
+    def __init__(self, offset, size, node_count, *args, **kwargs):
+        self.offset = offset
+        self.size = size
+        self.node_count = node_count
+
+
+class ASTDiffSpillStore(object):
+    """
+    Append-only file of ASTDiff states (see ASTDiff.to_state())
+    used to keep the ASTDiffs of a commit out of memory.
+    States are read back through a memory map of the file.
+    The file is removed when the store is closed.
+    """
+
+    # Estimated memory footprint of a resident AST node (in bytes)
+    NODE_FOOTPRINT = 2048
+
+    def __init__(self, path, *args, **kwargs):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.file = open(self.path, "w+b")
+        self.size = 0
+        self.map = None
+
+    def write(self, state, *args, **kwargs):
+        """
+        Appends the state to the store and returns its (offset, size).
+        """
+        blob = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        offset = self.size
+        self.file.seek(offset)
+        self.file.write(blob)
+        self.file.flush()
+        self.size += len(blob)
+        return offset, len(blob)
+
+    def read(self, offset, size, *args, **kwargs):
+        """
+        Returns the state stored at offset.
+        """
+        if self.map is None or len(self.map) < offset + size:
+            if self.map is not None:
+                self.map.close()
+            self.map = mmap.mmap(self.file.fileno(), self.size, access=mmap.ACCESS_READ)
+        return pickle.loads(self.map[offset : offset + size])
+
+    def close(self, *args, **kwargs):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+        self.path.unlink(missing_ok=True)
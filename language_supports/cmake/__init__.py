@@ -28,4 +28,8 @@ IGNORED_TYPES = [
     '"',
     "",
 ]
+# Nodes of type listed in COMMAND_TYPES are dispatched
+# by their identifier (see AST.get_command_identifier())
+COMMAND_TYPES = ["normal_command"]
+
 BASIC_TYPES = [ROOT_TYPE]
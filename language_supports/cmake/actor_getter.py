@@ -141,6 +141,24 @@ class ActorGetter(NodeVisitor):
         "while_clause",
         "endwhile_clause",
     ]
+    # The actors and the nodes always consumed by an actor
+    # (statements and comments outside the actors are consumed by no actor)
+    precomputed_types = argument_actor_types + [
+        "identifier",
+        "arguments",
+        "condition",
+        "bracket_argument",
+        "quoted_argument",
+        "unquoted_argument",
+        "quoted_element",
+        "variable_ref",
+        "normal_var",
+        "env_var",
+        "cache_var",
+        "variable",
+        "gen_exp",
+        "escape_sequence",
+    ]
 
     def generic_visit(self, node_data):
         if node_data["type"] == "normal_command":
@@ -158,12 +176,14 @@ class ActorGetter(NodeVisitor):
         elif node_data["type"] in self.conditional_types:
             return node_data, "conditional"
 
-        actor_node_data = max(
-            filter(
-                lambda ancestor_data: ancestor_data["type"]
-                in self.argument_actor_types,
-                self.ast.get_ancestors(node_data).values(),
-            ),
-            key=lambda ancestor_data: ancestor_data["level"],
-        )
-        return self.generic_visit(actor_node_data)
+        # The closest ancestor that consumes the node as an argument
+        actor_node_data = self.ast.get_data(self.ast.get_parent(node_data))
+        while actor_node_data and (
+            actor_node_data["type"] not in self.argument_actor_types
+        ):
+            actor_node_data = self.ast.get_data(self.ast.get_parent(actor_node_data))
+        if not actor_node_data:
+            raise ValueError(
+                f"No actor found for {node_data['type']}{self.ast.get_location(node_data)}"
+            )
+        return self.ast.get_actor(actor_node_data)
@@ -1,11 +1,6 @@
 import data_flow_analysis as cm
 import pandas as pd
-from utils.configurations import (
-    PROJECT_SPECIFIC_PATH_RESOLUTION,
-    ROOT_PATH,
-    EXECUTE_CALLABLES,
-    VERBOSE,
-)
+from utils.configurations import ROOT_PATH
 from utils.exceptions import MissingArgumentsException, DebugException
 
 # CMake Modules based on the official documentation
@@ -17,8 +12,19 @@ with open(ROOT_PATH / "language_supports/cmake/cmake_modules.txt", "r") as f:
 
 
 class ConditionalDefUseChains(cm.ConditionalDefUseChains):
-    manual_resolution = PROJECT_SPECIFIC_PATH_RESOLUTION
     exclude_resolutions = CMAKE_MODULES
+    # Commands analyzing other files, whose effects are visible to the rest of the file.
+    # Project-specific supports add the commands they load files with.
+    import_commands = {"INCLUDE", "ADD_SUBDIRECTORY", "SUBDIRS", "FIND_PACKAGE"}
+
+    @property
+    def manual_resolution(self):
+        return self.context.path_resolutions
+
+    @property
+    def manual_resolution_index(self):
+        # {('caller_file_path', 'callee_file_path'): [callee_resolved_path]}
+        return self.context.path_resolution_index
 
     def register_new_def_point(
         self,
@@ -51,6 +57,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
             def_type,
             actor_point,
             self.ast,
+            self.context,
             prefix=prefix,
             suffix=suffix,
             preferred_name=preferred_name,
@@ -58,8 +65,8 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
             file=self.ast.file_saved_as,
         )
         actor_point.add_def_point(def_point)
-        target_scope.def_points[def_point.node_data["id"]].append(def_point)
-        target_scope.defined_names[def_point.name].append(def_point)
+        target_scope.def_points.add_point(def_point)
+        target_scope.add_defined_name(def_point)
         return def_point
 
     def compare_reachability_conditions(self, def_point, use_point):
@@ -73,34 +80,34 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
                     "?" (unable to find a concrete relation between)
 
         The comparison is NAIVE.
+        Conditions are compared as bitsets of interned conditions (see AnalysisContext.get_condition_masks()).
         """
         if isinstance(def_point, list) and isinstance(use_point, list):
-            def_conditions = set(def_point)
-            use_conditions = set(def_point)
+            def_conditions, negated_def_conditions = self.context.get_condition_masks(
+                def_point
+            )
+            use_conditions, negated_use_conditions = self.context.get_condition_masks(
+                def_point
+            )
         else:
             if def_point.type == "PROPERTY" or use_point.type == "PROPERTY":
                 return "?"
 
-            def_conditions = set(def_point.actor_point.reachability)
-            use_conditions = set(use_point.actor_point.reachability)
-
-        def_conditions.difference_update({""})
-        use_conditions.difference_update({""})
+            def_conditions = def_point.actor_point.reachability_mask
+            negated_def_conditions = def_point.actor_point.negated_reachability_mask
+            use_conditions = use_point.actor_point.reachability_mask
+            negated_use_conditions = use_point.actor_point.negated_reachability_mask
 
         if def_conditions == use_conditions:
             return "="
-        if def_conditions.issubset(use_conditions):
+        if not (def_conditions & ~use_conditions):
             return "<"
-        if use_conditions.issubset(def_conditions):
+        if not (use_conditions & ~def_conditions):
             return ">"
 
-        if set(map(lambda cond: f"NOT ({cond})", def_conditions)).intersection(
-            use_conditions
-        ):
+        if negated_def_conditions & use_conditions:
             return "!"
-        if set(map(lambda cond: f"NOT ({cond})", use_conditions)).intersection(
-            def_conditions
-        ):
+        if negated_use_conditions & def_conditions:
             return "!"
 
         return "?"
@@ -144,21 +151,46 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
         file_path = file_path.strip('"').strip("'")
         file_path = file_path.replace(" ", "")
 
-        resolved_path_item = list(
-            filter(
-                lambda item: (item["caller_file_path"] in [self.ast.file_path, "*"])
-                and (item["callee_file_path"] == file_path),
-                self.manual_resolution,
-            )
+        # Resolutions for the caller file take precedence over the ones for "*"
+        resolved_paths = self.manual_resolution_index.get(
+            (self.ast.file_path, file_path)
         )
-        if len(resolved_path_item) == 1:
-            return True, resolved_path_item[0]["callee_resolved_path"]
-        if len(resolved_path_item) > 1:
+        if resolved_paths is None:
+            resolved_paths = self.manual_resolution_index.get(("*", file_path), [])
+        if len(resolved_paths) == 1:
+            return True, resolved_paths[0]
+        if len(resolved_paths) > 1:
             raise Exception(
                 "Please make sure you do not provide two PROJECT_SPECIFIC_PATH_RESOLUTION items with the same caller_file_path and callee_file_path."
             )
         return False, None
 
+    def get_resolutions_by_pattern(self, starts_with=(), ends_with=(), depth=None):
+        """
+        Returns the (file_key, resolution) pairs of the file path resolution map
+        of the cluster whose file_key starts with any of starts_with, ends with
+        any of ends_with, and has depth components (if set), in the order of the map.
+        The pairs are cached for the commit (see SystemDiff.get_resolutions_by_pattern()).
+        """
+        return self.sysdiff.get_resolutions_by_pattern(
+            self.ast.name, starts_with, ends_with, depth
+        )
+
+    def get_resolutions_by_suffix(self, suffix):
+        """
+        Returns the resolutions of the file paths ending with "/" + suffix
+        in the order of the file path resolution map of the cluster.
+        """
+        resolution_map = self.sysdiff.file_path_resolution_map[self.ast.name]
+        return list(
+            map(
+                lambda file_key: resolution_map[file_key],
+                self.sysdiff.file_path_suffix_index[self.ast.name].get_paths_by_suffix(
+                    suffix
+                ),
+            )
+        )
+
     def resolve_find_package_module_mode_file_path(self, file_path_node):
         """
         Returns (success_flag, resolution)
@@ -192,40 +224,13 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
         if candidate_path in resolution_map:
             return True, [resolution_map[candidate_path]]
 
-        file_keys = list(
-            map(
-                lambda file_key: ("/" + file_key.strip("/")),
-                resolution_map.keys(),
-            )
-        )
-
-        desparate_list = list(
-            filter(
-                lambda file_key: file_key.endswith(
-                    "/" + current_directory + candidate_path
-                ),
-                file_keys,
-            )
-        )
-        if desparate_list:
-            return True, list(
-                map(
-                    lambda file_key: resolution_map[file_key.strip("/")], desparate_list
-                )
-            )
+        resolutions = self.get_resolutions_by_suffix(current_directory + candidate_path)
+        if resolutions:
+            return True, resolutions
 
-        desparate_list = list(
-            filter(
-                lambda file_key: file_key.endswith("/" + candidate_path),
-                file_keys,
-            )
-        )
-        if desparate_list:
-            return True, list(
-                map(
-                    lambda file_key: resolution_map[file_key.strip("/")], desparate_list
-                )
-            )
+        resolutions = self.get_resolutions_by_suffix(candidate_path)
+        if resolutions:
+            return True, resolutions
 
         return False, None
 
@@ -275,44 +280,17 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
                 success = True
                 found_files.append(resolution_map[candidate_path])
 
-            file_keys = list(
-                map(
-                    lambda file_key: ("/" + file_key.strip("/")),
-                    resolution_map.keys(),
-                )
+            resolutions = self.get_resolutions_by_suffix(
+                current_directory + candidate_path
             )
-
-            desparate_list = list(
-                filter(
-                    lambda file_key: file_key.endswith(
-                        "/" + current_directory + candidate_path
-                    ),
-                    file_keys,
-                )
-            )
-            if desparate_list:
+            if resolutions:
                 success = True
-                found_files = found_files + list(
-                    map(
-                        lambda file_key: resolution_map[file_key.strip("/")],
-                        desparate_list,
-                    )
-                )
+                found_files = found_files + resolutions
 
-            desparate_list = list(
-                filter(
-                    lambda file_key: file_key.endswith("/" + candidate_path),
-                    file_keys,
-                )
-            )
-            if desparate_list:
+            resolutions = self.get_resolutions_by_suffix(candidate_path)
+            if resolutions:
                 success = True
-                found_files = found_files + list(
-                    map(
-                        lambda file_key: resolution_map[file_key.strip("/")],
-                        desparate_list,
-                    )
-                )
+                found_files = found_files + resolutions
 
         if success:
             return True, found_files
@@ -352,40 +330,13 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
         if candidate_path in resolution_map:
             return True, [resolution_map[candidate_path]]
 
-        file_keys = list(
-            map(
-                lambda file_key: ("/" + file_key.strip("/")),
-                resolution_map.keys(),
-            )
-        )
-
-        desparate_list = list(
-            filter(
-                lambda file_key: file_key.endswith(
-                    "/" + current_directory + candidate_path
-                ),
-                file_keys,
-            )
-        )
-        if desparate_list:
-            return True, list(
-                map(
-                    lambda file_key: resolution_map[file_key.strip("/")], desparate_list
-                )
-            )
+        resolutions = self.get_resolutions_by_suffix(current_directory + candidate_path)
+        if resolutions:
+            return True, resolutions
 
-        desparate_list = list(
-            filter(
-                lambda file_key: file_key.endswith("/" + candidate_path),
-                file_keys,
-            )
-        )
-        if desparate_list:
-            return True, list(
-                map(
-                    lambda file_key: resolution_map[file_key.strip("/")], desparate_list
-                )
-            )
+        resolutions = self.get_resolutions_by_suffix(candidate_path)
+        if resolutions:
+            return True, resolutions
 
         return False, None
 
@@ -488,68 +439,23 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
         if candidate_path + ".cmake" in resolution_map:
             return True, [resolution_map[candidate_path + ".cmake"]]
 
-        file_keys = list(
-            map(
-                lambda file_key: ("/" + file_key.strip("/")),
-                resolution_map.keys(),
-            )
-        )
-
-        desparate_list = list(
-            filter(
-                lambda file_key: file_key.endswith(
-                    "/" + current_directory + candidate_path
-                ),
-                file_keys,
-            )
-        )
-        if desparate_list:
-            return True, list(
-                map(
-                    lambda file_key: resolution_map[file_key.strip("/")], desparate_list
-                )
-            )
+        resolutions = self.get_resolutions_by_suffix(current_directory + candidate_path)
+        if resolutions:
+            return True, resolutions
 
-        desparate_list = list(
-            filter(
-                lambda file_key: file_key.endswith(
-                    "/" + current_directory + candidate_path + ".cmake"
-                ),
-                file_keys,
-            )
+        resolutions = self.get_resolutions_by_suffix(
+            current_directory + candidate_path + ".cmake"
         )
-        if desparate_list:
-            return True, list(
-                map(
-                    lambda file_key: resolution_map[file_key.strip("/")], desparate_list
-                )
-            )
+        if resolutions:
+            return True, resolutions
 
-        desparate_list = list(
-            filter(
-                lambda file_key: file_key.endswith("/" + candidate_path),
-                file_keys,
-            )
-        )
-        if desparate_list:
-            return True, list(
-                map(
-                    lambda file_key: resolution_map[file_key.strip("/")], desparate_list
-                )
-            )
+        resolutions = self.get_resolutions_by_suffix(candidate_path)
+        if resolutions:
+            return True, resolutions
 
-        desparate_list = list(
-            filter(
-                lambda file_key: file_key.endswith("/" + candidate_path + ".cmake"),
-                file_keys,
-            )
-        )
-        if desparate_list:
-            return True, list(
-                map(
-                    lambda file_key: resolution_map[file_key.strip("/")], desparate_list
-                )
-            )
+        resolutions = self.get_resolutions_by_suffix(candidate_path + ".cmake")
+        if resolutions:
+            return True, resolutions
 
         return False, None
 
@@ -588,48 +494,21 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
         if candidate_path + "/CMakeLists.txt" in resolution_map:
             return True, [resolution_map[candidate_path + "/CMakeLists.txt"]]
 
-        file_keys = list(
-            map(
-                lambda file_key: ("/" + file_key.strip("/")),
-                resolution_map.keys(),
-            )
-        )
-
-        desparate_list = list(
-            filter(
-                lambda file_key: file_key.endswith(
-                    "/" + current_directory + candidate_path + "/CMakeLists.txt"
-                ),
-                file_keys,
-            )
+        resolutions = self.get_resolutions_by_suffix(
+            current_directory + candidate_path + "/CMakeLists.txt"
         )
-        if desparate_list:
-            return True, list(
-                map(
-                    lambda file_key: resolution_map[file_key.strip("/")], desparate_list
-                )
-            )
+        if resolutions:
+            return True, resolutions
 
-        desparate_list = list(
-            filter(
-                lambda file_key: file_key.endswith(
-                    "/" + candidate_path + "/CMakeLists.txt"
-                ),
-                file_keys,
-            )
-        )
-        if desparate_list:
-            return True, list(
-                map(
-                    lambda file_key: resolution_map[file_key.strip("/")], desparate_list
-                )
-            )
+        resolutions = self.get_resolutions_by_suffix(candidate_path + "/CMakeLists.txt")
+        if resolutions:
+            return True, resolutions
 
         return False, None
 
     def log_file_path_resolution(self, command, log_type, node_data, found_paths=[]):
         sep = "\n\t\t"
-        if VERBOSE:
+        if self.context.verbose:
             if log_type == "EXCLUDE_CMAKE_MODULE":
                 print(
                     f"{command} resolution excluded a CMake module for {self.ast.unparse(node_data)} called from {self.ast.file_path}\n\tresolved to {found_paths[0]}"
@@ -662,6 +541,112 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
                 )
             return
 
+    def analyze_child_scope(self, node_data, target_ast):
+        """
+        Analyzes the file of target_ast imported by the node_data command
+        in a new child scope.
+        """
+        child_scope = self.sysdiff.ConditionalDefUseChains(
+            target_ast,
+            self.sysdiff,
+            scope=self.scope + "/" + node_data["id"],
+            parent_scope=self,
+            global_scope=self.global_scope,
+        )
+        self.add_child_scope(child_scope)
+        self.sysdiff.append_to_chains(child_scope)
+
+        # Working on added file
+        child_scope.analyze()
+        self.sysdiff.set_data_flow_file_analysis(
+            child_scope.ast.file_path, child_scope.ast.name
+        )
+        # Finished working on added file
+
+    def is_analyzable_in_forked_process(self, target_ast):
+        """
+        Returns True if the child scope of the file of target_ast can be analyzed
+        in a forked process (see SystemDiff.fork_child_scope_analysis()),
+        i.e., if its analysis has no effects on the scopes analyzed after it.
+        """
+        return (
+            self.sysdiff.is_forking_child_scopes()
+            and (not isinstance(self, CallableConditionalDefUseChains))
+            and (not self.sysdiff.is_child_scope_analysis_pending(target_ast.file_path))
+            and self.is_self_contained(target_ast, target_ast.get_data(target_ast.root))
+        )
+
+    def is_self_contained(
+        self, ast, head_data, check_parent_scope=True, visited_callables=None
+    ):
+        """
+        Returns True if the subtree of head_data in the ast (and the bodies of the
+        callables it calls, as defined so far) defines no callables, runs none of
+        self.import_commands, and sets no variable of the parent scope.
+        Function bodies set the variables of their caller's scope,
+        so they are checked with check_parent_scope=False.
+        """
+        if visited_callables is None:
+            visited_callables = set()
+        if head_data["type"] == ast.ROOT_TYPE:
+            nodes = ast.nodes.values()
+        else:
+            nodes = ast.get_subtree_nodes(head_data).values()
+        for node_data in nodes:
+            if node_data["id"] == head_data["id"]:
+                continue
+            if node_data["type"] in ["function_definition", "macro_definition"]:
+                return False
+            if (
+                check_parent_scope
+                and (node_data["type"] == "unquoted_argument")
+                and (ast.unparse(node_data).upper() == "PARENT_SCOPE")
+            ):
+                return False
+            if not node_data["type"] in ast.COMMAND_TYPES:
+                continue
+            command_identifier = ast.get_command_identifier(node_data)
+            if command_identifier in self.import_commands:
+                return False
+            if command_identifier in self.dispatch_table:
+                continue
+            callable_def_points = filter(
+                lambda def_point: def_point.type in ["FUNCTION", "MACRO"],
+                self.get_definitions_by_name(ast.get_name(node_data)),
+            )
+            for def_point in callable_def_points:
+                if def_point.node_data["id"] in visited_callables:
+                    continue
+                visited_callables.add(def_point.node_data["id"])
+                if not self.is_self_contained(
+                    def_point.ast,
+                    def_point.node_data,
+                    def_point.type == "MACRO",
+                    visited_callables,
+                ):
+                    return False
+        return True
+
+    def merge_forked_child_scopes(self, node_data):
+        """
+        Merges the child scopes analyzed in forked processes, unless the command
+        following node_data is an add_subdirectory() whose child scope can be
+        analyzed alongside (see SystemDiff.merge_child_scope_analyses()).
+        """
+        if not self.sysdiff.child_scope_analyses:
+            return
+        siblings = self.ast.get_sorted_children(
+            self.ast.get_data(self.ast.get_parent(node_data))
+        )
+        sibling_ids = list(map(lambda sibling: sibling["id"], siblings))
+        next_siblings = siblings[sibling_ids.index(node_data["id"]) + 1 :][:1]
+        if not (
+            next_siblings
+            and next_siblings[0]["type"] in self.ast.COMMAND_TYPES
+            and self.ast.get_command_identifier(next_siblings[0]) == "ADD_SUBDIRECTORY"
+        ):
+            self.sysdiff.merge_child_scope_analyses()
+
     def visit_function_definition(self, node_data, *args, **kwargs):
         """
         #CALLABLE_DEF_SITE_NOTICE:
@@ -674,7 +659,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
 
         # TODO (Medium)
         # return self.process_callable_definition_location(node_data, def_point)
-        if VERBOSE:
+        if self.context.verbose:
             print(
                 "CALLABLE_DEF_SITE_NOTICE: We do not process the definition location of a FUNCTION callable."
             )
@@ -711,7 +696,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
 
         # # TODO (Medium)
         # # return self.process_callable_definition_location(node_data, def_point)
-        if VERBOSE:
+        if self.context.verbose:
             print(
                 "CALLABLE_DEF_SITE_NOTICE: We do not process the definition location of a MACRO callable."
             )
@@ -816,7 +801,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
                 parent_scope=self,
                 global_scope=self.global_scope,
             )
-            self.children.append(child_scope)
+            self.add_child_scope(child_scope)
             self.sysdiff.append_to_chains(child_scope)
 
             child_scope.visit(body_data)
@@ -829,11 +814,9 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
                             var_name, False
                         )
                         for def_point in def_points:
-                            self.defined_names[var_name].append(def_point)
-                            self.def_points[def_point.node_data["id"]].append(def_point)
-                            self.actor_points[
-                                def_point.actor_point.node_data["id"]
-                            ].append(def_point.actor_point)
+                            self.add_defined_name(def_point, var_name)
+                            self.def_points.add_point(def_point)
+                            self.add_actor_point(def_point.actor_point)
 
         else:
             return self.generic_visit(node_data, *args, **kwargs)
@@ -1012,18 +995,23 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
         self.generic_visit(condition_node_data, actor_point)
         self.generic_visit(body_node_data, *args, **kwargs)
 
+        self.lock_def_point(def_point)
+
+    def lock_def_point(self, def_point):
+        """
+        Stops adding use points and callable arguments to the def_point,
+        e.g., to the loop variable of a foreach() once its body is visited.
+        """
         def_point.lock = True
 
     def visit_endforeach_clause(self, node_data, *args, **kwargs):
         return
 
     def visit_normal_command(self, node_data, *args, **kwargs):
-        command_identifier = self.ast.unparse(
-            self.ast.get_data(self.ast.get_children_by_type(node_data, "identifier"))
-        ).upper()
-        method = f"visit_{command_identifier}"
-        visitor = getattr(self, method, self.visit_user_defined_normal_command)
-        return visitor(node_data)
+        visitor = self.dispatch_table.get(self.ast.get_command_identifier(node_data))
+        if visitor is None:
+            return self.visit_user_defined_normal_command(node_data)
+        return visitor(self, node_data)
 
     def visit_user_defined_normal_command(self, node_data):
         actor_point = self.register_new_actor_point(
@@ -1036,7 +1024,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
         self.generic_visit(node_data, actor_point)
         # self.parent_names_available = temp_flag
         if len(def_points) > 0:
-            if EXECUTE_CALLABLES:
+            if self.context.execute_callables:
                 list(
                     map(
                         lambda def_point: self.process_callable_call_location(
@@ -1107,7 +1095,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
                 self.register_new_def_point(arguments[i + 1], actor_point, "VARIABLE")
                 continue
             if self.ast.unparse(argument).upper() == "CALL":
-                if VERBOSE:
+                if self.context.verbose:
                     print(
                         f"Support needed for command arguments for CALL keyword in {self.ast.unparse(node_data)}, called from {self.ast.file_path}"
                     )
@@ -1118,7 +1106,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
         self.generic_visit(node_data, actor_point)
 
     def visit_CMAKE_PARSE_ARGUMENTS(self, node_data):
-        if VERBOSE:
+        if self.context.verbose:
             print(f"CMAKE_PARSE_ARGUMENTS called in a non-callable scope.")
 
     def visit_CMAKE_PATH(self, node_data):
@@ -1274,7 +1262,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
         )
 
         # For file-level analysis (No system provided)
-        if self.sysdiff.analysis_mode == "change_location":
+        if self.context.analysis_mode == "change_location":
             return
 
         module_mode = True
@@ -1410,11 +1398,11 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
 
         if node_data["operation"] in ["added", "deleted"]:
             self.add_condition_to_reachability_stack(node_data, actor_point)
-        self.ast_stack.append(self.ast)
+        self.ast_stack.append(self.ast_index)
 
         for resolution in found_files:
             # For files with GumTree error
-            if self.sysdiff.file_data[resolution]["diff"] is None:
+            if self.sysdiff.load_file_diff(resolution) is None:
                 self.log_file_path_resolution(
                     "FIND_PACKAGE", "PARSER_ERROR", node_data, found_paths=[resolution]
                 )
@@ -1443,16 +1431,16 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
             self.sysdiff.file_data[resolution]["language_specific_info"][
                 "importers"
             ].append(node_data["id"])
-            self.ast = getattr(
-                self.sysdiff.file_data[resolution]["diff"], self.ast.name
-            )
+            self.ast = getattr(self.sysdiff.load_file_diff(resolution), self.ast.name)
 
             # Working on included file
+            self.sysdiff.pin_file_diff(resolution)
             self.generic_visit(self.ast.get_data(self.ast.root))
             self.sysdiff.set_data_flow_file_analysis(self.ast.file_path, self.ast.name)
+            self.sysdiff.unpin_file_diff(resolution)
             # Finished working on included file
 
-        self.ast = self.ast_stack.pop()
+        self.ast_index = self.ast_stack.pop()
         if node_data["operation"] in ["added", "deleted"]:
             self.remove_condition_from_reachability_stack()
 
@@ -1510,7 +1498,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
 
         for i, argument in enumerate(arguments):
             if self.ast.unparse(argument).upper() == "PROGRAM_ARGS":
-                if VERBOSE:
+                if self.context.verbose:
                     print(
                         f"Support needed for command arguments for PROGRAM_ARGS keyword in {self.ast.unparse(node_data)}, called from {self.ast.file_path}"
                     )
@@ -1553,7 +1541,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
                 break
 
         # For file-level analysis (No system provided)
-        if self.sysdiff.analysis_mode == "change_location":
+        if self.context.analysis_mode == "change_location":
             return
 
         included_file_path = self.ast.unparse(arguments[0])
@@ -1601,11 +1589,11 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
 
         if node_data["operation"] in ["added", "deleted"]:
             self.add_condition_to_reachability_stack(node_data, actor_point)
-        self.ast_stack.append(self.ast)
+        self.ast_stack.append(self.ast_index)
 
         for resolution in included_files:
             # For files with GumTree error
-            if self.sysdiff.file_data[resolution]["diff"] is None:
+            if self.sysdiff.load_file_diff(resolution) is None:
                 self.log_file_path_resolution(
                     "INCLUDE", "PARSER_ERROR", node_data, found_paths=[resolution]
                 )
@@ -1634,16 +1622,16 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
             self.sysdiff.file_data[resolution]["language_specific_info"][
                 "importers"
             ].append(node_data["id"])
-            self.ast = getattr(
-                self.sysdiff.file_data[resolution]["diff"], self.ast.name
-            )
+            self.ast = getattr(self.sysdiff.load_file_diff(resolution), self.ast.name)
 
             # Working on included file
+            self.sysdiff.pin_file_diff(resolution)
             self.generic_visit(self.ast.get_data(self.ast.root))
             self.sysdiff.set_data_flow_file_analysis(self.ast.file_path, self.ast.name)
+            self.sysdiff.unpin_file_diff(resolution)
             # Finished working on included file
 
-        self.ast = self.ast_stack.pop()
+        self.ast_index = self.ast_stack.pop()
         if node_data["operation"] in ["added", "deleted"]:
             self.remove_condition_from_reachability_stack()
 
@@ -1733,7 +1721,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
         except MissingArgumentsException:
             return
 
-        if VERBOSE:
+        if self.context.verbose:
             print(
                 f"Support needed for PROPAGATE keyword in {self.ast.unparse(node_data)}, called from {self.ast.file_path}"
             )
@@ -1754,7 +1742,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
 
         for argument in arguments:
             if self.ast.unparse(argument).upper() == "PROGRAM":
-                if VERBOSE:
+                if self.context.verbose:
                     print(
                         f"Support needed for command arguments for PROGRAM keyword in {self.ast.unparse(node_data)}, called from {self.ast.file_path}"
                     )
@@ -1940,7 +1928,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
         )
 
         # NOTE from documentations: Definitions are specified using the syntax VAR or VAR=value
-        if VERBOSE:
+        if self.context.verbose:
             print(
                 f"Support needed for definitions in {self.ast.unparse(node_data)}, called from {self.ast.file_path}"
             )
@@ -1959,7 +1947,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
             self.register_new_use_point(arguments[1], actor_point, "DELIVERABLE")
             self.register_new_def_point(arguments[1], actor_point, "DELIVERABLE")
 
-        if VERBOSE:
+        if self.context.verbose:
             print(
                 f"Support needed for depndencies and command arguments in {self.ast.unparse(node_data)}, called from {self.ast.file_path}"
             )
@@ -2006,7 +1994,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
 
         self.register_new_def_point(arguments[0], actor_point, "DELIVERABLE")
 
-        if VERBOSE:
+        if self.context.verbose:
             print(
                 f"Support needed for depndencies and command arguments in {self.ast.unparse(node_data)}, called from {self.ast.file_path}"
             )
@@ -2022,7 +2010,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
         # except MissingArgumentsException:
         #     pass
 
-        if VERBOSE:
+        if self.context.verbose:
             print(
                 f"Support needed for definitions in {self.ast.unparse(node_data)}, called from {self.ast.file_path}"
             )
@@ -2110,7 +2098,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
         arguments = self.get_sorted_arguments_data_list(node_data, "ADD_SUBDIRECTORY")
 
         # For file-level analysis (No system provided)
-        if self.sysdiff.analysis_mode == "change_location":
+        if self.context.analysis_mode == "change_location":
             return
 
         (
@@ -2125,6 +2113,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
                 self.log_file_path_resolution(
                     "ADD_SUBDIRECTORY", "NOT_FOUND", node_data
                 )
+                self.merge_forked_child_scopes(node_data)
                 return
 
         if isinstance(added_files, str):
@@ -2133,6 +2122,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
                 self.log_file_path_resolution(
                     "ADD_SUBDIRECTORY", "MANUAL_SKIP", node_data
                 )
+                self.merge_forked_child_scopes(node_data)
                 return
             else:
                 raise Exception(
@@ -2151,7 +2141,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
 
         for resolution in added_files:
             # For files with GumTree error
-            if self.sysdiff.file_data[resolution]["diff"] is None:
+            if self.sysdiff.load_file_diff(resolution) is None:
                 self.log_file_path_resolution(
                     "ADD_SUBDIRECTORY",
                     "PARSER_ERROR",
@@ -2187,30 +2177,20 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
                 "importers"
             ].append(node_data["id"])
 
-            target_ast = getattr(
-                self.sysdiff.file_data[resolution]["diff"], self.ast.name
-            )
-            child_scope = self.sysdiff.ConditionalDefUseChains(
-                target_ast,
-                self.sysdiff,
-                scope=self.scope + "/" + node_data["id"],
-                parent_scope=self,
-                global_scope=self.global_scope,
-            )
-            self.children.append(child_scope)
-            self.sysdiff.append_to_chains(child_scope)
-
-            # Working on added file
-            child_scope.analyze()
-            self.sysdiff.set_data_flow_file_analysis(
-                child_scope.ast.file_path, child_scope.ast.name
-            )
-            # Finished working on added file
+            target_ast = getattr(self.sysdiff.load_file_diff(resolution), self.ast.name)
+            if self.is_analyzable_in_forked_process(target_ast):
+                self.sysdiff.fork_child_scope_analysis(self, node_data, target_ast)
+                continue
+            # Child scopes analyzed in forked processes precede this one
+            self.sysdiff.merge_child_scope_analyses()
+            self.analyze_child_scope(node_data, target_ast)
 
         # Remove from reachability stack
         if node_data["operation"] in ["added", "deleted"]:
             self.remove_condition_from_reachability_stack()
 
+        self.merge_forked_child_scopes(node_data)
+
     def visit_ADD_TEST(self, node_data):
         actor_point = self.register_new_actor_point(node_data)
         self.generic_visit(node_data, actor_point)
@@ -2222,7 +2202,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
         else:
             self.register_new_def_point(arguments[0], actor_point, "TEST")
 
-        if VERBOSE:
+        if self.context.verbose:
             print(
                 f"Support needed for command arguments in {self.ast.unparse(node_data)}, called from {self.ast.file_path}"
             )
@@ -2313,7 +2293,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
                     self.register_new_use_point(argument, actor_point, "DELIVERABLE")
 
         if operation in ["EXPORT", "PACKAGE"]:
-            if VERBOSE:
+            if self.context.verbose:
                 print(
                     f"Support needed for PACKAGE & EXPORT keywords in {self.ast.unparse(node_data)}, called from {self.ast.file_path}"
                 )
@@ -2467,7 +2447,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
                         break
                     self.register_new_use_point(arg, actor_point, "DELIVERABLE")
 
-        if VERBOSE:
+        if self.context.verbose:
             print(
                 f"Support needed (partial) for {self.ast.unparse(node_data)}, called from {self.ast.file_path}"
             )
@@ -2482,7 +2462,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
 
         # arguments = self.get_sorted_arguments_data_list(node_data, "LINK_LIBRARIES")
 
-        if VERBOSE:
+        if self.context.verbose:
             print(
                 f"Support needed for {self.ast.unparse(node_data)}, called from {self.ast.file_path}"
             )
@@ -2518,7 +2498,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
 
         # arguments = self.get_sorted_arguments_data_list(node_data, "REMOVE_DEFINITIONS")
 
-        if VERBOSE:
+        if self.context.verbose:
             print(
                 f"Support needed for definitions in {self.ast.unparse(node_data)}, called from {self.ast.file_path}"
             )
@@ -2618,7 +2598,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
         self.register_new_use_point(arguments[0], actor_point, "DELIVERABLE")
         self.register_new_def_point(arguments[0], actor_point, "DELIVERABLE")
 
-        if VERBOSE:
+        if self.context.verbose:
             print(
                 f"Support needed for definitions in {self.ast.unparse(node_data)}, called from {self.ast.file_path}"
             )
@@ -2894,52 +2874,84 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
         This method must be implemented in the language support subclass. As the result,
         Def/Use/Actor objects that are affected have their .is_in_propagation_slice attribute set to True.
         """
-        if VERBOSE:
+        if self.context.verbose:
             print(f"QUERY scope in process: {self.scope}")
         # Downward Slicing is transitive
         self.slice_downwards()
         # Upward Slicing is not transitive
         self.slice_upwards()
+        self.propagation_slice = pd.DataFrame(self.propagation_rules)
         return self.propagation_slice
 
     def update_propagation_rules(self, entries):
-        if not entries:
-            return
-        new_propagation_rules = pd.DataFrame(entries)
-        self.propagation_slice = pd.concat(
-            [self.propagation_slice, new_propagation_rules], ignore_index=True
-        )
-        # else:
-        #     self.propagation_slice = new_propagation_rules
+        """
+        Adds the new entries to self.propagation_rules, skipping duplicates.
+        """
+        for entry in entries:
+            key = tuple(entry.values())
+            if key in self.propagation_rule_keys:
+                continue
+            self.propagation_rule_keys.add(key)
+            self.propagation_rules.append(entry)
 
-        self.propagation_slice.drop_duplicates(ignore_index=True, inplace=True)
+    def set_up_propagation_worklist(self):
+        """
+        Collects the points of the chain that are in the propagation slice
+        from the flag indices of the registries of the chain.
+        Points entering the propagation slice during the slicing are reported
+        through the propagation_worklist of the analysis context.
+        """
+        self.propagation_worklist = []
+        self.context.propagation_worklist = self.propagation_worklist
 
-    def get_all_non_processed_actor_points(self):
-        return list(
-            filter(
-                lambda point: (not point.is_processed_for_propagation)
-                and (point.is_in_propagation_slice),
-                self.get_all_actor_points(),
+        self.propagation_registries = {
+            "actor": self.actor_points,
+            "def": self.def_points,
+            "use": self.use_points,
+        }
+        self.propagation_candidates = dict(
+            map(
+                lambda pair: (
+                    pair[0],
+                    set(pair[1].flagged_points[cm.Point.IN_PROPAGATION_SLICE]),
+                ),
+                self.propagation_registries.items(),
             )
         )
 
-    def get_all_non_processed_def_points(self):
-        return list(
-            filter(
-                lambda point: (not point.is_processed_for_propagation)
-                and (point.is_in_propagation_slice),
-                self.get_all_def_points(),
-            )
+    def tear_down_propagation_worklist(self):
+        self.context.propagation_worklist = None
+        del self.propagation_worklist
+        del self.propagation_registries
+        del self.propagation_candidates
+
+    def get_non_processed_points(self, point_type):
+        """
+        Returns the points of point_type ("actor", "def", or "use") of the chain
+        that are in the propagation slice but not processed yet,
+        in the order of self.get_all_*_points().
+        """
+        # Points of other chains are processed by their own chains
+        for point in self.propagation_worklist:
+            if self.propagation_registries[point.kind] in point.registries:
+                self.propagation_candidates[point.kind].add(point)
+        self.propagation_worklist.clear()
+
+        registry = self.propagation_registries[point_type]
+        candidates = self.propagation_candidates[point_type]
+        candidates.difference_update(
+            registry.flagged_points[cm.Point.PROCESSED_FOR_PROPAGATION]
         )
+        return sorted(candidates, key=registry.get_point_rank)
+
+    def get_all_non_processed_actor_points(self):
+        return self.get_non_processed_points("actor")
+
+    def get_all_non_processed_def_points(self):
+        return self.get_non_processed_points("def")
 
     def get_all_non_processed_use_points(self):
-        return list(
-            filter(
-                lambda point: (not point.is_processed_for_propagation)
-                and (point.is_in_propagation_slice),
-                self.get_all_use_points(),
-            )
-        )
+        return self.get_non_processed_points("use")
 
     def slice_downwards_actor_points(self):
         importer_actors = {
@@ -3157,10 +3169,10 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
                                             or (
                                                 len(
                                                     set(
-                                                        def_point.actor_point.reachability_actor_ids
+                                                        def_point.actor_point.reachability_actors
                                                     ).difference(
                                                         set(
-                                                            point.actor_point.reachability_actor_ids
+                                                            point.actor_point.reachability_actors
                                                         )
                                                     )
                                                 )
@@ -3291,19 +3303,17 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
 
     def process_reachability_propagation(self, point):
         if isinstance(point, self.Use):
-            actor_id = point.actor_point.id
+            actor = point.actor_point
             point_type = "use"
             is_conditional = True
         elif isinstance(point, self.Actor):
-            actor_id = point.id
+            actor = point
             point_type = "actor"
             is_conditional = False
 
         reach_affected_actor_points = filter(
-            lambda point: (
-                (actor_id in point.reachability_actor_ids) and (not point.is_modified)
-            ),
-            self.get_all_actor_points(),
+            lambda point: (not point.is_modified),
+            self.get_reachability_dependents(actor),
         )
         if is_conditional:
             self.update_propagation_rules(
@@ -3341,12 +3351,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
                     )
                 )
             )
-            children = list(
-                filter(
-                    lambda cdu: (actor_id in cdu.reachability_actor_id_stack),
-                    self.children,
-                )
-            )
+            children = list(self.child_reachability_dependents.get(actor, []))
             while children:
                 next_children = []
                 for child_chain in children:
@@ -3376,12 +3381,19 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
                 children = next_children
 
     def slice_downwards(self):
-        previous_propagation_rules_length = len(self.propagation_slice)
-        self.slice_downwards_actor_points()
-        self.slice_downwards_def_points()
-        self.slice_downwards_use_points()
-        if len(self.propagation_slice) != previous_propagation_rules_length:
-            self.slice_downwards()
+        """
+        Repeats the downward slicing until no new propagation rules are added.
+        Each round only visits the points that entered the propagation slice
+        and are not processed yet (see self.set_up_propagation_worklist()).
+        """
+        self.set_up_propagation_worklist()
+        previous_propagation_rules_length = None
+        while len(self.propagation_rules) != previous_propagation_rules_length:
+            previous_propagation_rules_length = len(self.propagation_rules)
+            self.slice_downwards_actor_points()
+            self.slice_downwards_def_points()
+            self.slice_downwards_use_points()
+        self.tear_down_propagation_worklist()
 
     def slice_upwards(self):
         # def_points = filter(lambda point: point.is_modified, self.get_all_def_points())
@@ -3441,29 +3453,34 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
             self.get_all_use_points(),
         )
 
-        chain = self
+        # Only the def_points of this scope are linked to the use_points,
+        # ordered as in self.get_all_def_points().
+        def_point_ranks = dict()
+        for rank, def_point in enumerate(self.get_all_def_points()):
+            def_point_ranks.setdefault(def_point, rank)
 
-        while chain:
-            for use_point in use_points:
-                self.update_propagation_rules(
-                    list(
-                        map(
-                            lambda def_point: {
-                                "subject_id": def_point.id,
-                                "subject_type": "def",
-                                "propagation_rule": "is_directly_used_at"
-                                + ("" if def_point.set_is_upstream() else ""),
-                                "object_id": use_point.id,
-                                "object_type": "use",
-                            },
+        for use_point in use_points:
+            self.update_propagation_rules(
+                list(
+                    map(
+                        lambda def_point: {
+                            "subject_id": def_point.id,
+                            "subject_type": "def",
+                            "propagation_rule": "is_directly_used_at"
+                            + ("" if def_point.set_is_upstream() else ""),
+                            "object_id": use_point.id,
+                            "object_type": "use",
+                        },
+                        sorted(
                             filter(
-                                lambda def_point: use_point in def_point.use_points,
-                                chain.get_all_def_points(),
+                                lambda def_point: def_point in def_point_ranks,
+                                set(use_point.reaching_def_points),
                             ),
-                        )
+                            key=lambda def_point: def_point_ranks[def_point],
+                        ),
                     )
                 )
-            chain = chain.parent_scope
+            )
 
     ####################################
     #### CMake Depricatred Commands ####
@@ -3485,7 +3502,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
         arguments = self.get_sorted_arguments_data_list(node_data, "SUBDIRS")
 
         # For file-level analysis (No system provided)
-        if self.sysdiff.analysis_mode == "change_location":
+        if self.context.analysis_mode == "change_location":
             return
 
         for argument in arguments:
@@ -3525,7 +3542,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
 
             for resolution in added_files:
                 # For files with GumTree error
-                if self.sysdiff.file_data[resolution]["diff"] is None:
+                if self.sysdiff.load_file_diff(resolution) is None:
                     self.log_file_path_resolution(
                         "SUBDIRS", "PARSER_ERROR", node_data, found_paths=[resolution]
                     )
@@ -3556,7 +3573,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
                 ].append(node_data["id"])
 
                 target_ast = getattr(
-                    self.sysdiff.file_data[resolution]["diff"], self.ast.name
+                    self.sysdiff.load_file_diff(resolution), self.ast.name
                 )
                 child_scope = self.sysdiff.ConditionalDefUseChains(
                     target_ast,
@@ -3565,7 +3582,7 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
                     parent_scope=self,
                     global_scope=self.global_scope,
                 )
-                self.children.append(child_scope)
+                self.add_child_scope(child_scope)
                 self.sysdiff.append_to_chains(child_scope)
 
                 # Working on added file
@@ -3581,6 +3598,8 @@ class ConditionalDefUseChains(cm.ConditionalDefUseChains):
 
 
 class CallableConditionalDefUseChains(ConditionalDefUseChains):
+    # Commands looking up the definitions reaching them to decide which points to register
+    definition_dependent_commands = ["TARGET_LINK_LIBRARIES"]
 
     def __init__(
         self,
@@ -3608,10 +3627,12 @@ class CallableConditionalDefUseChains(ConditionalDefUseChains):
                     caller_scope,
                     global_scope,
                 )
-                self.parent_scope.children.append(self)
+                self.parent_scope.add_child_scope(self)
                 self.sysdiff.append_to_chains(self)
 
             elif self.callable_type == "MACRO":
+                self.sysdiff = sysdiff
+                self.context = sysdiff.context
                 self.ast = def_ast
                 self.scope = caller_scope.scope
                 self.global_scope = global_scope
@@ -3620,21 +3641,26 @@ class CallableConditionalDefUseChains(ConditionalDefUseChains):
                 self.parent_names_available = True
                 # A list of ConditionalDefUseChains objects of the children scopes
                 self.children = caller_scope.children
+                self.child_reachability_dependents = (
+                    caller_scope.child_reachability_dependents
+                )
                 self.ast_stack = caller_scope.ast_stack
-                self.sysdiff = sysdiff
                 # Store current reachability conditions based on conditional statements
-                self.reachability_stack = caller_scope.reachability_stack.copy()
-                self.reachability_actor_id_stack = (
-                    caller_scope.reachability_actor_id_stack.copy()
-                )
+                self.reachability_stack = caller_scope.reachability_stack
+                self.reachability_actor_stack = caller_scope.reachability_actor_stack
                 self.def_points = caller_scope.def_points
                 self.use_points = caller_scope.use_points
                 self.actor_points = caller_scope.actor_points
+                self.actor_point_key_ranks = caller_scope.actor_point_key_ranks
+                self.reachability_dependents = caller_scope.reachability_dependents
                 self.defined_names = caller_scope.defined_names
+                self.definition_lookup_cache = caller_scope.definition_lookup_cache
                 self.used_names = caller_scope.used_names
                 self.undefined_names = caller_scope.undefined_names
                 self.current_call_stack = caller_scope.current_call_stack
                 self.propagation_slice = caller_scope.propagation_slice
+                self.propagation_rules = caller_scope.propagation_rules
+                self.propagation_rule_keys = caller_scope.propagation_rule_keys
 
             else:
                 raise DebugException(
@@ -3665,15 +3691,9 @@ class CallableConditionalDefUseChains(ConditionalDefUseChains):
 
         self.callable_def_point = callable_def_point
 
-        self.callable_header_node_data = self.ast.get_data(
-            self.ast.get_children_by_type(
-                self.callable_def_point.node_data, self.header_node_type
-            )
-        )
-
-        self.callable_body_node_data = self.ast.get_data(
-            self.ast.get_children_by_type(self.callable_def_point.node_data, "body")
-        )
+        self.callable_structure = self.get_callable_structure()
+        self.callable_header_node_data = self.callable_structure["header_node_data"]
+        self.callable_body_node_data = self.callable_structure["body_node_data"]
 
         # The following names, when assigned to use points,
         # have no def point, but are connected to arguments.
@@ -3687,6 +3707,65 @@ class CallableConditionalDefUseChains(ConditionalDefUseChains):
         self.parsed_args_prefix = None
         self.prefixed_parsed_names = {}
 
+        # Calls registering points and changing the state of the scope while
+        # the body is recorded, and the indices of the points they created
+        # (see self.record_effect())
+        self.recorded_effects = None
+        self.recorded_point_indices = None
+
+    def get_callable_structure(self):
+        """
+        Returns the structure of the callable (header and body node_data)
+        cached for all the call sites of the callable_def_point
+        in the form of {(file_index, 'def_node_id', 'callable_type'): {'attribute': value}}
+        in self.context.callable_structures.
+        The required arguments are added to the structure on the
+        first call site analysis (see self.get_required_arguments()).
+        """
+        key = (
+            self.callable_def_point.file_index,
+            self.callable_def_point.node_data["id"],
+            self.callable_type,
+        )
+        if not key in self.context.callable_structures:
+            self.context.callable_structures[key] = {
+                "header_node_data": self.ast.get_data(
+                    self.ast.get_children_by_type(
+                        self.callable_def_point.node_data, self.header_node_type
+                    )
+                ),
+                "body_node_data": self.ast.get_data(
+                    self.ast.get_children_by_type(
+                        self.callable_def_point.node_data, "body"
+                    )
+                ),
+            }
+        return self.context.callable_structures[key]
+
+    def get_required_arguments(self):
+        """
+        Returns the pair of the list of required arguments' node_data
+        and the list of their names, cached in the callable structure.
+        """
+        if not "required_arguments" in self.callable_structure:
+            try:
+                required_arguments = self.get_sorted_arguments_data_list(
+                    self.callable_header_node_data, self.header_node_type
+                )
+            except MissingArgumentsException:
+                required_arguments = []
+            self.callable_structure["required_arguments"] = required_arguments
+            self.callable_structure["required_arguments_names"] = list(
+                map(
+                    lambda node_data: self.ast.get_name(node_data),
+                    required_arguments,
+                )
+            )
+        return (
+            self.callable_structure["required_arguments"],
+            self.callable_structure["required_arguments_names"],
+        )
+
     def analyze(self):
         if self.is_call_site:
             self.analyze_call_site()
@@ -3702,19 +3781,161 @@ class CallableConditionalDefUseChains(ConditionalDefUseChains):
             except MissingArgumentsException:
                 self.passed_values = []
 
-            try:
-                self.required_arguments = self.get_sorted_arguments_data_list(
-                    self.callable_header_node_data, self.header_node_type
-                )
-            except MissingArgumentsException:
-                self.required_arguments = []
+            self.required_arguments = self.get_required_arguments()[0]
 
             self.set_up_mappings()
 
-            self.visit(self.callable_body_node_data)
+            def_file_path = self.ast.file_path
+            self.sysdiff.pin_file_diff(def_file_path)
+            self.analyze_callable_body()
 
             if self.parsed_args_prefix:
                 self.check_for_parsed_arguments_updates()
+            self.sysdiff.unpin_file_diff(def_file_path)
+
+    def analyze_callable_body(self):
+        """
+        Visits the body of the callable, recording its effects in
+        self.context.callable_effects, or replays the effects recorded
+        at a previous call site with the same key (see self.get_callable_effects_key()).
+        Bodies whose visit depends on the definitions reaching the call site
+        are visited at every call site (see self.is_callable_body_replayable()).
+        """
+        if not self.is_callable_body_replayable():
+            self.visit(self.callable_body_node_data)
+            return
+
+        key = self.get_callable_effects_key()
+        effects = self.context.callable_effects.get(key)
+        if effects is not None:
+            self.replay_callable_effects(effects)
+            return
+
+        chains = getattr(self.sysdiff, f"{self.ast.name}_cdu_chains")
+        chains_count = len(chains)
+        self.recorded_effects = []
+        self.recorded_point_indices = dict()
+        self.visit(self.callable_body_node_data)
+        if len(chains) > chains_count:
+            # The body loaded files through a command missing from the import commands,
+            # whose child scopes are not recorded
+            self.callable_structure["is_replayable"] = False
+        elif self.recorded_effects is not None:
+            self.context.callable_effects[key] = self.recorded_effects
+        self.recorded_effects = None
+        self.recorded_point_indices = None
+
+    def get_callable_effects_key(self):
+        """
+        Returns the key of the effects of the callable at the call site in the form of
+        (file_index, 'def_node_id', 'callable_type', passed_values_count,
+        is_modified, is_reachability_condition), where is_modified is True if the body
+        or the call site are modified, and is_reachability_condition is True if the
+        call site is added or deleted (see ConditionalDefUseChains.process_callable_call_location()).
+        """
+        return (
+            self.callable_def_point.file_index,
+            self.callable_def_point.node_data["id"],
+            self.callable_type,
+            len(self.passed_values),
+            self.ast.is_subtree_affected(self.callable_body_node_data)
+            or self.caller_scope.ast.is_subtree_affected(self.caller_actor.node_data),
+            self.caller_actor.node_data["operation"] in ["added", "deleted"],
+        )
+
+    def is_callable_body_replayable(self):
+        """
+        Returns True if visiting the body of the callable registers the same points
+        at every call site, i.e., if the body defines no callable or block,
+        calls no user-defined callable, and runs none of the import commands
+        (including the project-specific ones of self.sysdiff.ConditionalDefUseChains)
+        and self.definition_dependent_commands.
+        The result is cached in the callable structure.
+        """
+        if not "is_replayable" in self.callable_structure:
+            import_commands = (
+                self.import_commands
+                | self.sysdiff.ConditionalDefUseChains.import_commands
+            )
+            is_replayable = True
+            for node_data in self.ast.get_subtree_nodes(
+                self.callable_body_node_data
+            ).values():
+                if node_data["type"] in [
+                    "function_definition",
+                    "macro_definition",
+                    "block_definition",
+                ]:
+                    is_replayable = False
+                    break
+                if not node_data["type"] in self.ast.COMMAND_TYPES:
+                    continue
+                command_identifier = self.ast.get_command_identifier(node_data)
+                if (
+                    (not command_identifier in self.dispatch_table)
+                    or (command_identifier in import_commands)
+                    or (command_identifier in self.definition_dependent_commands)
+                ):
+                    is_replayable = False
+                    break
+            self.callable_structure["is_replayable"] = is_replayable
+        return self.callable_structure["is_replayable"]
+
+    def record_effect(self, method_name, arguments, point=None):
+        """
+        Appends the call of method_name with the arguments to self.recorded_effects
+        while the body is recorded, with node_data encoded by their ids and
+        the points created by the recorded calls by their indices.
+        The recording is dropped if an argument cannot be encoded.
+        """
+        if self.recorded_effects is None:
+            return
+        encoded_arguments = []
+        for argument in arguments:
+            if isinstance(argument, dict):
+                encoded_arguments.append(("node", argument["id"]))
+            elif id(argument) in self.recorded_point_indices:
+                encoded_arguments.append(
+                    ("point", self.recorded_point_indices[id(argument)])
+                )
+            elif (argument is None) or isinstance(argument, (str, int)):
+                encoded_arguments.append(("value", argument))
+            else:
+                self.recorded_effects = None
+                return
+        if not point is None:
+            self.recorded_point_indices[id(point)] = len(self.recorded_point_indices)
+        self.recorded_effects.append(
+            (method_name, tuple(encoded_arguments), not point is None)
+        )
+
+    def replay_callable_effects(self, effects):
+        """
+        Repeats the recorded calls (see self.record_effect()) instead of visiting
+        the body, creating new points in the order of the recorded ones.
+        The use points are linked to the def points reaching this call site.
+        """
+        points = []
+        for method_name, encoded_arguments, creates_point in effects:
+            arguments = list(
+                map(
+                    lambda encoded_argument: self.decode_effect_argument(
+                        encoded_argument, points
+                    ),
+                    encoded_arguments,
+                )
+            )
+            result = getattr(self, method_name)(*arguments)
+            if creates_point:
+                points.append(result[0] if isinstance(result, tuple) else result)
+
+    def decode_effect_argument(self, encoded_argument, points):
+        kind, value = encoded_argument
+        if kind == "node":
+            return self.ast.nodes[value]
+        if kind == "point":
+            return points[value]
+        return value
 
     def analyze_def_site(self):
         """
@@ -3727,12 +3948,7 @@ class CallableConditionalDefUseChains(ConditionalDefUseChains):
 
     def set_up_mappings(self):
         locational_passed_def_points = []
-        required_arguments_names = list(
-            map(
-                lambda node_data: self.ast.get_name(node_data),
-                self.required_arguments,
-            )
-        )
+        required_arguments_names = self.get_required_arguments()[1]
         for i, node_data in enumerate(self.passed_values):
             # Each argument is a def point
             # TODO (High): Make it so that only required args are defined here and
@@ -3833,8 +4049,8 @@ class CallableConditionalDefUseChains(ConditionalDefUseChains):
                     if parsed_arg.is_modified:
                         pass
                     elif def_point.is_modified:
-                        parsed_arg.ast.update_node_operation(
-                            parsed_arg.node_data, "updated"
+                        self.sysdiff.update_node_operation(
+                            parsed_arg.ast, parsed_arg.node_data, "updated"
                         )
                         parsed_arg.set_is_modified()
                     list(
@@ -3854,13 +4070,19 @@ class CallableConditionalDefUseChains(ConditionalDefUseChains):
             use_type,
             actor_point,
             self.ast,
+            self.context,
             preferred_name,
             scope=self.scope,
             file=self.ast.file_saved_as,
         )
+        self.record_effect(
+            "register_new_use_point",
+            (use_node_data, actor_point, use_type, preferred_name),
+            use_point,
+        )
         registered_to = []
         actor_point.add_use_point(use_point)
-        self.use_points[use_point.node_data["id"]].append(use_point)
+        self.use_points.add_point(use_point)
         self.used_names[use_point.name].append(use_point)
 
         # Check mappings first
@@ -3907,20 +4129,88 @@ class CallableConditionalDefUseChains(ConditionalDefUseChains):
 
         return use_point, registered_to
 
+    def register_new_def_point(
+        self,
+        def_node_data,
+        actor_point,
+        def_type="VAR",
+        prefix=None,
+        suffix=None,
+        preferred_name=None,
+    ):
+        def_point = super().register_new_def_point(
+            def_node_data, actor_point, def_type, prefix, suffix, preferred_name
+        )
+        self.record_effect(
+            "register_new_def_point",
+            (def_node_data, actor_point, def_type, prefix, suffix, preferred_name),
+            def_point,
+        )
+        return def_point
+
+    def register_new_actor_point(self, node_data, preferred_type=None):
+        actor_point = super().register_new_actor_point(node_data, preferred_type)
+        self.record_effect(
+            "register_new_actor_point", (node_data, preferred_type), actor_point
+        )
+        return actor_point
+
+    def register_def_point_to_parent_scope(self, def_point, recursive=False):
+        # The recursive registration is recorded by the recursive call
+        self.record_effect("register_def_point_to_parent_scope", (def_point,))
+        super().register_def_point_to_parent_scope(def_point, recursive)
+
+    def add_condition_to_reachability_stack(
+        self, condition_node_data, actor_point, is_comparative=False
+    ):
+        self.record_effect(
+            "add_condition_to_reachability_stack",
+            (condition_node_data, actor_point, is_comparative),
+        )
+        super().add_condition_to_reachability_stack(
+            condition_node_data, actor_point, is_comparative
+        )
+
+    def remove_condition_from_reachability_stack(self, last_n=1, was_comparative=False):
+        self.record_effect(
+            "remove_condition_from_reachability_stack", (last_n, was_comparative)
+        )
+        super().remove_condition_from_reachability_stack(last_n, was_comparative)
+
+    def negate_last_condition_in_reachability_stack(self, negation_symbol="NOT"):
+        self.record_effect(
+            "negate_last_condition_in_reachability_stack", (negation_symbol,)
+        )
+        super().negate_last_condition_in_reachability_stack(negation_symbol)
+
+    def lock_def_point(self, def_point):
+        self.record_effect("lock_def_point", (def_point,))
+        super().lock_def_point(def_point)
+
+    def set_parsed_args_prefix(self, parsed_args_prefix, is_parsed=False):
+        """
+        Sets the prefix of the names of the parsed arguments, and once
+        cmake_parse_arguments() is visited (is_parsed), the unparsed arguments.
+        """
+        self.record_effect("set_parsed_args_prefix", (parsed_args_prefix, is_parsed))
+        self.parsed_args_prefix = parsed_args_prefix
+        if is_parsed:
+            self.accessable_aggregate_names[
+                self.parsed_args_prefix + "UNPARSED_ARGUMENTS"
+            ] = self.accessable_aggregate_names["ARGN"]
+
     def visit_CMAKE_PARSE_ARGUMENTS(self, node_data):
         actor_point = self.register_new_actor_point(node_data)
         arguments = self.get_sorted_arguments_data_list(
             node_data, "CMAKE_PARSE_ARGUMENTS"
         )
-        self.parsed_args_prefix = self.ast.unparse(arguments[0]).strip('"')
-        if self.parsed_args_prefix.upper() == "PARSE_ARGV":
-            self.parsed_args_prefix = self.ast.unparse(arguments[2]).strip('"')
+        parsed_args_prefix = self.ast.unparse(arguments[0]).strip('"')
+        if parsed_args_prefix.upper() == "PARSE_ARGV":
+            self.set_parsed_args_prefix(self.ast.unparse(arguments[2]).strip('"'))
             for arg in arguments:
                 self.visit(arg, actor_point)
         else:
+            self.set_parsed_args_prefix(parsed_args_prefix)
             for arg in arguments[:-1]:
                 self.visit(arg, actor_point)
-        self.parsed_args_prefix = self.parsed_args_prefix + "_"
-        self.accessable_aggregate_names[
-            self.parsed_args_prefix + "UNPARSED_ARGUMENTS"
-        ] = self.accessable_aggregate_names["ARGN"]
+        self.set_parsed_args_prefix(self.parsed_args_prefix + "_", is_parsed=True)
@@ -113,19 +113,8 @@ class ExtendedProcessor(NodeVisitor):
         if node_data["operation"] != "no-op":
             return self.generic_visit(node_data)
 
-        subtree_nodes = self.ast.get_subtree_nodes(node_data)
-        affected_nodes = filter(
-            lambda subtree_node_data: (
-                (subtree_node_data["operation"] != "no-op")
-                and (
-                    subtree_node_data["type"] not in self.ast.IGNORED_TYPES
-                )
-            ),
-            subtree_nodes.values(),
-        )
-        for _ in affected_nodes:
+        if self.ast.is_subtree_affected(node_data, include_ignored=False):
             self.ast.update_node_operation(node_data, "updated")
-            break
 
         return self.generic_visit(node_data)
 
@@ -136,9 +125,7 @@ class ExtendedProcessor(NodeVisitor):
         return self.check_and_update_node_operation(node_data)
 
     def visit_normal_command(self, node_data):
-        command_identifier = self.ast.get_data(
-            self.ast.get_children_by_type(node_data, "identifier")
-        )["content"].upper()
+        command_identifier = self.ast.get_command_identifier(node_data)
         if command_identifier in self.BUILT_IN_COMMANDS:
             return self.check_and_update_node_operation(node_data)
 
@@ -147,14 +134,8 @@ class ExtendedProcessor(NodeVisitor):
         if parent_data["operation"] != "no-op":
             return self.generic_visit(node_data)
 
-        subtree_nodes = self.ast.get_subtree_nodes(node_data)
-        affected_nodes = filter(
-            lambda subtree_node_data: subtree_node_data["operation"] != "no-op",
-            subtree_nodes.values(),
-        )
-        for _ in affected_nodes:
+        if self.ast.is_subtree_affected(node_data):
             self.ast.update_node_operation(parent_data, "updated")
-            break
 
         return self.generic_visit(node_data)
 
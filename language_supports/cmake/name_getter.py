@@ -64,13 +64,11 @@ class NameGetter(NodeVisitor):
         )
 
     def visit_normal_command(self, node_data):
-        command_identifier = self.ast.get_data(
-            self.ast.get_children_by_type(node_data, "identifier")
-        )["content"].upper()
-        visitor = getattr(self, f"visit_{command_identifier}", None)
+        command_identifier = self.ast.get_command_identifier(node_data)
+        visitor = self.dispatch_table.get(command_identifier)
         if visitor is None:
             return f"<CMD>{command_identifier}"
-        return visitor(node_data)
+        return visitor(self, node_data)
 
     def visit_bracket_argument(self, node_data):
         """
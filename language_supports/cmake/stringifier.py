@@ -121,16 +121,23 @@ class Stringifier(NodeVisitor):
     def visit_arguments(self, node_data):
         parent_data = self.ast.get_data(
             self.ast.get_parent(node_data)
-        )  # can be function/macro_header or normal_command
-        identifier = self.ast.get_data(
+        )  # can be function/macro/block_header or normal_command
+        identifier_data = self.ast.get_data(
             self.ast.get_children_by_type(parent_data, "identifier")
-        )["content"].upper()
-        if "header" in parent_data["type"]:  # parent is function/macro_header
+        )
+        if "header" in parent_data["type"]:  # parent is function/macro/block_header
             parent_data = self.ast.get_data(self.ast.get_parent(parent_data))
         else:  # parent is normal_command
             pass
+        if not identifier_data:  # block_header does not have an identifier
+            return node_data["type"] + " of " + parent_data["type"]
         return (
-            node_data["type"] + " of " + parent_data["type"] + ' "' + identifier + '"'
+            node_data["type"]
+            + " of "
+            + parent_data["type"]
+            + ' "'
+            + identifier_data["content"].upper()
+            + '"'
         )
 
     def visit_identifier(self, node_data):
@@ -14,7 +14,7 @@ class Unparser(NodeVisitor):
     def get_sorted_children_unparsed_list(self, node_data, masked_types=[]):
         return list(
             map(
-                lambda child_data: self.visit(child_data, masked_types),
+                lambda child_data: self.ast.unparse(child_data, masked_types),
                 self.get_sorted_children_data_list(node_data),
             )
         )
@@ -30,9 +30,10 @@ class Unparser(NodeVisitor):
         if node_data["content"]:
             return node_data["content"]
 
-        method = "visit_" + node_data["type"]
-        visitor = getattr(self, method, self.generic_visit)
-        return visitor(node_data, masked_types)
+        visitor = self.dispatch_table.get(node_data["type"])
+        if visitor is None:
+            return self.generic_visit(node_data, masked_types)
+        return visitor(self, node_data, masked_types)
 
     def generic_visit(self, node_data, masked_types=[]):
         return "".join(self.get_sorted_children_unparsed_list(node_data, masked_types))
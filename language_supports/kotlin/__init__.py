@@ -8,4 +8,8 @@ ROOT_TYPE = "source_file"
 # and their entire subtree are ignored
 IGNORED_TYPES = []
 
+# Nodes of type listed in COMMAND_TYPES are dispatched
+# by their identifier (see AST.get_command_identifier())
+COMMAND_TYPES = []
+
 BASIC_TYPES = [ROOT_TYPE]
@@ -9,6 +9,11 @@ class ConditionalDefUseChains(cmake.ConditionalDefUseChains):
     ##################################
     """
 
+    import_commands = cmake.ConditionalDefUseChains.import_commands | {
+        "CONFIGURE_COMPONENTS",
+        "CONFIGURE_PLUGINS",
+    }
+
     def resolve_add_subdirectory_file_path(self, file_path_node):
         resolved, resolutions = super().resolve_add_subdirectory_file_path(
             file_path_node
@@ -16,9 +21,6 @@ class ConditionalDefUseChains(cmake.ConditionalDefUseChains):
         if resolved:
             return resolved, resolutions
 
-        cluster = self.ast.name
-        resolution_map = self.sysdiff.file_path_resolution_map[cluster]
-
         file_path = self.ast.unparse(file_path_node)
         file_path = file_path.strip('"').strip("'")
         file_path = file_path.replace(" ", "")
@@ -27,13 +29,10 @@ class ConditionalDefUseChains(cmake.ConditionalDefUseChains):
             resolutions = list(
                 map(
                     lambda pair: pair[1],
-                    filter(
-                        lambda pair: pair[0].endswith("/CMakeLists.txt")
-                        and len(pair[0].strip("/").split("/")) == 4,
-                        filter(
-                            lambda pair: pair[0].startswith("extra/curl/curl-"),
-                            resolution_map.items(),
-                        ),
+                    self.get_resolutions_by_pattern(
+                        starts_with="extra/curl/curl-",
+                        ends_with="/CMakeLists.txt",
+                        depth=4,
                     ),
                 )
             )
@@ -43,13 +42,10 @@ class ConditionalDefUseChains(cmake.ConditionalDefUseChains):
             resolutions = list(
                 map(
                     lambda pair: pair[1],
-                    filter(
-                        lambda pair: pair[0].endswith("/CMakeLists.txt")
-                        and len(pair[0].strip("/").split("/")) == 4,
-                        filter(
-                            lambda pair: pair[0].startswith("extra/zlib/zlib-"),
-                            resolution_map.items(),
-                        ),
+                    self.get_resolutions_by_pattern(
+                        starts_with="extra/zlib/zlib-",
+                        ends_with="/CMakeLists.txt",
+                        depth=4,
                     ),
                 )
             )
@@ -59,13 +55,10 @@ class ConditionalDefUseChains(cmake.ConditionalDefUseChains):
             resolutions = list(
                 map(
                     lambda pair: pair[1],
-                    filter(
-                        lambda pair: pair[0].endswith("/CMakeLists.txt")
-                        and len(pair[0].strip("/").split("/")) == 4,
-                        filter(
-                            lambda pair: pair[0].startswith("extra/libevent/libevent-"),
-                            resolution_map.items(),
-                        ),
+                    self.get_resolutions_by_pattern(
+                        starts_with="extra/libevent/libevent-",
+                        ends_with="/CMakeLists.txt",
+                        depth=4,
                     ),
                 )
             )
@@ -75,13 +68,10 @@ class ConditionalDefUseChains(cmake.ConditionalDefUseChains):
             resolutions = list(
                 map(
                     lambda pair: pair[1],
-                    filter(
-                        lambda pair: pair[0].endswith("/CMakeLists.txt")
-                        and len(pair[0].strip("/").split("/")) == 4,
-                        filter(
-                            lambda pair: pair[0].startswith("extra/libcbor/libcbor-"),
-                            resolution_map.items(),
-                        ),
+                    self.get_resolutions_by_pattern(
+                        starts_with="extra/libcbor/libcbor-",
+                        ends_with="/CMakeLists.txt",
+                        depth=4,
                     ),
                 )
             )
@@ -91,13 +81,10 @@ class ConditionalDefUseChains(cmake.ConditionalDefUseChains):
             resolutions = list(
                 map(
                     lambda pair: pair[1],
-                    filter(
-                        lambda pair: pair[0].endswith("/CMakeLists.txt")
-                        and len(pair[0].strip("/").split("/")) == 4,
-                        filter(
-                            lambda pair: pair[0].startswith("extra/libfido2/libfido2-"),
-                            resolution_map.items(),
-                        ),
+                    self.get_resolutions_by_pattern(
+                        starts_with="extra/libfido2/libfido2-",
+                        ends_with="/CMakeLists.txt",
+                        depth=4,
                     ),
                 )
             )
@@ -107,13 +94,10 @@ class ConditionalDefUseChains(cmake.ConditionalDefUseChains):
             resolutions = list(
                 map(
                     lambda pair: pair[1],
-                    filter(
-                        lambda pair: pair[0].endswith("/src/CMakeLists.txt")
-                        and len(pair[0].strip("/").split("/")) == 5,
-                        filter(
-                            lambda pair: pair[0].startswith("extra/libedit/libedit-"),
-                            resolution_map.items(),
-                        ),
+                    self.get_resolutions_by_pattern(
+                        starts_with="extra/libedit/libedit-",
+                        ends_with="/src/CMakeLists.txt",
+                        depth=5,
                     ),
                 )
             )
@@ -124,17 +108,11 @@ class ConditionalDefUseChains(cmake.ConditionalDefUseChains):
     def visit_CONFIGURE_COMPONENTS(self, node_data):
         self.visit_user_defined_normal_command(node_data)
         cluster = self.ast.name
-        resolution_map = self.sysdiff.file_path_resolution_map[cluster]
         resolved_directories = list(
             sorted(
-                filter(
-                    lambda pair: pair[0].endswith("/CMakeLists.txt"),
-                    filter(
-                        lambda pair: pair[0].startswith(
-                            ("components/", "/components/test/")
-                        ),
-                        resolution_map.items(),
-                    ),
+                self.get_resolutions_by_pattern(
+                    starts_with=("components/", "/components/test/"),
+                    ends_with="/CMakeLists.txt",
                 ),
                 key=lambda pair: len(pair[0].strip("/").split("/")),
             )
@@ -146,15 +124,11 @@ class ConditionalDefUseChains(cmake.ConditionalDefUseChains):
     def visit_CONFIGURE_PLUGINS(self, node_data):
         self.visit_user_defined_normal_command(node_data)
         cluster = self.ast.name
-        resolution_map = self.sysdiff.file_path_resolution_map[cluster]
         resolved_directories = list(
             sorted(
-                filter(
-                    lambda pair: pair[0].endswith("/CMakeLists.txt"),
-                    filter(
-                        lambda pair: pair[0].startswith(("storage/", "plugin/")),
-                        resolution_map.items(),
-                    ),
+                self.get_resolutions_by_pattern(
+                    starts_with=("storage/", "plugin/"),
+                    ends_with="/CMakeLists.txt",
                 ),
                 key=lambda pair: len(pair[0].strip("/").split("/")),
             )
@@ -171,7 +145,7 @@ class ConditionalDefUseChains(cmake.ConditionalDefUseChains):
                 continue
 
             # For files with GumTree error
-            if self.sysdiff.file_data[resolution]["diff"] is None:
+            if self.sysdiff.load_file_diff(resolution) is None:
                 self.log_file_path_resolution(
                     f"{importing_command} (MySQL-Server)",
                     "PARSER_ERROR",
@@ -210,9 +184,7 @@ class ConditionalDefUseChains(cmake.ConditionalDefUseChains):
                 "importers"
             ].append(node_data["id"])
 
-            target_ast = getattr(
-                self.sysdiff.file_data[resolution]["diff"], self.ast.name
-            )
+            target_ast = getattr(self.sysdiff.load_file_diff(resolution), self.ast.name)
             child_scope = self.sysdiff.ConditionalDefUseChains(
                 target_ast,
                 self.sysdiff,
@@ -220,7 +192,7 @@ class ConditionalDefUseChains(cmake.ConditionalDefUseChains):
                 parent_scope=self,
                 global_scope=self.global_scope,
             )
-            self.children.append(child_scope)
+            self.add_child_scope(child_scope)
             self.sysdiff.append_to_chains(child_scope)
 
             # Working on added file
@@ -9,6 +9,11 @@ class ConditionalDefUseChains(cmake.ConditionalDefUseChains):
     ##################################
     """
 
+    import_commands = cmake.ConditionalDefUseChains.import_commands | {
+        "ADD_SWIFT_TOOL_SUBDIRECTORY",
+        "ADD_SWIFT_LIB_SUBDIRECTORY",
+    }
+
     def visit_ADD_SWIFT_TOOL_SUBDIRECTORY(self, node_data):
         self.visit_user_defined_add_subdirectory(node_data)
 
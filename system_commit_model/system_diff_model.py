@@ -1,16 +1,84 @@
 from pathlib import Path
 import pandas as pd
 import subprocess, time, importlib, json, itertools
-from collections import defaultdict
-from functools import reduce
+import io, pickle, multiprocessing, heapq, os, signal
+from collections import defaultdict, OrderedDict
 from utils.helpers import (
     file_is_target,
     get_processed_path,
     write_source_code,
     read_dotdiff,
 )
-from diff_model import ASTDiff
-from utils.configurations import DATA_FLOW_ANALYSIS_MODE, SNAPSHOT_MODE, VERBOSE
+from utils.path_index import PathSuffixIndex
+from data_flow_analysis import AnalysisContext
+from diff_model import (
+    ASTDiff,
+    ASTDiffSpillStore,
+    PendingASTDiff,
+    SpilledASTDiff,
+)
+
+# The SystemDiff of the process, set in the processes of the pools
+# of a SystemDiff only (see set_up_pool_worker())
+pool_system_diff = None
+
+
+def set_up_pool_worker(system_diff):
+    """
+    Initializes the forked processes of the pools of the system_diff
+    (see SystemDiff.analyze_change_location_in_parallel()).
+    """
+    global pool_system_diff
+    pool_system_diff = system_diff
+
+
+def analyze_file_in_pool(file_path):
+    return pool_system_diff.analyze_file_in_worker(file_path)
+
+
+class SharedObjectPickler(pickle.Pickler):
+    """
+    Pickles the objects shared with another process by their keys
+    instead of their values, given {id(object): key}.
+    """
+
+    def __init__(self, file, shared_keys, *args, **kwargs):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.shared_keys = shared_keys
+
+    def persistent_id(self, obj):
+        return self.shared_keys.get(id(obj))
+
+
+class SharedObjectUnpickler(pickle.Unpickler):
+    """
+    Unpickles the objects pickled by SharedObjectPickler,
+    given {key: object} of the shared objects.
+    """
+
+    def __init__(self, file, shared_objects, *args, **kwargs):
+        super().__init__(file)
+        self.shared_objects = shared_objects
+
+    def persistent_load(self, key):
+        return self.shared_objects[key]
+
+
+class SharedObjects(dict):
+    """
+    The {key: object} of the objects shared with a forked process,
+    resolving the ('point', index) keys to the points created before the fork
+    (see AnalysisContext.created_points).
+    """
+
+    def __init__(self, objects, points, *args, **kwargs):
+        super().__init__(objects)
+        self.points = points
+
+    def __missing__(self, key):
+        if key[0] == "point":
+            return self.points[key[1]]
+        raise KeyError(key)
 
 
 class SystemDiff(object):
@@ -18,12 +86,9 @@ class SystemDiff(object):
     Represents a pair of system-level ASTs with their corresponding diff.
     System-level ASTs are generated by replacing an "include" command
     with the root of the included file's AST.
-    DATA_FLOW_ANALYSIS_MODE can be any of 'CHANGE_LOCATION', or 'GLOBAL'. Default is 'GLOBAL'.
+    analysis_mode can be any of 'change_location', or 'global'. Default is 'global'.
     """
 
-    analysis_mode = DATA_FLOW_ANALYSIS_MODE.lower()
-    snapshot_mode = SNAPSHOT_MODE
-
     def __init__(
         self,
         repository_path,
@@ -37,8 +102,20 @@ class SystemDiff(object):
         root_path,
         save_path,
         *args,
+        analysis_mode="global",
+        verbose=False,
+        execute_callables=True,
+        snapshot_mode=False,
+        resident_memory_budget=0,
+        parallel_clusters=False,
+        parallel_workers=0,
+        path_resolutions=(),
         **kwargs,
     ):
+        """
+        The keyword arguments are the options of the analysis
+        (see utils.configurations.Configurations.get_analysis_options()).
+        """
         self.repository_path = repository_path
         self.repository = repository
         self.git_repository = git_repository
@@ -54,6 +131,31 @@ class SystemDiff(object):
         self.root_path = root_path
         self.save_path = save_path
 
+        self.snapshot_mode = snapshot_mode
+        # In MB, 0 keeps all ASTDiffs in memory
+        self.resident_memory_budget = resident_memory_budget
+        # Analyzes the clusters in separate processes (see self.analyze_global())
+        self.parallel_clusters = parallel_clusters
+        # Number of processes analyzing the files (see self.analyze_change_location())
+        self.parallel_workers = parallel_workers
+        # The state of the data-flow analysis of the commit
+        # (options, point ids, registry of the ASTs, and caches)
+        self.context = AnalysisContext(
+            analysis_mode=analysis_mode,
+            verbose=verbose,
+            execute_callables=execute_callables,
+            path_resolutions=path_resolutions,
+        )
+        self.context.diff_loader = self.load_file_diff
+        # Operation updates of the nodes by the analysis, logged when set
+        # (see self.update_node_operation())
+        self.operation_update_log = None
+        # Child scopes analyzed in forked processes until merged back in order
+        # (see self.fork_child_scope_analysis())
+        self.child_scope_analyses = []
+        # Set in the forked processes, which analyze their child scope only
+        self.is_child_scope_worker = False
+
         # Storing lists of cdu_chains
         self.source_cdu_chains = []
         self.destination_cdu_chains = []
@@ -76,6 +178,16 @@ class SystemDiff(object):
 
         self.set_paths()
 
+        # Out-of-core storage of the ASTDiffs (see self.load_file_diff())
+        self.spill_store = None
+        # {'file_path': node_count} of the resident ASTDiffs, least recently used first
+        self.resident_diffs = OrderedDict()
+        # {'file_path': SpilledASTDiff} of the ASTDiffs written to self.spill_store
+        self.spilled_diffs = dict()
+        # {'file_path': count} of the files whose ASTDiffs are not to be spilled
+        # while their chains are built or sliced (see self.pin_file_diff())
+        self.pinned_files = dict()
+
         self.file_data = {}.copy()
         self.populate_file_data()
 
@@ -93,6 +205,17 @@ class SystemDiff(object):
                 )
             ),
         }
+        # Suffix index of the file paths of each cluster
+        # (see ConditionalDefUseChains.get_resolutions_by_suffix())
+        self.file_path_suffix_index = dict(
+            map(
+                lambda pair: (pair[0], PathSuffixIndex(pair[1].keys())),
+                self.file_path_resolution_map.items(),
+            )
+        )
+        # Cache of the pattern queries on the file path resolution map
+        # (see self.get_resolutions_by_pattern())
+        self.resolution_pattern_cache = dict()
 
         # Import language support tools but not saved as an attribute
         # for pickling reasons
@@ -104,10 +227,6 @@ class SystemDiff(object):
         self.CallableConditionalDefUseChains = (
             language_support_tools.CallableConditionalDefUseChains
         )
-        # To reset Actor/Def/Use point ids for each commit
-        self.ConditionalDefUseChains.Actor.id_generator = itertools.count(start=1)
-        self.ConditionalDefUseChains.Def.id_generator = itertools.count(start=1)
-        self.ConditionalDefUseChains.Use.id_generator = itertools.count(start=1)
 
         # Flag to ensure ConditionalDefUseChains are produced
         self.cdus_extracted = False
@@ -244,7 +363,7 @@ class SystemDiff(object):
             # time.sleep(10)
             return
         self.set_file_data_modified_only()
-        if self.analysis_mode != "change_location":
+        if self.context.analysis_mode != "change_location":
             self.git_repository.checkout(self.commit.hash)
             time.sleep(10)
             self.set_file_data_non_modified_only()
@@ -300,7 +419,7 @@ class SystemDiff(object):
         gumtree_success, dotdiff_content = self.read_gumtree_output(file_path)
 
         if gumtree_success:
-            return ASTDiff(
+            diff = ASTDiff(
                 *dotdiff_content,
                 self.file_data[file_path]["file_action"],
                 file_path,
@@ -308,45 +427,741 @@ class SystemDiff(object):
                 self.commit.hash,
                 self.language,
             )
+            return diff
 
         else:
             return None
 
     def set_file_data_diffs(self):
+        # ASTDiffs are built on demand (see self.load_file_diff())
         for file_path, file_data in self.file_data.items():
-            self.file_data[file_path]["diff"] = self.get_file_diff(file_path)
+            self.file_data[file_path]["diff"] = PendingASTDiff()
+
+    def load_file_diff(self, file_path):
+        """
+        Returns the ASTDiff of the file (None in case of GumTree errors),
+        building it on first access and loading it from
+        self.spill_store if it is spilled.
+        With a self.resident_memory_budget, the least recently used ASTDiffs
+        that are not pinned are spilled once the budget is exceeded.
+        The points reload the ASTs of spilled ASTDiffs on access
+        (see AnalysisContext.get_ast()).
+        """
+        diff = self.file_data[file_path]["diff"]
+        if isinstance(diff, PendingASTDiff):
+            diff = self.get_file_diff(file_path)
+            self.file_data[file_path]["diff"] = diff
+        if not self.resident_memory_budget or diff is None:
+            return diff
+
+        if isinstance(diff, SpilledASTDiff):
+            diff = ASTDiff.from_state(self.spill_store.read(diff.offset, diff.size))
+            self.file_data[file_path]["diff"] = diff
+
+        self.resident_diffs[file_path] = diff.get_node_count()
+        self.resident_diffs.move_to_end(file_path)
+        self.enforce_memory_budget()
+        return diff
+
+    def pin_file_diff(self, file_path):
+        """
+        Keeps the ASTDiff of the file in memory until it is unpinned as many times,
+        while the chains of the file are built or sliced.
+        The analysis may update the operations of the nodes of pinned ASTDiffs,
+        so they are written to self.spill_store again when spilled next.
+        """
+        self.pinned_files[file_path] = self.pinned_files.get(file_path, 0) + 1
+        self.spilled_diffs.pop(file_path, None)
+
+    def unpin_file_diff(self, file_path):
+        self.pinned_files[file_path] -= 1
+        if self.pinned_files[file_path] == 0:
+            del self.pinned_files[file_path]
+
+    def enforce_memory_budget(self):
+        """
+        Spills the least recently used ASTDiffs that are not pinned
+        until the estimated memory of the resident ASTDiffs is within
+        self.resident_memory_budget.
+        The most recently used ASTDiff is never spilled.
+        """
+        node_budget = (self.resident_memory_budget * 1024 * 1024) // (
+            ASTDiffSpillStore.NODE_FOOTPRINT
+        )
+        resident_node_count = sum(self.resident_diffs.values())
+        candidates = list(
+            filter(
+                lambda file_path: file_path not in self.pinned_files,
+                list(self.resident_diffs.keys())[:-1],
+            )
+        )
+        for file_path in candidates:
+            if resident_node_count <= node_budget:
+                break
+            resident_node_count -= self.resident_diffs.pop(file_path)
+            self.spill_file_diff(file_path)
+
+    def spill_file_diff(self, file_path):
+        """
+        Replaces the ASTDiff of the file with a SpilledASTDiff
+        and drops its ASTs from the registry of self.context.
+        ASTDiffs are written to self.spill_store again only
+        if they were pinned since (see self.pin_file_diff()).
+        """
+        if file_path not in self.spilled_diffs:
+            if self.spill_store is None:
+                self.spill_store = ASTDiffSpillStore(self.commit_dir / "ast_spill.bin")
+            diff = self.file_data[file_path]["diff"]
+            self.spilled_diffs[file_path] = SpilledASTDiff(
+                *self.spill_store.write(diff.to_state()), diff.get_node_count()
+            )
+        self.file_data[file_path]["diff"] = self.spilled_diffs[file_path]
+        self.context.release_asts(file_path)
+
+    def close_spill_store(self):
+        """
+        Removes the spilled ASTDiffs.
+        Must be called once the commit is processed.
+        """
+        if self.spill_store is not None:
+            self.spill_store.close()
+            self.spill_store = None
+
+    def update_node_operation(self, ast, node_data, operation):
+        """
+        Updates the operation of the node of the ast (and of its match) during the
+        data-flow analysis. Updates of the node and of its match in the other AST
+        are appended to self.operation_update_log as
+        ('file_path', 'cluster', 'node_id', 'operation') when set
+        (see self.analyze_global_in_parallel() and self.fork_child_scope_analysis()).
+        """
+        if (not self.operation_update_log is None) and (
+            node_data["operation"] != operation
+        ):
+            self.operation_update_log.append(
+                (ast.file_path, ast.name, node_data["id"], operation)
+            )
+            if not ast.diff is None:
+                match_ast, match_node_data = ast.diff.reveal_match(node_data)
+                if match_node_data and match_node_data["operation"] != operation:
+                    self.operation_update_log.append(
+                        (
+                            match_ast.file_path,
+                            match_ast.name,
+                            match_node_data["id"],
+                            operation,
+                        )
+                    )
+        ast.update_node_operation(node_data, operation)
 
     def perform_data_flow_analysis(self):
         if self.cdus_extracted:
             return
-        analysis_method = "analyze_" + self.analysis_mode
+        analysis_method = "analyze_" + self.context.analysis_mode
         analyzer = getattr(self, analysis_method, self.analyze_global)
         analyzer()
         self.cdus_extracted = True
 
+    def is_forking_supported(self):
+        """
+        Returns True if the analysis can be distributed over forked processes,
+        which share neither the spill store nor platforms without fork.
+        """
+        return (not self.resident_memory_budget) and (
+            "fork" in multiprocessing.get_all_start_methods()
+        )
+
     def analyze_change_location(self):
+        if self.parallel_workers > 1 and self.is_forking_supported():
+            self.analyze_change_location_in_parallel()
+            return
+        for file_path in self.file_data.keys():
+            self.analyze_file_change_location(file_path)
+
+    def analyze_file_change_location(self, file_path):
+        diff = self.load_file_diff(file_path)
+        if diff:
+            if self.context.verbose:
+                print(f"{'#'*10} {file_path} {'#'*10}")
+
+            self.source_cdu_chains.append(
+                self.ConditionalDefUseChains(diff.source, self)
+            )
+            if self.context.verbose:
+                print(f"{'#'*10} Analyzing source {'#'*10}")
+            self.source_cdu_chains[-1].analyze()
+
+            self.destination_cdu_chains.append(
+                self.ConditionalDefUseChains(diff.destination, self)
+            )
+            if self.context.verbose:
+                print(f"{'#'*10} Analyzing source {'#'*10}")
+            self.destination_cdu_chains[-1].analyze()
+
+    def analyze_change_location_in_parallel(self):
+        """
+        Builds the ASTDiffs of the files and analyzes them over a pool of
+        self.parallel_workers forked processes (see self.analyze_file_in_worker()),
+        and gathers the results back in the order of the files.
+        The points of each file are renumbered when gathered (see
+        AnalysisContext.renumber_points()), so their ids follow the order of the
+        files as in the sequential analysis, and the ASTs of the file at index i
+        take the indices 2i and 2i+1 of the registry of self.context.
+        Files whose results cannot be sent back are analyzed here.
+        """
+        file_paths = list(self.file_data.keys())
+        for file_path in file_paths:
+            self.context.get_key_index(file_path, "source")
+            self.context.get_key_index(file_path, "destination")
+
+        fork_context = multiprocessing.get_context("fork")
+        with fork_context.Pool(
+            processes=self.parallel_workers,
+            initializer=set_up_pool_worker,
+            initargs=(self,),
+        ) as pool:
+            results = pool.imap(analyze_file_in_pool, file_paths, chunksize=1)
+            for file_path, blob in zip(file_paths, results):
+                if blob is None:
+                    self.analyze_file_change_location(file_path)
+                    continue
+                result = SharedObjectUnpickler(
+                    io.BytesIO(blob), {("sysdiff",): self, ("context",): self.context}
+                ).load()
+                self.context.renumber_points(result["points"])
+                self.file_data[file_path] = result["file_data"]
+                diff = result["file_data"]["diff"]
+                if diff is not None:
+                    self.context.get_file_index(diff.source)
+                    self.context.get_file_index(diff.destination)
+                self.source_cdu_chains.extend(result["source_chains"])
+                self.destination_cdu_chains.extend(result["destination_chains"])
+
+    def analyze_file_in_worker(self, file_path):
+        """
+        Runs in the processes of self.analyze_change_location_in_parallel().
+        Returns the file_data of the file (with its ASTDiff), the chains
+        appended by its analysis and the points it created, pickled with this
+        SystemDiff and its context shared by key, or None if the pickling fails.
+        """
+        self.context.created_points = []
+        source_chains_count = len(self.source_cdu_chains)
+        destination_chains_count = len(self.destination_cdu_chains)
+        self.analyze_file_change_location(file_path)
+        result = {
+            "file_data": self.file_data[file_path],
+            "source_chains": self.source_cdu_chains[source_chains_count:],
+            "destination_chains": self.destination_cdu_chains[
+                destination_chains_count:
+            ],
+            "points": self.context.created_points,
+        }
+        blob = io.BytesIO()
+        try:
+            SharedObjectPickler(
+                blob, {id(self): ("sysdiff",), id(self.context): ("context",)}
+            ).dump(result)
+        except (pickle.PicklingError, AttributeError, TypeError) as error:
+            if self.context.verbose:
+                print(f"Analyzing {file_path} in the worker process failed: {error}")
+            return None
+        finally:
+            # The chains are sent back and not kept in the worker
+            del self.source_cdu_chains[source_chains_count:]
+            del self.destination_cdu_chains[destination_chains_count:]
+            self.context.created_points = None
+        return blob.getvalue()
+
+    def analyze_global(self):
+        if self.parallel_workers > 1 and self.is_forking_supported():
+            # The points are recorded to be shared with the processes
+            # analyzing child scopes (see self.fork_child_scope_analysis())
+            self.context.created_points = []
+        if self.parallel_clusters and self.is_forking_supported():
+            self.analyze_global_in_parallel()
+        else:
+            self.globally_analyze_cluster("source")
+            self.globally_analyze_cluster("destination")
+        self.context.created_points = None
+
+    def analyze_global_in_parallel(self):
+        """
+        Analyzes the destination cluster in a forked process
+        while the source cluster is analyzed in this one,
+        and merges the results back (see self.merge_cluster_analysis()).
+        The ASTDiffs of all the files are built before the fork and shared by
+        both processes, so GumTree runs once per file, and the points of the
+        destination cluster are renumbered once merged, so their ids follow
+        the ones of the source cluster as in the sequential analysis.
+        The destination cluster is analyzed in this process instead
+        if the worker fails or the analysis of the source cluster
+        updates the operation of destination nodes, which the
+        analysis of the destination cluster depends on.
+        """
+        # Building the ASTDiffs and registering their ASTs
+        # in the same order for both processes
+        for file_path in self.file_data.keys():
+            self.load_file_diff(file_path)
+            self.context.get_key_index(file_path, "source")
+            self.context.get_key_index(file_path, "destination")
+        shared_objects = {("sysdiff",): self, ("context",): self.context}
         for file_path, file_data in self.file_data.items():
-            if file_data["diff"]:
-                if VERBOSE:
-                    print(f"{'#'*10} {file_path} {'#'*10}")
+            if not file_data["diff"] is None:
+                shared_objects[("diff", file_path)] = file_data["diff"]
+        shared_keys = dict(
+            map(lambda pair: (id(pair[1]), pair[0]), shared_objects.items())
+        )
+
+        fork_context = multiprocessing.get_context("fork")
+        receiver, sender = fork_context.Pipe(duplex=False)
+        worker = fork_context.Process(
+            target=self.analyze_cluster_in_worker,
+            args=("destination", shared_keys, sender),
+        )
+        worker.start()
+        sender.close()
+        # The worker leads its own process group (see self.stop_cluster_worker())
+        try:
+            os.setpgid(worker.pid, worker.pid)
+        except OSError:
+            pass
+
+        self.operation_update_log = []
+        try:
+            self.globally_analyze_cluster("source")
+        except BaseException:
+            self.stop_cluster_worker(worker)
+            raise
+        destination_dependent = any(
+            map(lambda entry: entry[1] == "destination", self.operation_update_log)
+        )
+        self.operation_update_log = None
+
+        result = None
+        if destination_dependent:
+            self.stop_cluster_worker(worker)
+        else:
+            try:
+                result = SharedObjectUnpickler(
+                    io.BytesIO(receiver.recv_bytes()), shared_objects
+                ).load()
+            except (EOFError, pickle.UnpicklingError):
+                result = None
+        receiver.close()
+        worker.join()
+
+        if result is None:
+            if self.context.verbose:
+                print("Analyzing destination cluster in the main process")
+            self.globally_analyze_cluster("destination")
+        else:
+            self.merge_cluster_analysis("destination", result)
+
+    def stop_cluster_worker(self, worker):
+        """
+        Stops the worker of self.analyze_global_in_parallel() with its process
+        group, i.e., with the processes it started (child scope analyses and
+        GumTree), and waits for it.
+        """
+        try:
+            os.killpg(worker.pid, signal.SIGTERM)
+        except OSError:
+            worker.terminate()
+        worker.join()
 
-                self.source_cdu_chains.append(
-                    self.ConditionalDefUseChains(file_data["diff"].source, self)
+    def analyze_cluster_in_worker(self, cluster, shared_keys, sender):
+        """
+        Runs in the forked process of self.analyze_global_in_parallel().
+        Sends the chains of the cluster with the points they created, the ASTs
+        of the cluster, the flags and language-specific information of the files,
+        and the operation updates of the nodes of the other cluster, pickled with
+        the objects shared with the main process by key.
+        Sends nothing if the pickling fails.
+        """
+        try:
+            os.setpgid(0, 0)
+        except OSError:
+            pass
+        self.operation_update_log = []
+        self.context.created_points = []
+        self.globally_analyze_cluster(cluster)
+        result = {
+            "chains": getattr(self, f"{cluster}_cdu_chains"),
+            "points": self.context.created_points,
+            "asts": dict(
+                map(
+                    lambda pair: (pair[0], getattr(pair[1]["diff"], cluster)),
+                    filter(
+                        lambda pair: pair[1]["diff"] is not None,
+                        self.file_data.items(),
+                    ),
+                )
+            ),
+            "file_data": dict(
+                map(
+                    lambda pair: (
+                        pair[0],
+                        {
+                            f"data_flow_{cluster}_analysis": pair[1][
+                                f"data_flow_{cluster}_analysis"
+                            ],
+                            f"data_flow_{cluster}_reach": pair[1][
+                                f"data_flow_{cluster}_reach"
+                            ],
+                            "language_specific_info": pair[1]["language_specific_info"],
+                        },
+                    ),
+                    self.file_data.items(),
+                )
+            ),
+            "operation_updates": list(
+                filter(
+                    lambda entry: entry[1] != cluster,
+                    self.operation_update_log,
+                )
+            ),
+        }
+        blob = io.BytesIO()
+        try:
+            SharedObjectPickler(blob, shared_keys).dump(result)
+        except (pickle.PicklingError, AttributeError, TypeError) as error:
+            if self.context.verbose:
+                print(
+                    f"Analyzing {cluster} cluster in the worker process failed: {error}"
                 )
-                if VERBOSE:
-                    print(f"{'#'*10} Analyzing source {'#'*10}")
-                self.source_cdu_chains[-1].analyze()
+            sender.close()
+            return
+        sender.send_bytes(blob.getbuffer())
+        sender.close()
+
+    def merge_cluster_analysis(self, cluster, result):
+        """
+        Merges the result of self.analyze_cluster_in_worker() for the cluster:
+        the ASTs of the cluster
+        are replaced by the analyzed ones, in the ASTDiffs and the registry of
+        self.context, the points are renumbered after the ones of this process,
+        the chains, flags, and language-specific information of the files are
+        stored, and the operation updates of the nodes of the other cluster are applied.
+        """
+        for file_path, ast in result["asts"].items():
+            diff = self.file_data[file_path]["diff"]
+            ast.diff = diff
+            setattr(diff, cluster, ast)
+            self.context.get_file_index(ast)
+
+        self.context.renumber_points(result["points"])
+        getattr(self, f"{cluster}_cdu_chains").extend(result["chains"])
+
+        for file_path, file_data in result["file_data"].items():
+            language_specific_info = file_data.pop("language_specific_info")
+            self.file_data[file_path].update(file_data)
+            for key, values in language_specific_info.items():
+                self.file_data[file_path]["language_specific_info"][key].extend(values)
+
+        for file_path, ast_cluster, node_id, operation in result["operation_updates"]:
+            ast = getattr(self.load_file_diff(file_path), ast_cluster)
+            ast.update_node_operation(ast.nodes[node_id], operation)
+
+    def is_forking_child_scopes(self):
+        """
+        Returns True if the child scopes of the global analysis can be analyzed
+        in forked processes (see self.fork_child_scope_analysis()).
+        """
+        return (
+            self.parallel_workers > 1
+            and self.is_forking_supported()
+            and (not self.context.created_points is None)
+            and (not self.is_child_scope_worker)
+        )
 
-                self.destination_cdu_chains.append(
-                    self.ConditionalDefUseChains(file_data["diff"].destination, self)
+    def is_child_scope_analysis_pending(self, file_path):
+        return any(
+            map(
+                lambda analysis: analysis["target_ast"].file_path == file_path,
+                self.child_scope_analyses,
+            )
+        )
+
+    def get_shared_scopes(self, parent_scope):
+        """
+        Returns {key: scope} of the scopes the child scopes of the parent_scope
+        refer to: the parent_scope, its ancestors, and the global scope.
+        """
+        shared_scopes = {("global_scope",): parent_scope.global_scope}
+        scope = parent_scope
+        while not scope is None:
+            shared_scopes[("scope", len(shared_scopes))] = scope
+            scope = scope.parent_scope
+        return shared_scopes
+
+    def fork_child_scope_analysis(self, parent_scope, node_data, target_ast):
+        """
+        Analyzes the child scope of the parent_scope for the file of target_ast,
+        imported by the node_data command, in a forked process
+        (see self.analyze_child_scope_in_worker()), with the names, callables,
+        and reachability conditions visible at the command.
+        At most self.parallel_workers analyses run at once, and they are
+        merged back in the order they were forked (see self.merge_child_scope_analyses()).
+        Only child scopes without effects on the scopes analyzed after them are
+        forked (see ConditionalDefUseChains.is_analyzable_in_forked_process()
+        in language supports).
+        """
+        if len(self.child_scope_analyses) >= self.parallel_workers:
+            self.merge_child_scope_analyses()
+        # Registering the AST in the same order as the sequential analysis
+        self.context.get_file_index(target_ast)
+
+        fork_context = multiprocessing.get_context("fork")
+        receiver, sender = fork_context.Pipe(duplex=False)
+        worker = fork_context.Process(
+            target=self.analyze_child_scope_in_worker,
+            args=(parent_scope, node_data, target_ast, sender),
+        )
+        worker.start()
+        sender.close()
+        self.child_scope_analyses.append(
+            {
+                "worker": worker,
+                "receiver": receiver,
+                "parent_scope": parent_scope,
+                "node_data": node_data,
+                "target_ast": target_ast,
+                "reachability_stacks": (
+                    parent_scope.reachability_stack,
+                    parent_scope.reachability_actor_stack,
+                ),
+                "points_count": len(self.context.created_points),
+                "next_ids": self.context.get_next_ids(),
+            }
+        )
+
+    def analyze_child_scope_in_worker(
+        self, parent_scope, node_data, target_ast, sender
+    ):
+        """
+        Runs in the forked processes of self.fork_child_scope_analysis().
+        Sends the chains of the child scope and of the scopes it created,
+        the points they created, the operation updates of the nodes, and the files
+        they analyzed, pickled with this SystemDiff, its context, the scopes of
+        self.get_shared_scopes(), and the points created before the fork shared
+        with the main process by key.
+        Sends nothing if the child scope loaded another file (e.g., through a
+        project-specific command missing from the import commands of the language
+        support), as its effects on the files are not merged back,
+        or if the pickling fails.
+        """
+        shared_objects = {
+            ("sysdiff",): self,
+            ("context",): self.context,
+            **self.get_shared_scopes(parent_scope),
+        }
+        shared_keys = dict(
+            map(lambda pair: (id(pair[1]), pair[0]), shared_objects.items())
+        )
+        shared_keys.update(
+            map(
+                lambda pair: (id(pair[1]), ("point", pair[0])),
+                enumerate(self.context.created_points),
+            )
+        )
+        self.child_scope_analyses = []
+        self.is_child_scope_worker = True
+        self.operation_update_log = []
+        self.context.created_points = []
+        asts_count = len(self.context.asts)
+
+        cluster = target_ast.name
+        chains = getattr(self, f"{cluster}_cdu_chains")
+        chains_count = len(chains)
+        is_analyzed = lambda file_path: self.file_data[file_path][
+            f"data_flow_{cluster}_analysis"
+        ]
+        analyzed_files = set(filter(is_analyzed, self.file_data.keys()))
+        parent_scope.analyze_child_scope(node_data, target_ast)
+        new_analyzed_files = list(
+            filter(
+                lambda file_path: (not file_path in analyzed_files)
+                and is_analyzed(file_path),
+                self.file_data.keys(),
+            )
+        )
+        if self.is_loading_other_files(
+            target_ast, chains[chains_count:], new_analyzed_files, asts_count
+        ):
+            if self.context.verbose:
+                print(f"{target_ast.file_path} loads other files")
+            sender.close()
+            return
+        result = {
+            "chains": chains[chains_count:],
+            "points": self.context.created_points,
+            "operation_updates": self.operation_update_log,
+            "analyzed_files": new_analyzed_files,
+        }
+        blob = io.BytesIO()
+        try:
+            SharedObjectPickler(blob, shared_keys).dump(result)
+        except (pickle.PicklingError, AttributeError, TypeError) as error:
+            if self.context.verbose:
+                print(
+                    f"Analyzing {target_ast.file_path} in the worker process failed: {error}"
                 )
-                if VERBOSE:
-                    print(f"{'#'*10} Analyzing source {'#'*10}")
-                self.destination_cdu_chains[-1].analyze()
+            sender.close()
+            return
+        sender.send_bytes(blob.getbuffer())
+        sender.close()
 
-    def analyze_global(self):
-        self.globally_analyze_cluster("source")
-        self.globally_analyze_cluster("destination")
+    def is_loading_other_files(self, target_ast, chains, analyzed_files, asts_count):
+        """
+        Returns True if the analysis of the child scope of target_ast in a worker
+        (see self.analyze_child_scope_in_worker()) loaded files other than its own:
+        if it registered new ASTs, analyzed other files, or created chains
+        of files other than target_ast that are not callables.
+        """
+        if len(self.context.asts) > asts_count:
+            return True
+        if set(analyzed_files) - {target_ast.file_path}:
+            return True
+        return any(
+            map(
+                lambda chain: (
+                    not isinstance(chain, self.CallableConditionalDefUseChains)
+                )
+                and (chain.ast.file_path != target_ast.file_path),
+                chains,
+            )
+        )
+
+    def merge_child_scope_analyses(self):
+        """
+        Merges the analyses of self.fork_child_scope_analysis() in the order they
+        were forked (see self.merge_child_scope_analysis()). Child scopes whose
+        analysis is not received are analyzed in this process instead, with the
+        reachability conditions of their command.
+        The points created since the first fork are then reordered and renumbered
+        as if each child scope was analyzed at its command, as in the sequential
+        analysis, and so are the uses the child scopes added to the definitions
+        of the scopes they inherit.
+        """
+        analyses = self.child_scope_analyses
+        if not analyses:
+            return
+        self.child_scope_analyses = []
+        points = self.context.created_points
+        boundaries = list(map(lambda analysis: analysis["points_count"], analyses))
+        boundaries.append(len(points))
+
+        run_points = []
+        # {id(Def): Def} of the definitions of the inherited scopes used by the child scopes
+        inherited_def_points = dict()
+        for index, analysis in enumerate(analyses):
+            result = self.receive_child_scope_analysis(analysis)
+            parent_scope = analysis["parent_scope"]
+            if result is None:
+                if self.context.verbose:
+                    print(
+                        f"Analyzing {analysis['target_ast'].file_path} in the main process"
+                    )
+                points_count = len(points)
+                reachability_stacks = (
+                    parent_scope.reachability_stack,
+                    parent_scope.reachability_actor_stack,
+                )
+                (
+                    parent_scope.reachability_stack,
+                    parent_scope.reachability_actor_stack,
+                ) = analysis["reachability_stacks"]
+                parent_scope.analyze_child_scope(
+                    analysis["node_data"], analysis["target_ast"]
+                )
+                (
+                    parent_scope.reachability_stack,
+                    parent_scope.reachability_actor_stack,
+                ) = reachability_stacks
+                child_points = points[points_count:]
+                del points[points_count:]
+            else:
+                self.merge_child_scope_analysis(parent_scope, result)
+                child_points = result["points"]
+
+            child_point_ids = set(map(id, child_points))
+            for use_point in filter(lambda point: point.kind == "use", child_points):
+                for def_point in use_point.reaching_def_points:
+                    if id(def_point) in child_point_ids:
+                        continue
+                    # Uses of the worker are not in the definitions of this process
+                    if not result is None:
+                        def_point.use_points.append(use_point)
+                    inherited_def_points[id(def_point)] = def_point
+            run_points.extend(child_points)
+            run_points.extend(points[boundaries[index] : boundaries[index + 1]])
+
+        points[boundaries[0] :] = run_points
+        self.context.set_next_ids(analyses[0]["next_ids"])
+        self.context.renumber_points(run_points)
+        first_use_id = analyses[0]["next_ids"]["use"]
+        for def_point in inherited_def_points.values():
+            run_use_points = list(
+                filter(
+                    lambda use_point: use_point.id_number >= first_use_id,
+                    def_point.use_points,
+                )
+            )
+            def_point.use_points[len(def_point.use_points) - len(run_use_points) :] = (
+                sorted(run_use_points, key=lambda use_point: use_point.id_number)
+            )
+
+    def receive_child_scope_analysis(self, analysis):
+        """
+        Returns the result of self.analyze_child_scope_in_worker()
+        for the analysis, or None if the worker failed.
+        """
+        shared_objects = SharedObjects(
+            {
+                ("sysdiff",): self,
+                ("context",): self.context,
+                **self.get_shared_scopes(analysis["parent_scope"]),
+            },
+            self.context.created_points,
+        )
+        try:
+            result = SharedObjectUnpickler(
+                io.BytesIO(analysis["receiver"].recv_bytes()), shared_objects
+            ).load()
+        except (EOFError, pickle.UnpicklingError):
+            result = None
+        analysis["receiver"].close()
+        analysis["worker"].join()
+        return result
+
+    def merge_child_scope_analysis(self, parent_scope, result):
+        """
+        Merges the result of self.analyze_child_scope_in_worker() into the
+        parent_scope: the points refer to the nodes and the interned conditions
+        of this process, the operation updates of the nodes are applied (and logged
+        if self.operation_update_log is set), the name lookups cached by the worker
+        are dropped, and the chains and the flags of the analyzed files are stored.
+        """
+        for point in result["points"]:
+            point.node_data = self.context.get_ast(point.file_index).nodes[
+                point.node_data["id"]
+            ]
+            if point.kind == "actor":
+                point.set_reachability_masks()
+
+        for entry in result["operation_updates"]:
+            file_path, cluster, node_id, operation = entry
+            ast = getattr(self.load_file_diff(file_path), cluster)
+            ast.update_node_operation(ast.nodes[node_id], operation)
+            if not self.operation_update_log is None:
+                self.operation_update_log.append(entry)
+
+        parent_scope.add_child_scope(result["chains"][0])
+        for cdu_chains in result["chains"]:
+            cdu_chains.definition_lookup_cache.clear()
+            self.append_to_chains(cdu_chains)
+        for file_path in result["analyzed_files"]:
+            self.set_data_flow_file_analysis(file_path, result["chains"][0].ast.name)
 
     def globally_analyze_cluster(self, cluster):
         chains_stash = getattr(self, f"{cluster}_cdu_chains", None)
@@ -354,7 +1169,7 @@ class SystemDiff(object):
             self.current_entry_file = entry_file
             # Skip if the self.current_entry_file has GumTree error
             try:
-                if self.file_data[self.current_entry_file]["diff"] is None:
+                if self.load_file_diff(self.current_entry_file) is None:
                     print(
                         f"Selected entry file {self.current_entry_file} failed due to parser error."
                     )
@@ -363,11 +1178,9 @@ class SystemDiff(object):
                 print(f"Selected entry file {self.current_entry_file} does not exist.")
                 continue
             # Analyze CDUs from entry point
-            ast = getattr(
-                self.file_data[self.current_entry_file]["diff"], cluster, None
-            )
+            ast = getattr(self.load_file_diff(self.current_entry_file), cluster, None)
             chains_stash.append(self.ConditionalDefUseChains(ast, self))
-            if VERBOSE:
+            if self.context.verbose:
                 print(f"{'#'*10} Analyzing {cluster} {'#'*10}")
             chains_stash[-1].analyze()
 
@@ -380,48 +1193,74 @@ class SystemDiff(object):
         )
 
         # Analyze the globally unreachable files
-        while True:
-            unreached = sorted(
-                list(
-                    map(
-                        lambda pair: pair[0],
-                        filter(
-                            lambda pair: (
-                                (not pair[1][f"data_flow_{cluster}_analysis"])
-                                and (not pair[1]["has_gumtree_error"])
-                            ),
-                            self.file_data.items(),
-                        ),
-                    )
+        # Files are queued by (depth, not an entry file, order in self.file_data)
+        # and skipped once analyzed by a previously selected file
+        unreached_queue = list(
+            map(
+                lambda pair: (
+                    len(pair[1].split("/")),
+                    not pair[1].endswith(tuple(self.entry_files)),
+                    pair[0],
+                    pair[1],
                 ),
-                key=lambda file_path: len(file_path.split("/")),
-            )
-            if VERBOSE:
-                print(f"UNREACHED files so far: {len(unreached)}")
-            if not unreached:
-                break
-            target_depth = min(
-                map(lambda file_path: len(file_path.split("/")), unreached)
+                enumerate(self.file_data.keys()),
             )
-            candidate_unreached = list(
-                filter(
-                    lambda file_path: (len(file_path.split("/")) == target_depth)
-                    and (file_path.endswith(tuple(self.entry_files))),
-                    unreached,
+        )
+        heapq.heapify(unreached_queue)
+        is_unreached = lambda file_path: (
+            (not self.file_data[file_path][f"data_flow_{cluster}_analysis"])
+            and (not self.file_data[file_path]["has_gumtree_error"])
+        )
+        while True:
+            while unreached_queue and not is_unreached(unreached_queue[0][-1]):
+                heapq.heappop(unreached_queue)
+            if self.context.verbose:
+                print(
+                    f"UNREACHED files so far: {len(list(filter(is_unreached, self.file_data.keys())))}"
                 )
-            )
-            if candidate_unreached:
-                target_file_path = candidate_unreached[0]
-            else:
-                target_file_path = unreached[0]
-            if VERBOSE:
+            if not unreached_queue:
+                break
+            target_file_path = heapq.heappop(unreached_queue)[-1]
+            if self.context.verbose:
                 print(f"NEXT FILE SELECTED {target_file_path}")
-            ast = getattr(self.file_data[target_file_path]["diff"], cluster, None)
+            # GumTree errors are only known once the ASTDiff is built
+            diff = self.load_file_diff(target_file_path)
+            if diff is None:
+                continue
+            ast = getattr(diff, cluster, None)
             chains_stash.append(self.ConditionalDefUseChains(ast, self))
-            if VERBOSE:
+            if self.context.verbose:
                 print(f"{'#'*10} Analyzing {cluster} {'#'*10}")
             chains_stash[-1].analyze()
 
+    def get_resolutions_by_pattern(
+        self, cluster, starts_with=(), ends_with=(), depth=None
+    ):
+        """
+        Returns the (file_key, resolution) pairs of self.file_path_resolution_map[cluster]
+        whose file_key starts with any of starts_with, ends with any of ends_with,
+        and has depth components (if set), in the order of the map.
+        Empty starts_with or ends_with match all file keys.
+        Used by project-specific resolutions; results are cached for the commit.
+        """
+        if isinstance(starts_with, str):
+            starts_with = (starts_with,)
+        if isinstance(ends_with, str):
+            ends_with = (ends_with,)
+        key = (cluster, tuple(starts_with), tuple(ends_with), depth)
+        if not key in self.resolution_pattern_cache:
+            self.resolution_pattern_cache[key] = list(
+                filter(
+                    lambda pair: ((not starts_with) or pair[0].startswith(key[1]))
+                    and ((not ends_with) or pair[0].endswith(key[2]))
+                    and (
+                        (depth is None) or (len(pair[0].strip("/").split("/")) == depth)
+                    ),
+                    self.file_path_resolution_map[cluster].items(),
+                )
+            )
+        return self.resolution_pattern_cache[key]
+
     def get_file_directory(self, file_path, cluster):
         if cluster == "source":
             directory = self.file_data[file_path]["before_path"]
@@ -469,12 +1308,28 @@ class SystemDiff(object):
 
         list(
             map(
-                lambda file_data: file_data["diff"].export_json(save_path),
+                lambda diff: diff.export_json(save_path),
+                self.get_built_file_diffs(),
+            )
+        )
+
+    def get_built_file_diffs(self):
+        """
+        Returns the ASTDiffs of the files, loading the spilled ones.
+        Files not reached by the data-flow analysis (whose ASTDiffs
+        are not built) and files with GumTree errors are skipped.
+        """
+        return filter(
+            lambda diff: diff is not None,
+            map(
+                self.load_file_diff,
                 filter(
-                    lambda file_data: (file_data["diff"] is not None),
-                    self.file_data.values(),
+                    lambda file_path: not isinstance(
+                        self.file_data[file_path]["diff"], PendingASTDiff
+                    ),
+                    self.file_data.keys(),
                 ),
-            )
+            ),
         )
 
     def compute_propagation_slices(self):
@@ -485,75 +1340,82 @@ class SystemDiff(object):
             self.perform_data_flow_analysis()
 
         source_propagation_slices = [
-            chain.get_propagation_slice() for chain in self.source_cdu_chains
+            self.get_chain_propagation_slice(chain) for chain in self.source_cdu_chains
         ]
         self.source_propagation_slice = pd.concat(
             source_propagation_slices, ignore_index=True
         )
-        propagation_slice_source_nodes = list(
-            map(
-                lambda point: point.node_data["id"],
-                reduce(
-                    lambda a, b: [*a, *b],
-                    map(
-                        lambda chain: chain.get_propagation_slice_points(),
-                        self.source_cdu_chains,
-                    ),
-                    [],
-                ),
-            )
+        propagation_slice_source_nodes = self.get_propagation_slice_nodes(
+            self.source_cdu_chains
         )
 
         destination_propagation_slices = [
-            chain.get_propagation_slice() for chain in self.destination_cdu_chains
+            self.get_chain_propagation_slice(chain)
+            for chain in self.destination_cdu_chains
         ]
         self.destination_propagation_slice = pd.concat(
             destination_propagation_slices, ignore_index=True
         )
-        propagation_slice_destination_nodes = list(
-            map(
-                lambda point: point.node_data["id"],
-                reduce(
-                    lambda a, b: [*a, *b],
-                    map(
-                        lambda chain: chain.get_propagation_slice_points(),
-                        self.destination_cdu_chains,
-                    ),
-                    [],
-                ),
-            )
+        propagation_slice_destination_nodes = self.get_propagation_slice_nodes(
+            self.destination_cdu_chains
         )
 
-        matches = reduce(
-            lambda a, b: ([*a[0], *b[0]], [*a[1], *b[1]]),
-            map(
-                lambda file_data: (
-                    list(
-                        filter(
-                            lambda match: match[0] in propagation_slice_source_nodes,
-                            file_data["diff"].source_match.items(),
-                        )
+        # Only the files of the propagation slice points are matched,
+        # loading their ASTDiffs if spilled
+        matches = (
+            itertools.chain.from_iterable(
+                map(
+                    lambda file_path: self.load_file_diff(file_path).get_matches_of(
+                        propagation_slice_source_nodes[file_path], "source"
                     ),
-                    list(
-                        filter(
-                            lambda match: match[0]
-                            in propagation_slice_destination_nodes,
-                            file_data["diff"].destination_match.items(),
-                        )
+                    filter(
+                        lambda file_path: file_path in propagation_slice_source_nodes,
+                        self.file_data.keys(),
                     ),
-                ),
-                filter(
-                    lambda file_data: not (file_data["diff"] is None),
-                    self.file_data.values(),
-                ),
+                )
+            ),
+            itertools.chain.from_iterable(
+                map(
+                    lambda file_path: self.load_file_diff(file_path).get_matches_of(
+                        propagation_slice_destination_nodes[file_path], "destination"
+                    ),
+                    filter(
+                        lambda file_path: file_path
+                        in propagation_slice_destination_nodes,
+                        self.file_data.keys(),
+                    ),
+                )
             ),
-            ([], []),
         )
         self.source_propagation_slice_matches = dict(matches[0])
         self.destination_propagation_slice_matches = dict(matches[1])
 
         self.ps_extracted = True
 
+    def get_propagation_slice_nodes(self, chains):
+        """
+        Returns the ids of the nodes of the propagation slice points of the chains
+        grouped by their files in the form of {'file_path': {'node_id'}}.
+        """
+        propagation_slice_nodes = defaultdict(set)
+        for point in itertools.chain.from_iterable(
+            map(lambda chain: chain.get_propagation_slice_points(), chains)
+        ):
+            file_path = self.context.ast_keys[point.file_index][0]
+            propagation_slice_nodes[file_path].add(point.node_data["id"])
+        return propagation_slice_nodes
+
+    def get_chain_propagation_slice(self, chain):
+        """
+        Returns the propagation slice of the chain,
+        keeping the ASTDiff of its file in memory while slicing.
+        """
+        file_path = self.context.ast_keys[chain.ast_index][0]
+        self.pin_file_diff(file_path)
+        propagation_slice = chain.get_propagation_slice()
+        self.unpin_file_diff(file_path)
+        return propagation_slice
+
     def run_analysis(self):
         self.perform_data_flow_analysis()
         if not self.snapshot_mode:
@@ -652,11 +1514,8 @@ class SystemDiff(object):
         else:
             list(
                 map(
-                    lambda file_data: file_data["diff"].export_csv(save_path),
-                    filter(
-                        lambda file_data: (file_data["diff"] is not None),
-                        self.file_data.values(),
-                    ),
+                    lambda diff: diff.export_csv(save_path),
+                    self.get_built_file_diffs(),
                 )
             )
 
@@ -745,10 +1604,15 @@ class SystemDiffShortcut(SystemDiff):
         )
 
     def get_file_diff(self, file_path):
+        diff = self.load_file_diff_state(file_path)
+        if diff is not None:
+            self.file_data[file_path]["has_gumtree_error"] = False
+            return diff
+
         gumtree_success, dotdiff_content = self.read_gumtree_output(file_path)
 
         if gumtree_success:
-            return ASTDiff(
+            diff = ASTDiff(
                 *dotdiff_content,
                 self.file_data[file_path]["file_action"],
                 file_path,
@@ -756,10 +1620,41 @@ class SystemDiffShortcut(SystemDiff):
                 self.commit.hash,
                 self.language,
             )
+            self.save_file_diff_state(diff, file_path)
+            return diff
 
         else:
             return None
 
+    def get_state_path(self, file_path):
+        return (
+            self.gumtree_output_dir
+            / f'{self.file_data[file_path]["saved_as"]}_astdiff.bin'
+        )
+
+    def save_file_diff_state(self, diff, file_path):
+        """
+        Saves the state of the ASTDiff built from the GumTree output next to it
+        so that the next runs load it instead of parsing the dotdiff.
+        """
+        diff.save_state(self.get_state_path(file_path))
+
+    def load_file_diff_state(self, file_path):
+        """
+        Returns the ASTDiff saved by a previous run (see self.save_file_diff_state()).
+        Returns None if there is no saved state or it is older than the GumTree output.
+        """
+        state_path = self.get_state_path(file_path)
+        dotdiff_path = (
+            self.gumtree_output_dir
+            / f'{self.file_data[file_path]["saved_as"]}_dotdiff.dot'
+        )
+        if not (state_path.exists() and dotdiff_path.exists()):
+            return None
+        if state_path.stat().st_mtime < dotdiff_path.stat().st_mtime:
+            return None
+        return ASTDiff.load_state(state_path)
+
 
 class SystemDiffSeries(SystemDiff):
     def set_paths(self):
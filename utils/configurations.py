@@ -1,151 +1,230 @@
 import json5
 from pathlib import Path
 from functools import reduce
-import sys
 from .helpers import get_mountpoint, is_url, clone_repo
 
 ROOT_PATH = Path(__file__).parent.parent
-# Appending root path to sys.path
-# to import from utils and ast_model
-sys.path.append(str(ROOT_PATH))
 
-mountpoint = get_mountpoint()
 
-if "test" in sys.argv:
-    with open(ROOT_PATH / "test/config.json", "r") as f:
-        config = json5.load(f)
-else:
-    with open(mountpoint / "config.json", "r") as f:
-        config = json5.load(f)
+def get_config_path(test=False):
+    """
+    Returns the path to the config.json of the mountpoint,
+    or of the <ROOT_PATH/test/> directory for the test command.
+    """
+    if test:
+        return ROOT_PATH / "test/config.json"
+    return get_mountpoint() / "config.json"
 
-options = config["OPTIONS"]
 
-RESOURCE_CONTROL = options["RESOURCE_CONTROL"]
+class Configurations(object):
+    """
+    Model the configurations of a BuiScout run read from a config.json file.
+    Loading the configurations has no side effects: the repository
+    is cloned by self.clone_repository() and the results folder
+    is created by the run command (see command_options/run.py).
+    The options of the analysis are passed to the SystemDiff objects
+    as keyword arguments (see self.get_analysis_options()).
+    """
 
-COMMIT_SERIES = options["COMMIT_SERIES"]
-
-if COMMIT_SERIES:
-    AST_DIFFS_REUSE = False
-else:
-    AST_DIFFS_REUSE = options["AST_DIFFS_REUSE"]
-
-PROGRESS_RESET = options["PROGRESS_RESET"]
-
-VERBOSE = options["VERBOSE"]
-
-if options["CHANGE_LOCATION_ONLY"]:
-    DATA_FLOW_ANALYSIS_MODE = "CHANGE_LOCATION"
-else:
-    DATA_FLOW_ANALYSIS_MODE = "GLOBAL"
-
-SNAPSHOT_MODE = options["SNAPSHOT_MODE"]
-
-EXECUTE_CALLABLES = options["EXECUTE_CALLABLES"]
-
-PROJECT_MODEL = options["PROJECT_MODEL"]
-
-FILTERING = options["INITIALIZE_WITH_BUILD_COMMITS"]
-
-DATA_PATH = mountpoint / f'{config["RELATIVE_RESULT_PATH"]}'
-PROJECT = config["PROJECT"]
-
-REPOSITORY = str(config["REPOSITORY"])
-if is_url(REPOSITORY):
-    CLEAN_TRACES = True
-    clone_repo(REPOSITORY, mountpoint / f"{PROJECT}")
-    REPOSITORY = str(mountpoint / f"{PROJECT}")
-else:
-    CLEAN_TRACES = False
-    REPOSITORY = str(mountpoint / f"{REPOSITORY}")
-
-
-if config["BRANCH"].upper() == "ALL":
-    BRANCH = None
-else:
-    BRANCH = config["BRANCH"]
-
-if isinstance(config["COMMITS"], str) and config["COMMITS"].upper() == "ALL":
-    COMMITS = None
-else:
-    COMMITS = config["COMMITS"]
-EXCLUDED_COMMITS = config["EXCLUDED_COMMITS"]
-
-BUILD_TECHNOLOGY = config["BUILD_TECHNOLOGY"].lower()
-ENTRY_FILES = config["ENTRY_FILES"]
-
-PROJECT_SPECIFIC_INCLUDES = config["PROJECT_SPECIFIC_INCLUDES"]
-PROJECT_SPECIFIC_EXCLUDES = config["PROJECT_SPECIFIC_EXCLUDES"]
-
-PROJECT_SPECIFIC_PATH_RESOLUTION = config["PROJECT_SPECIFIC_PATH_RESOLUTION"]
-
-# EXTENDED CONFIGURATIONS
-
-SAVE_PATH = Path(DATA_PATH / f"{PROJECT}_{BUILD_TECHNOLOGY}_results")
-SAVE_PATH.mkdir(parents=True, exist_ok=True)
+    def __init__(self, config_path, *args, **kwargs):
+        with open(config_path, "r") as f:
+            config = json5.load(f)
+        mountpoint = get_mountpoint()
+
+        options = config["OPTIONS"]
+
+        self.RESOURCE_CONTROL = options["RESOURCE_CONTROL"]
+
+        self.COMMIT_SERIES = options["COMMIT_SERIES"]
+
+        if self.COMMIT_SERIES:
+            self.AST_DIFFS_REUSE = False
+        else:
+            self.AST_DIFFS_REUSE = options["AST_DIFFS_REUSE"]
+
+        self.PROGRESS_RESET = options["PROGRESS_RESET"]
+
+        self.VERBOSE = options["VERBOSE"]
+
+        if options["CHANGE_LOCATION_ONLY"]:
+            self.DATA_FLOW_ANALYSIS_MODE = "CHANGE_LOCATION"
+        else:
+            self.DATA_FLOW_ANALYSIS_MODE = "GLOBAL"
+
+        self.SNAPSHOT_MODE = options["SNAPSHOT_MODE"]
+
+        self.EXECUTE_CALLABLES = options["EXECUTE_CALLABLES"]
+
+        self.PROJECT_MODEL = options["PROJECT_MODEL"]
+
+        self.FILTERING = options["INITIALIZE_WITH_BUILD_COMMITS"]
+
+        # In MB, 0 keeps all ASTDiffs in memory
+        self.RESIDENT_MEMORY_BUDGET = options.get("RESIDENT_MEMORY_BUDGET", 0)
+
+        self.PARALLEL_CLUSTERS = options.get("PARALLEL_CLUSTERS", False)
+
+        self.PARALLEL_WORKERS = options.get("PARALLEL_WORKERS", 0)
+
+        self.DATA_PATH = mountpoint / f'{config["RELATIVE_RESULT_PATH"]}'
+        self.PROJECT = config["PROJECT"]
+
+        # Remote repositories are cloned into the mountpoint (see self.clone_repository())
+        self.REPOSITORY_URL = None
+        self.REPOSITORY = str(config["REPOSITORY"])
+        if is_url(self.REPOSITORY):
+            self.CLEAN_TRACES = True
+            self.REPOSITORY_URL = self.REPOSITORY
+            self.REPOSITORY = str(mountpoint / f"{self.PROJECT}")
+        else:
+            self.CLEAN_TRACES = False
+            self.REPOSITORY = str(mountpoint / f"{self.REPOSITORY}")
+
+        if config["BRANCH"].upper() == "ALL":
+            self.BRANCH = None
+        else:
+            self.BRANCH = config["BRANCH"]
+
+        if isinstance(config["COMMITS"], str) and config["COMMITS"].upper() == "ALL":
+            self.COMMITS = None
+        else:
+            self.COMMITS = config["COMMITS"]
+        self.EXCLUDED_COMMITS = config["EXCLUDED_COMMITS"]
+
+        self.BUILD_TECHNOLOGY = config["BUILD_TECHNOLOGY"].lower()
+        self.ENTRY_FILES = config["ENTRY_FILES"]
+
+        self.PROJECT_SPECIFIC_INCLUDES = config["PROJECT_SPECIFIC_INCLUDES"]
+        self.PROJECT_SPECIFIC_EXCLUDES = config["PROJECT_SPECIFIC_EXCLUDES"]
+
+        self.PROJECT_SPECIFIC_PATH_RESOLUTION = config[
+            "PROJECT_SPECIFIC_PATH_RESOLUTION"
+        ]
+
+        # EXTENDED CONFIGURATIONS
+
+        self.SAVE_PATH = Path(
+            self.DATA_PATH / f"{self.PROJECT}_{self.BUILD_TECHNOLOGY}_results"
+        )
+
+        self.set_pattern_sets()
+
+    def set_pattern_sets(self):
+        """
+        Sets PATTERN_SETS, a dictionary with
+        Keys: each and every one of the listed BUILD_LANGUAGES,
+        Values: a list of naming and extention conventions for
+        build specification files in the Key language.
+        Note that the patterns are matched using the
+        str.ends_with() method.
+        To add support for a new build system, add and elif clause
+        before the else clause and specify languages and file patterns.
+        """
+        if self.BUILD_TECHNOLOGY == "cmake":
+            self.LANGUAGES = ["cmake"]
+            self.PATTERN_SETS = {
+                "cmake": {
+                    "include": {
+                        "starts_with": [],
+                        "ends_with": ["CMakeLists.txt", ".cmake"],
+                    },
+                    "exclude": {"starts_with": [], "ends_with": [".h.cmake"]},
+                }
+            }  # cmake file name patterns
+        else:
+            raise ValueError(
+                f'Selected build system "{self.BUILD_TECHNOLOGY}" not supported.'
+            )
 
-# PATTERN_SETS is a dictionary with
-# Keys: each and every one of the listed BUILD_LANGUAGES,
-# Values: a list of naming and extention conventions for
-# build specification files in the Key language.
-# Note that the patterns are matched using the
-# str.ends_with() method.
-# To add support for a new build system, add and elif clause
-# before the else clause and specify languages and file patterns.
-if BUILD_TECHNOLOGY == "cmake":
-    LANGUAGES = ["cmake"]
-    PATTERN_SETS = {
-        "cmake": {
+        for l in self.LANGUAGES:
+            if l in self.PROJECT_SPECIFIC_INCLUDES:
+                includes = self.PROJECT_SPECIFIC_INCLUDES[l]
+                if "starts_with" in includes:
+                    self.PATTERN_SETS[l]["include"]["starts_with"] = list(
+                        set(
+                            self.PATTERN_SETS[l]["include"]["starts_with"]
+                            + includes["starts_with"]
+                        )
+                    )
+                if "ends_with" in includes:
+                    self.PATTERN_SETS[l]["include"]["ends_with"] = list(
+                        set(
+                            self.PATTERN_SETS[l]["include"]["ends_with"]
+                            + includes["ends_with"]
+                        )
+                    )
+            if l in self.PROJECT_SPECIFIC_EXCLUDES:
+                excludes = self.PROJECT_SPECIFIC_EXCLUDES[l]
+                if "starts_with" in excludes:
+                    self.PATTERN_SETS[l]["exclude"]["starts_with"] = list(
+                        set(
+                            self.PATTERN_SETS[l]["exclude"]["starts_with"]
+                            + excludes["starts_with"]
+                        )
+                    )
+                if "ends_with" in excludes:
+                    self.PATTERN_SETS[l]["exclude"]["ends_with"] = list(
+                        set(
+                            self.PATTERN_SETS[l]["exclude"]["ends_with"]
+                            + excludes["ends_with"]
+                        )
+                    )
+
+        self.PATTERNS_FLATTENED = {
             "include": {
-                "starts_with": [],
-                "ends_with": ["CMakeLists.txt", ".cmake"],
+                "starts_with": reduce(
+                    lambda a, b: a + b,
+                    map(
+                        lambda sets: sets["include"]["starts_with"],
+                        self.PATTERN_SETS.values(),
+                    ),
+                ),
+                "ends_with": reduce(
+                    lambda a, b: a + b,
+                    map(
+                        lambda sets: sets["include"]["ends_with"],
+                        self.PATTERN_SETS.values(),
+                    ),
+                ),
+            },
+            "exclude": {
+                "starts_with": reduce(
+                    lambda a, b: a + b,
+                    map(
+                        lambda sets: sets["exclude"]["starts_with"],
+                        self.PATTERN_SETS.values(),
+                    ),
+                ),
+                "ends_with": reduce(
+                    lambda a, b: a + b,
+                    map(
+                        lambda sets: sets["exclude"]["ends_with"],
+                        self.PATTERN_SETS.values(),
+                    ),
+                ),
             },
-            "exclude": {"starts_with": [], "ends_with": [".h.cmake"]},
         }
-    }  # cmake file name patterns
-else:
-    raise ValueError(f'Selected build system "{BUILD_TECHNOLOGY}" not supported.')
-
-for l in LANGUAGES:
-    if l in PROJECT_SPECIFIC_INCLUDES:
-        includes = PROJECT_SPECIFIC_INCLUDES[l]
-        if "starts_with" in includes:
-            PATTERN_SETS[l]["include"]["starts_with"] = list(
-                set(PATTERN_SETS[l]["include"]["starts_with"] + includes["starts_with"])
-            )
-        if "ends_with" in includes:
-            PATTERN_SETS[l]["include"]["ends_with"] = list(
-                set(PATTERN_SETS[l]["include"]["ends_with"] + includes["ends_with"])
-            )
-    if l in PROJECT_SPECIFIC_EXCLUDES:
-        excludes = PROJECT_SPECIFIC_EXCLUDES[l]
-        if "starts_with" in excludes:
-            PATTERN_SETS[l]["exclude"]["starts_with"] = list(
-                set(PATTERN_SETS[l]["exclude"]["starts_with"] + excludes["starts_with"])
-            )
-        if "ends_with" in excludes:
-            PATTERN_SETS[l]["exclude"]["ends_with"] = list(
-                set(PATTERN_SETS[l]["exclude"]["ends_with"] + excludes["ends_with"])
-            )
 
-PATTERNS_FLATTENED = {
-    "include": {
-        "starts_with": reduce(
-            lambda a, b: a + b,
-            map(lambda sets: sets["include"]["starts_with"], PATTERN_SETS.values()),
-        ),
-        "ends_with": reduce(
-            lambda a, b: a + b,
-            map(lambda sets: sets["include"]["ends_with"], PATTERN_SETS.values()),
-        ),
-    },
-    "exclude": {
-        "starts_with": reduce(
-            lambda a, b: a + b,
-            map(lambda sets: sets["exclude"]["starts_with"], PATTERN_SETS.values()),
-        ),
-        "ends_with": reduce(
-            lambda a, b: a + b,
-            map(lambda sets: sets["exclude"]["ends_with"], PATTERN_SETS.values()),
-        ),
-    },
-}
+    def clone_repository(self):
+        """
+        Clones the remote repository into the mountpoint, if any.
+        The clone is removed once the run is done (see self.CLEAN_TRACES).
+        """
+        if self.REPOSITORY_URL is not None:
+            clone_repo(self.REPOSITORY_URL, self.REPOSITORY)
+
+    def get_analysis_options(self):
+        """
+        Returns the options of the analysis in the form of
+        the keyword arguments of SystemDiff.
+        """
+        return {
+            "analysis_mode": self.DATA_FLOW_ANALYSIS_MODE.lower(),
+            "verbose": self.VERBOSE,
+            "execute_callables": self.EXECUTE_CALLABLES,
+            "snapshot_mode": self.SNAPSHOT_MODE,
+            "resident_memory_budget": self.RESIDENT_MEMORY_BUDGET,
+            "parallel_clusters": self.PARALLEL_CLUSTERS,
+            "parallel_workers": self.PARALLEL_WORKERS,
+            "path_resolutions": self.PROJECT_SPECIFIC_PATH_RESOLUTION,
+        }
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import shutil, sys
@@ -37,6 +38,27 @@ def parse_label(label):
     return parsed_label
 
 
+# Column encoders for compact AST states
+def encode_column(values):
+    """
+    Encodes an iterable of repetitive values (e.g., node types)
+    as a pair of (table of unique values, numpy array of codes into the table).
+    """
+    values = list(values)
+    table = list(dict.fromkeys(values))
+    codes = dict(map(lambda pair: (pair[1], pair[0]), enumerate(table)))
+    return table, np.fromiter(
+        map(lambda value: codes[value], values), np.int32, len(values)
+    )
+
+
+def decode_column(table, codes):
+    """
+    Decodes the output of encode_column() into the list of values.
+    """
+    return list(map(lambda code: table[code], codes))
+
+
 #################################
 ######## Helpers for run ########
 #################################
@@ -134,6 +156,20 @@ def write_source_code(file_path, source_code):
         f.write(source_code)
 
 
+# Index the manual path resolutions by (caller_file_path, callee_file_path)
+def index_path_resolutions(path_resolutions):
+    """
+    Returns the PROJECT_SPECIFIC_PATH_RESOLUTION items as a dictionary of
+    {('caller_file_path', 'callee_file_path'): [callee_resolved_path]}.
+    """
+    index = dict()
+    for item in path_resolutions:
+        index.setdefault(
+            (item["caller_file_path"], item["callee_file_path"]), []
+        ).append(item["callee_resolved_path"])
+    return index
+
+
 # Prepare the report csv files
 def create_csv_files(save_path):
     # Save metadata on build changes
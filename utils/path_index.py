@@ -0,0 +1,32 @@
+class PathSuffixIndex(object):
+    """
+    Trie of the reversed components of file paths
+    to look up the paths by their suffixes.
+    Each node of the trie is a dictionary of {'component': node},
+    and stores the paths ending with the components from the root
+    to the node under the None key, in the order they were added.
+    """
+
+    def __init__(self, paths=[], *args, **kwargs):
+        self.root = dict()
+        for path in paths:
+            self.add_path(path)
+
+    def add_path(self, path):
+        path = path.strip("/")
+        node = self.root
+        for component in reversed(path.split("/")):
+            node = node.setdefault(component, dict())
+            node.setdefault(None, []).append(path)
+
+    def get_paths_by_suffix(self, suffix):
+        """
+        Returns the list of paths (stripped of "/") that, with a leading "/",
+        end with "/" + suffix.
+        """
+        node = self.root
+        for component in reversed(suffix.split("/")):
+            node = node.get(component)
+            if node is None:
+                return []
+        return list(node.get(None, []))
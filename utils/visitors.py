@@ -20,27 +20,65 @@ class NodeVisitor(object):
     (return value `None`) the `generic_visit` visitor is used instead.
     Don't use the `NodeVisitor` if you want to apply changes to nodes during
     traversing.
+    The visitor functions are looked up in a dispatch table built once per class
+    (see build_dispatch_table()) instead of by attribute lookup on each visit.
     """
 
+    # Visitor functions of the class in the form of {'suffix': function}, where suffix
+    # is a node type or, for commands, an identifier (see AST.get_command_identifier())
+    dispatch_table = dict()
+
+    # Node types the visitor is run on ahead of time, None for all node types
+    # (see is_precomputed())
+    precomputed_types = None
+
+    def __init_subclass__(cls, *args, **kwargs):
+        super().__init_subclass__(*args, **kwargs)
+        cls.dispatch_table = cls.build_dispatch_table()
+
+    @classmethod
+    def build_dispatch_table(cls, prefix="visit_"):
+        """
+        Returns the {'suffix': function} map of the methods of the class
+        named prefix + suffix. The functions are called with the visitor
+        as their first argument.
+        """
+        return dict(
+            map(
+                lambda method: (method[len(prefix) :], getattr(cls, method)),
+                filter(
+                    lambda attribute: attribute.startswith(prefix)
+                    and callable(getattr(cls, attribute)),
+                    dir(cls),
+                ),
+            )
+        )
+
     def __init__(self, ast):
         self.ast = ast
 
+    def is_precomputed(self, node_data):
+        """
+        Returns True if the node is of the types the visitor supports,
+        whose results are computed ahead of time (see AST.precompute_node_properties()).
+        """
+        return (self.precomputed_types is None) or (
+            node_data["type"] in self.precomputed_types
+        )
+
     def visit(self, node_data, *args, **kwargs):
         """
         Visit a node.
         The input is the output of the ast.get_data(node), i.e., node_data.
         """
-        method = "visit_" + node_data["type"]
-        visitor = getattr(self, method, self.generic_visit)
-        return visitor(node_data, *args, **kwargs)
+        visitor = self.dispatch_table.get(node_data["type"])
+        if visitor is None:
+            return self.generic_visit(node_data, *args, **kwargs)
+        return visitor(self, node_data, *args, **kwargs)
 
     def generic_visit(self, node_data, *args, **kwargs):
         """
         Called if no explicit visitor function exists for a node.
         """
-        children = sorted(
-            list(self.ast.get_children(node_data).values()),
-            key=lambda child_data: child_data["s_pos"],
-        )
-        for child_data in children:
+        for child_data in self.ast.get_sorted_children(node_data):
             self.visit(child_data, *args, **kwargs)